@@ -12,6 +12,7 @@ Example:
 ./aggregator.py ../output pipeline=data_mass_x1_source_x1_positions
 """
 
+import json
 import os
 from os import path
 import zipfile
@@ -19,7 +20,7 @@ from collections import defaultdict
 from shutil import rmtree
 from typing import List, Union, Iterator, Tuple
 
-from .phase_output import PhaseOutput
+from .phase_output import PhaseOutput, ZipPhaseOutput
 from .predicate import AttributePredicate
 
 
@@ -99,6 +100,9 @@ class AbstractAggregator:
         """
         for phase in self.phases:
 
+            if isinstance(phase, ZipPhaseOutput):
+                continue
+
             split_path = path.split(phase.directory)[0]
 
             unzipped_path = path.join(split_path)
@@ -279,11 +283,87 @@ class AbstractAggregator:
         )
 
 
+class ZipIndex:
+    filename = ".aggregator_index.json"
+
+    def __init__(self, directory: str):
+        """
+        A persistent index of the phases in each .zip file below a directory.
+
+        For each .zip file the index records its modification time and size and, for each
+        phase it contains, the directory of the phase within the .zip, the contents of
+        its metadata file and whether it completed. Only .zip files which are new or have
+        changed since the index was saved are opened.
+
+        Parameters
+        ----------
+        directory
+            The directory the aggregator searches, in which the index is saved
+        """
+        self.path = path.join(directory, self.filename)
+        self.directory = directory
+        try:
+            with open(self.path) as f:
+                self._entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._entries = dict()
+        self._scanned = dict()
+
+    def phases_for(self, zip_path: str) -> List[dict]:
+        """
+        The phases in a .zip file, each a dictionary with prefix, metadata and completed keys.
+        """
+        key = path.relpath(zip_path, self.directory)
+        stat = os.stat(zip_path)
+        entry = self._entries.get(key)
+
+        if entry is None or entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+            entry = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "phases": self._scan(zip_path),
+            }
+
+        self._scanned[key] = entry
+        return entry["phases"]
+
+    @staticmethod
+    def _scan(zip_path: str) -> List[dict]:
+        phases = list()
+        with zipfile.ZipFile(zip_path) as f:
+            names = set(f.namelist())
+            for name in sorted(names):
+                prefix, filename = name.rpartition("/")[::2]
+                if filename != "metadata" or prefix.startswith("__MACOSX"):
+                    continue
+                completed = "/".join(filter(None, (prefix, ".completed")))
+                phases.append({
+                    "prefix": prefix,
+                    "metadata": f.read(name).decode(),
+                    "completed": completed in names,
+                })
+        return phases
+
+    def save(self):
+        """
+        Save the index of every .zip file found by this scan.
+        """
+        temporary_path = f"{self.path}.tmp"
+        try:
+            with open(temporary_path, "w") as f:
+                json.dump(self._scanned, f)
+            os.replace(temporary_path, self.path)
+        except OSError:
+            # The directory may be read only, in which case the next scan is not incremental
+            pass
+
+
 class Aggregator(AbstractAggregator):
     def __init__(
             self,
             directory: str,
-            completed_only=False
+            completed_only=False,
+            lazy=False,
     ):
         """
         Class to aggregate phase results for all subdirectories in a given directory.
@@ -298,6 +378,11 @@ class Aggregator(AbstractAggregator):
         completed_only
             If `True` only phases with a .completed file (indicating the phase was completed)
             are included in the aggregator.
+        lazy
+            If `True` .zip files are not extracted. Instead phase outputs are read directly from each .zip
+            file when they are accessed, and the contents of .zip files are indexed in a file in the directory
+            so that opening an aggregator on the same directory again only reads new or changed .zip files.
+            A .zip file is ignored if the directory it would be extracted to exists.
         """
 
         # TODO : Progress bar here
@@ -305,6 +390,23 @@ class Aggregator(AbstractAggregator):
         print("Aggregator loading phases... could take some time.")
 
         self._directory = directory
+
+        if lazy:
+            phases = self._lazy_phases(directory, completed_only)
+        else:
+            phases = self._extracted_phases(directory, completed_only)
+
+        if len(phases) == 0:
+            print(f"\nNo phases found in {directory}\n")
+        else:
+            print(f"\n A total of {str(len(phases))} phases and results were found.")
+        super().__init__(phases)
+
+    @staticmethod
+    def _extracted_phases(directory, completed_only) -> List[PhaseOutput]:
+        """
+        Extract every .zip file and create a phase output for each directory with a metadata file.
+        """
         phases = []
 
         for root, _, filenames in os.walk(directory):
@@ -318,8 +420,35 @@ class Aggregator(AbstractAggregator):
                 if not completed_only or ".completed" in filenames:
                     phases.append(PhaseOutput(root))
 
-        if len(phases) == 0:
-            print(f"\nNo phases found in {directory}\n")
-        else:
-            print(f"\n A total of {str(len(phases))} phases and results were found.")
-        super().__init__(phases)
+        return phases
+
+    @staticmethod
+    def _lazy_phases(directory, completed_only) -> List[PhaseOutput]:
+        """
+        Create a phase output for each directory with a metadata file and for each phase in a .zip
+        file, without extracting .zip files.
+        """
+        phases = []
+        index = ZipIndex(directory)
+
+        for root, _, filenames in os.walk(directory):
+            if "metadata" in filenames:
+                if not completed_only or ".completed" in filenames:
+                    phases.append(PhaseOutput(root))
+
+            for filename in filenames:
+                if not filename.endswith(".zip"):
+                    continue
+                zip_path = path.join(root, filename)
+                if path.exists(zip_path[:-4]):
+                    continue
+                for phase in index.phases_for(zip_path):
+                    if not completed_only or phase["completed"]:
+                        phases.append(ZipPhaseOutput(
+                            zip_path,
+                            prefix=phase["prefix"],
+                            text=phase["metadata"],
+                        ))
+
+        index.save()
+        return phases
@@ -1,6 +1,7 @@
 import os
 from os import path
 import pickle
+import zipfile
 
 import dill
 
@@ -12,28 +13,61 @@ class PhaseOutput:
     @DynamicAttrs
     """
 
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, text: str = None):
         """
         Represents the output of a single phase. Comprises a metadata file and other dataset files.
 
+        The metadata file and pickles are only read when they are first accessed.
+
         Parameters
         ----------
         directory
             The directory of the phase
+        text
+            The contents of the metadata file, if already known
         """
         self.directory = directory
         self.__search = None
         self.__model = None
         self.file_path = os.path.join(directory, "metadata")
-        with open(self.file_path) as f:
-            self.text = f.read()
+        self._text = text
+        self._metadata = None
+
+    def _read(self, *relative_path: str) -> bytes:
+        """
+        Read a file in the phase output.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the file does not exist
+        """
+        with open(path.join(self.directory, *relative_path), "rb") as f:
+            return f.read()
+
+    @property
+    def text(self) -> str:
+        """
+        The contents of the metadata file
+        """
+        if self._text is None:
+            self._text = self._read("metadata").decode()
+        return self._text
+
+    @property
+    def metadata(self) -> dict:
+        """
+        The key value pairs in the metadata file, e.g. pipeline, phase and dataset_name
+        """
+        if self._metadata is None:
             pairs = [
                 line.split("=")
                 for line
                 in self.text.split("\n")
                 if "=" in line
             ]
-            self.__dict__.update({pair[0]: pair[1] for pair in pairs})
+            self._metadata = {pair[0]: pair[1] for pair in pairs}
+        return self._metadata
 
     @property
     def pickle_path(self):
@@ -44,30 +78,28 @@ class PhaseOutput:
         """
         Reads the model.results file
         """
-        with open(os.path.join(self.directory, "model.results")) as f:
-            return f.read()
+        return self._read("model.results").decode()
 
     @property
     def mask(self):
         """
         A pickled mask object
         """
-        with open(
-                os.path.join(self.pickle_path, "mask.pickle"), "rb"
-        ) as f:
-            return dill.load(f)
+        return dill.loads(self._read("pickles", "mask.pickle"))
 
     def __getattr__(self, item):
         """
-        Attempt to load a pickle by the same name from the phase output directory.
+        Attempt to find the item in the metadata file or else load a pickle by the same
+        name from the phase output directory.
 
         dataset.pickle, meta_dataset.pickle etc.
         """
+        if item.startswith("_"):
+            raise AttributeError(item)
+        if item in self.metadata:
+            return self.metadata[item]
         try:
-            with open(
-                    os.path.join(self.pickle_path, f"{item}.pickle"), "rb"
-            ) as f:
-                return pickle.load(f)
+            return pickle.loads(self._read("pickles", f"{item}.pickle"))
         except FileNotFoundError:
             pass
 
@@ -88,8 +120,7 @@ class PhaseOutput:
         """
         if self.__search is None:
             try:
-                with open(os.path.join(self.pickle_path, "search.pickle"), "r+b") as f:
-                    self.__search = pickle.loads(f.read())
+                self.__search = pickle.loads(self._read("pickles", "search.pickle"))
             except FileNotFoundError:
                 pass
         return self.__search
@@ -100,8 +131,7 @@ class PhaseOutput:
         The model that was used in this phase
         """
         if self.__model is None:
-            with open(os.path.join(self.pickle_path, "model.pickle"), "r+b") as f:
-                self.__model = pickle.loads(f.read())
+            self.__model = pickle.loads(self._read("pickles", "model.pickle"))
         return self.__model
 
     def __str__(self):
@@ -109,3 +139,38 @@ class PhaseOutput:
 
     def __repr__(self):
         return "<PhaseOutput {}>".format(self)
+
+
+class ZipPhaseOutput(PhaseOutput):
+    def __init__(self, zip_path: str, prefix: str = "", text: str = None):
+        """
+        The output of a phase which is read directly from a .zip file without extracting it.
+
+        Parameters
+        ----------
+        zip_path
+            The path to the .zip file
+        prefix
+            The directory within the .zip file containing the phase output
+        text
+            The contents of the metadata file, if already known
+        """
+        super().__init__(
+            path.join(zip_path[:-len(".zip")], *filter(None, prefix.split("/"))),
+            text=text,
+        )
+        self.zip_path = zip_path
+        self.prefix = prefix
+
+    def _read(self, *relative_path: str) -> bytes:
+        member = "/".join(filter(None, (self.prefix, *relative_path)))
+        with zipfile.ZipFile(self.zip_path) as f:
+            try:
+                return f.read(member)
+            except KeyError:
+                raise FileNotFoundError(
+                    f"{member} not found in {self.zip_path}"
+                )
+
+    def __repr__(self):
+        return "<ZipPhaseOutput {}>".format(self)
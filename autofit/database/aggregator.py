@@ -1,12 +1,14 @@
-import os
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, List, Iterator, Iterable
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 
+from autofit import exc
 from autofit.aggregator.aggregator import Aggregator as ClassicAggregator
 from autofit.database import query as q
+from . import ingest
 from . import model as m
 
 
@@ -22,11 +24,44 @@ class AbstractAggregator(ABC):
         All fits in the collection
         """
 
+    # The number of fits loaded at once when iterating in batches
+    batch_size = 100
+
     def __iter__(self):
         return iter(
             self.fits
         )
 
+    def batches(
+            self,
+            batch_size: Optional[int] = None,
+            trees: bool = True,
+            names: Iterable[str] = ()
+    ) -> Iterator[List[m.Fit]]:
+        """
+        Iterate the fits in batches. The pickle names, models and
+        instances of each batch are loaded with a few queries.
+
+        Parameters
+        ----------
+        batch_size
+            The number of fits in each batch
+        trees
+            If True the models and instances of each batch are loaded
+        names
+            The names of pickles whose blobs are loaded for each batch
+        """
+        fits = self.fits
+        batch_size = batch_size or self.batch_size
+        for i in range(0, len(fits), batch_size):
+            batch = fits[i:i + batch_size]
+            m.Fit.preload(
+                batch,
+                trees=trees,
+                names=names
+            )
+            yield batch
+
     def __getitem__(self, item):
         return self.fits[0]
 
@@ -44,10 +79,16 @@ class AbstractAggregator(ABC):
         -------
         A list of objects, one for each fit
         """
+        trees = name in ("model", "instance")
         return [
             fit[name]
+            for batch
+            in self.batches(
+                trees=trees,
+                names=[] if trees else [name]
+            )
             for fit
-            in self
+            in batch
         ]
 
     def __len__(self):
@@ -88,12 +129,13 @@ class Aggregator(AbstractAggregator):
         self.session = session
         self.filename = filename
         self._fits = None
+        m.count_blob_references(session)
 
     @property
     def fits(self):
         if self._fits is None:
             self._fits = self._fits_for_query(
-                "SELECT id FROM fit"
+                "SELECT id FROM fit ORDER BY id"
             )
         return self._fits
 
@@ -101,16 +143,42 @@ class Aggregator(AbstractAggregator):
         return f"<{self.__class__.__name__} {self.filename}>"
 
     def __getattr__(self, name):
+        if name in m.SUMMARY_COLUMNS:
+            return q.SummaryAttribute(name)
         return q.Q(name)
 
-    def query(self, predicate: q.Q) -> ListAggregator:
+    @staticmethod
+    def parameter(path: str) -> q.ParameterAttribute:
+        """
+        The summary of a parameter of each fit, used to filter fits by the
+        median or bounds of the parameter without unpickling their samples.
+
+        Parameters
+        ----------
+        path
+            The path of the parameter in the model, e.g. galaxies.lens.centre
+        """
+        return q.ParameterAttribute(path)
+
+    def query(
+            self,
+            predicate: Optional[q.AbstractCondition] = None,
+            order_by: Optional[q.SummaryAttribute] = None,
+            reverse: bool = False
+    ) -> ListAggregator:
         """
-        Apply a query on the model.
+        Apply a query on the model and the summaries of each fit.
 
         Parameters
         ----------
         predicate
             A predicate constructed to express which models should be included.
+            If None every fit is included.
+        order_by
+            A summary column by which fits are ordered, e.g. aggregator.log_evidence.
+            Fits are ordered by id by default.
+        reverse
+            If True fits are ordered from the largest value
 
         Returns
         -------
@@ -128,15 +196,77 @@ class Aggregator(AbstractAggregator):
         >>>
         >>> aggregator.filter((lens.bulge == EllipticalCoreSersic) & (lens.disk == EllipticalSersic))
         >>> aggregator.filter((lens.bulge == EllipticalCoreSersic) | (lens.disk == EllipticalSersic))
+        >>>
+        >>> aggregator.query(
+        >>>     (aggregator.log_evidence > 100.0) & (aggregator.parameter("galaxies.lens.bulge.intensity") > 0.1),
+        >>>     order_by=aggregator.log_evidence,
+        >>>     reverse=True,
+        >>> )
         """
-        query = f"SELECT id FROM fit WHERE instance_id IN ({predicate.query})"
-
         return ListAggregator(
             self._fits_for_query(
-                query
+                self._query_string(
+                    predicate,
+                    order_by=order_by,
+                    reverse=reverse
+                )
             )
         )
 
+    @staticmethod
+    def _query_string(
+            predicate: Optional[q.AbstractCondition] = None,
+            order_by: Optional[q.SummaryAttribute] = None,
+            reverse: bool = False
+    ) -> str:
+        """
+        The SQL selecting the ids of fits which match the predicate.
+
+        A predicate on the model alone is matched against the instance of each
+        fit directly. Otherwise the instance is joined as the outermost object
+        so that conditions on the model and on the summaries of the fit can be
+        combined.
+        """
+        query = "SELECT f.id FROM fit AS f"
+        if isinstance(predicate, q.Q):
+            query = f"{query} WHERE f.instance_id IN ({predicate.query})"
+        elif predicate is not None:
+            query = f"{query} JOIN object AS o ON o.id = f.instance_id WHERE {predicate}"
+        if order_by is not None:
+            direction = " DESC" if reverse else ""
+            query = f"{query} ORDER BY f.{order_by.column}{direction}, f.id"
+        return query
+
+    def explain(self, predicate: q.AbstractCondition) -> str:
+        """
+        Describe how the database executes a query.
+
+        Parameters
+        ----------
+        predicate
+            A predicate constructed to express which models should be included.
+
+        Returns
+        -------
+        The SQL of the query followed by its query plan, one step per line.
+        Steps which SCAN a table rather than SEARCH an index are slow on
+        large databases.
+        """
+        query = self._query_string(
+            predicate
+        )
+        plan = self.session.execute(
+            f"EXPLAIN QUERY PLAN {query}"
+        )
+        return "\n".join([
+            query,
+            *[
+                row[-1]
+                for row
+                in plan
+            ]
+        ])
+
     def _fits_for_query(
             self,
             query: str
@@ -145,6 +275,9 @@ class Aggregator(AbstractAggregator):
         Execute a raw SQL query and return a Fit object
         for each Fit id returned by the query
 
+        Fits are loaded in batches so that the number of ids in
+        each query stays below the limit of the database.
+
         Parameters
         ----------
         query
@@ -155,26 +288,44 @@ class Aggregator(AbstractAggregator):
         A list of fit objects, one for each id returned by the
         query
         """
-        fit_ids = {
+        # Raw queries do not flush the session, unlike ORM queries
+        self.session.flush()
+        # Ids are kept in the order of the query
+        fit_ids = list(dict.fromkeys(
             row[0]
             for row
             in self.session.execute(
                 query
             )
-        }
-        return self.session.query(
-            m.Fit
-        ).filter(
-            m.Fit.id.in_(
-                fit_ids
+        ))
+        fits = list()
+        for i in range(0, len(fit_ids), self.batch_size):
+            fits.extend(
+                self.session.query(
+                    m.Fit
+                ).filter(
+                    m.Fit.id.in_(
+                        fit_ids[i:i + self.batch_size]
+                    )
+                )
             )
-        ).all()
+        positions = {
+            fit_id: position
+            for position, fit_id
+            in enumerate(fit_ids)
+        }
+        return sorted(
+            fits,
+            key=lambda fit: positions[fit.id]
+        )
 
     def add_directory(
             self,
             directory: str,
-            auto_commit=True
-    ):
+            auto_commit=True,
+            processes: int = 1,
+            batch_size: int = 100,
+    ) -> int:
         """
         Recursively search a directory for autofit results
         and add them to this database.
@@ -182,52 +333,39 @@ class Aggregator(AbstractAggregator):
         Any pickles found in the pickles file are implicitly added
         to the fit object.
 
-        Warnings
-        --------
-        If a directory is added twice then that will result in
-        duplicate entries in the database.
+        Each fit is recorded with its path and a hash of its pickles.
+        Fits that are already in the database are skipped, so adding
+        a directory again only adds fits that are new or have changed.
 
         Parameters
         ----------
         auto_commit
-            If True the session is committed writing the new objects
-            to the database
+            If True the session is committed after each batch, writing
+            the new objects to the database
         directory
             A directory containing autofit results embedded in a
             file structure
+        processes
+            The number of processes used to unpickle fits and convert
+            them into rows
+        batch_size
+            The number of fits written to the database in each batch
+
+        Returns
+        -------
+        The number of fits added
         """
-        aggregator = ClassicAggregator(
-            directory
+        added = ingest.ingest(
+            self.session,
+            ClassicAggregator(
+                directory
+            ),
+            processes=processes,
+            batch_size=batch_size,
+            auto_commit=auto_commit,
         )
-        for item in aggregator:
-            model = item.model
-            samples = item.samples
-            instance = samples.max_log_likelihood_instance
-            fit = m.Fit(
-                model=model,
-                instance=instance
-            )
-
-            pickle_path = item.pickle_path
-            for pickle_name in os.listdir(
-                    pickle_path
-            ):
-                with open(
-                        os.path.join(
-                            pickle_path,
-                            pickle_name
-                        ),
-                        "r+b"
-                ) as f:
-                    fit[pickle_name.replace(
-                        ".pickle",
-                        ""
-                    )] = f.read()
-            self.session.add(
-                fit
-            )
-        if auto_commit:
-            self.session.commit()
+        self._fits = None
+        return added
 
     @classmethod
     def from_database(
@@ -257,7 +395,89 @@ class Aggregator(AbstractAggregator):
         m.Base.metadata.create_all(
             engine
         )
+        _migrate(
+            engine
+        )
+        _create_indexes(
+            engine
+        )
         return Aggregator(
             session,
             filename
         )
+
+
+def _migrate(engine: Engine):
+    """
+    Bring a database created with an earlier schema up to date.
+
+    The schema version is stored as the sqlite user_version, which is 0
+    for databases that predate it. create_all creates missing tables but
+    leaves existing tables untouched so any column the schema has since
+    gained is added here. Those columns are nullable; summaries of fits
+    ingested before they existed are left empty.
+
+    Raises
+    ------
+    AggregatorException
+        If the database was created by a newer version of autofit
+    """
+    with engine.begin() as connection:
+        version, = connection.execute(
+            "PRAGMA user_version"
+        ).fetchone()
+        if version > m.schema_version:
+            raise exc.AggregatorException(
+                f"Database has schema version {version} but this version "
+                f"of autofit only supports up to {m.schema_version}"
+            )
+        if version == m.schema_version:
+            return
+
+        inspector = inspect(connection)
+        for table in m.Base.metadata.sorted_tables:
+            existing = {
+                column["name"]
+                for column
+                in inspector.get_columns(
+                    table.name
+                )
+            }
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(
+                    dialect=engine.dialect
+                )
+                connection.execute(
+                    f'ALTER TABLE "{table.name}" '
+                    f'ADD COLUMN "{column.name}" {column_type}'
+                )
+        connection.execute(
+            f"PRAGMA user_version = {m.schema_version}"
+        )
+
+
+def _create_indexes(engine: Engine):
+    """
+    Create any index declared by the schema that is missing from the
+    database.
+
+    create_all only creates the indexes of tables it creates so databases
+    made with an earlier schema would otherwise never be indexed.
+    """
+    inspector = inspect(engine)
+    table_names = inspector.get_table_names()
+    for table in m.Base.metadata.sorted_tables:
+        if table.name not in table_names:
+            continue
+        existing = {
+            index["name"]
+            for index
+            in inspector.get_indexes(
+                table.name
+            )
+        }
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
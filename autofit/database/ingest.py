@@ -0,0 +1,393 @@
+import hashlib
+import multiprocessing as mp
+import os
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import bindparam, inspect
+
+from autofit.aggregator.phase_output import PhaseOutput
+from . import model as m
+
+# Columns whose values are ids local to a flattened fit until the fit is written
+_ID_COLUMNS = ("id", "parent_id")
+
+Row = Tuple[str, dict]
+
+
+def read_pickles(pickle_path: str) -> List[Tuple[str, bytes]]:
+    """
+    The name and contents of every pickle in a pickles directory, sorted by name.
+    """
+    pickles = list()
+    for pickle_name in sorted(os.listdir(pickle_path)):
+        with open(os.path.join(pickle_path, pickle_name), "r+b") as f:
+            pickles.append((
+                pickle_name.replace(".pickle", ""),
+                f.read()
+            ))
+    return pickles
+
+
+def hash_pickles(pickles: Iterable[Tuple[str, bytes]]) -> str:
+    """
+    A hash of the content of a fit, used to recognise fits already in a database.
+    """
+    sha = hashlib.sha1()
+    for name, string in pickles:
+        sha.update(name.encode())
+        sha.update(len(string).to_bytes(8, "little"))
+        sha.update(string)
+    return sha.hexdigest()
+
+
+def flatten(obj: m.Object) -> List[Row]:
+    """
+    Flatten a tree of database objects into rows, parents before children.
+
+    Each object gives a row for every table of its class, e.g. the object table
+    and the value table for a Value. Ids are indices into the list of objects so
+    a fit can be flattened without a connection to the database.
+
+    Returns
+    -------
+    A list of (table name, row) pairs
+    """
+    rows = list()
+    count = 0
+    stack = [(obj, None)]
+    while stack:
+        obj, parent_id = stack.pop()
+        object_id = count
+        count += 1
+        for table in inspect(type(obj)).tables:
+            row = {
+                column.name: getattr(obj, column.name)
+                for column in table.columns
+                if column.name not in _ID_COLUMNS
+            }
+            row["id"] = object_id
+            if "parent_id" in table.columns:
+                row["parent_id"] = parent_id
+            rows.append((table.name, row))
+        stack.extend(
+            (child, object_id)
+            for child in reversed(obj.children)
+        )
+    return rows
+
+
+class FlatFit:
+    def __init__(
+            self,
+            path: str,
+            hash_: str,
+            model: List[Row],
+            instance: List[Row],
+            pickles: List[Tuple[str, str, bytes]],
+            summary: Optional[dict] = None,
+            parameters: Optional[List[dict]] = None,
+    ):
+        """
+        Everything needed to write a fit to the database as plain rows, so that
+        it can be created in a worker process and written in bulk.
+
+        Parameters
+        ----------
+        path
+            The directory of the fit's output
+        hash_
+            The hash of the fit's pickles
+        model
+            Rows describing the model that was fit
+        instance
+            Rows describing the maximum log likelihood instance
+        pickles
+            The name, hash and compressed contents of each pickle
+        summary
+            A value for each summary column of the fit
+        parameters
+            A row of the parameter_summary table for each parameter
+        """
+        self.path = path
+        self.hash = hash_
+        self.model = model
+        self.instance = instance
+        self.pickles = pickles
+        self.summary = summary or dict.fromkeys(m.SUMMARY_COLUMNS)
+        self.parameters = parameters or list()
+
+    @classmethod
+    def from_phase(
+            cls,
+            phase: PhaseOutput,
+            hash_: str,
+            pickles: List[Tuple[str, bytes]],
+    ) -> "FlatFit":
+        """
+        Unpickle the model and samples in a fit's output, flatten them and
+        extract their summaries.
+
+        Parameters
+        ----------
+        phase
+            The output of the fit
+        hash_
+            The hash of the fit's pickles
+        pickles
+            The name and contents of each of the fit's pickles
+        """
+        summary, parameters = m.summarise(
+            phase.samples,
+            phase.search
+        )
+        return FlatFit(
+            path=phase.directory,
+            hash_=hash_,
+            model=flatten(m.Object.from_object(
+                phase.model
+            )),
+            instance=flatten(m.Object.from_object(
+                phase.samples.max_log_likelihood_instance
+            )),
+            pickles=[
+                (name, m.hash_bytes(string), m.compress(string))
+                for name, string in pickles
+            ],
+            summary=summary,
+            parameters=parameters,
+        )
+
+
+def _flat_fit(arguments) -> Optional[FlatFit]:
+    """
+    Read and hash the pickles of a fit, then flatten the fit unless a fit with
+    the same path and hash is already in the database.
+    """
+    path, known_hashes = arguments
+    phase = PhaseOutput(path)
+    pickles = read_pickles(phase.pickle_path)
+    hash_ = hash_pickles(pickles)
+    if hash_ in known_hashes:
+        return None
+    return FlatFit.from_phase(phase, hash_, pickles)
+
+
+def flat_fits(
+        directories: List[Tuple[str, FrozenSet[str]]],
+        processes: int = 1
+) -> Iterator[Optional[FlatFit]]:
+    """
+    Read, hash, unpickle and flatten fits, in a pool of processes if more than
+    one is given, so that reading the output of fits is never done serially.
+
+    Parameters
+    ----------
+    directories
+        The path of each fit and the hashes of fits with that path which are
+        already in the database
+    processes
+        The number of processes used
+
+    Returns
+    -------
+    Each flattened fit, or None for a fit that is already in the database
+    """
+    if processes <= 1 or len(directories) <= 1:
+        for arguments in directories:
+            yield _flat_fit(arguments)
+        return
+
+    with mp.Pool(min(processes, len(directories))) as pool:
+        yield from pool.imap(_flat_fit, directories)
+
+
+class BulkWriter:
+    def __init__(self, session):
+        """
+        Writes flattened fits with one executemany per table.
+
+        Ids are allocated from the largest ids in the database when the writer is
+        created, so nothing else should write to the database while it is used.
+        """
+        self.session = session
+        self.tables = m.Base.metadata.tables
+        self.next_object_id = self._next_id("object")
+        self.next_fit_id = self._next_id("fit")
+        self.rows: Dict[str, List[dict]] = dict()
+        self.blobs: Dict[str, dict] = dict()
+
+    def _next_id(self, table: str) -> int:
+        return (self.session.execute(
+            f"SELECT MAX(id) FROM {table}"
+        ).scalar() or 0) + 1
+
+    def _add(self, table: str, row: dict):
+        self.rows.setdefault(table, list()).append(row)
+
+    def _add_object(self, rows: List[Row]) -> int:
+        offset = self.next_object_id
+        count = 0
+        for table, row in rows:
+            row = dict(row)
+            row["id"] += offset
+            count = max(count, row["id"] - offset + 1)
+            if row.get("parent_id") is not None:
+                row["parent_id"] += offset
+            self._add(table, row)
+        self.next_object_id += count
+        return offset
+
+    def add(self, fit: FlatFit):
+        """
+        Queue the rows of a fit to be written.
+        """
+        fit_id = self.next_fit_id
+        self.next_fit_id += 1
+        self._add("fit", {
+            "id": fit_id,
+            "model_id": self._add_object(fit.model),
+            "instance_id": self._add_object(fit.instance),
+            "path": fit.path,
+            "hash": fit.hash,
+            **fit.summary,
+        })
+        for parameter in fit.parameters:
+            self._add("parameter_summary", {
+                **parameter,
+                "fit_id": fit_id,
+            })
+        for name, hash_, data in fit.pickles:
+            self._add("pickle", {
+                "name": name,
+                "blob_hash": hash_,
+                "fit_id": fit_id,
+            })
+            if hash_ in self.blobs:
+                self.blobs[hash_]["count"] += 1
+            else:
+                self.blobs[hash_] = {"data": data, "count": 1}
+
+    def flush(self):
+        """
+        Insert every queued row. Tables are written in dependency order so that
+        an object is written before the rows which refer to it.
+        """
+        self._flush_blobs()
+        for table in m.Base.metadata.sorted_tables:
+            rows = self.rows.get(table.name)
+            if rows:
+                self.session.execute(table.insert(), rows)
+        self.rows = dict()
+
+    def _flush_blobs(self):
+        """
+        Insert blobs that are not yet stored and count the new references to
+        those that are.
+        """
+        hashes = list(self.blobs)
+        stored = set()
+        # Batched to stay below the limit on the number of parameters of a query
+        for i in range(0, len(hashes), 500):
+            stored.update(
+                hash_ for hash_, in self.session.query(
+                    m.Blob.hash
+                ).filter(
+                    m.Blob.hash.in_(hashes[i:i + 500])
+                )
+            )
+
+        table = self.tables["blob"]
+        new = [
+            {"hash": hash_, "data": blob["data"], "ref_count": blob["count"]}
+            for hash_, blob in self.blobs.items()
+            if hash_ not in stored
+        ]
+        if new:
+            self.session.execute(table.insert(), new)
+        existing = [
+            {"blob_hash": hash_, "count": blob["count"]}
+            for hash_, blob in self.blobs.items()
+            if hash_ in stored
+        ]
+        if existing:
+            self.session.execute(
+                table.update().where(
+                    table.c.hash == bindparam("blob_hash")
+                ).values(
+                    ref_count=table.c.ref_count + bindparam("count")
+                ),
+                existing
+            )
+        self.blobs = dict()
+
+
+def existing_fits(session) -> Dict[str, set]:
+    """
+    The hashes of fits in the database, by path.
+    """
+    existing = dict()
+    for path, hash_ in session.execute(
+            "SELECT path, hash FROM fit WHERE path IS NOT NULL"
+    ):
+        existing.setdefault(path, set()).add(hash_)
+    return existing
+
+
+def ingest(
+        session,
+        phases: Iterable[PhaseOutput],
+        processes: int = 1,
+        batch_size: int = 100,
+        auto_commit: bool = True,
+) -> int:
+    """
+    Add the output of each phase to the database, skipping any whose path and
+    content are already present.
+
+    Reading, hashing, unpickling and flattening is performed in a pool of
+    processes. Rows are written in batches, each in its own transaction if
+    auto_commit is True.
+
+    Parameters
+    ----------
+    session
+        A session connected to the database
+    phases
+        The output of each phase
+    processes
+        The number of processes used to unpickle and flatten fits
+    batch_size
+        The number of fits written in each batch
+    auto_commit
+        If True each batch is committed once written
+
+    Returns
+    -------
+    The number of fits added
+    """
+    existing = existing_fits(session)
+
+    directories = list()
+    for phase in phases:
+        path = os.path.abspath(phase.directory)
+        directories.append((path, frozenset(existing.get(path, ()))))
+
+    added = 0
+    writer = BulkWriter(session)
+    for fit in flat_fits(directories, processes=processes):
+        if fit is None or fit.hash in existing.get(fit.path, ()):
+            continue
+        existing.setdefault(fit.path, set()).add(fit.hash)
+        writer.add(fit)
+        added += 1
+        if added % batch_size == 0:
+            _write(session, writer, auto_commit)
+    _write(session, writer, auto_commit)
+
+    return added
+
+
+def _write(session, writer: BulkWriter, auto_commit: bool):
+    writer.flush()
+    if auto_commit:
+        session.commit()
@@ -2,3 +2,4 @@ from .fit import *
 from .instance import *
 from .model import *
 from .prior import *
+from .summary import *
@@ -1,11 +1,111 @@
+import hashlib
 import pickle
-from typing import List
+import zlib
+from collections import OrderedDict
+from typing import List, Iterable, Optional
 
-from sqlalchemy import Column, Integer, ForeignKey, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, ForeignKey, String, LargeBinary, UniqueConstraint, event, inspect, Float
+from sqlalchemy.orm import relationship, deferred, Session, object_session, selectinload, undefer
+from sqlalchemy.orm.attributes import set_committed_value
 
 from autofit import AbstractPriorModel
+from autofit.non_linear.abstract_search import NonLinearSearch
+from autofit.non_linear.samples import OptimizerSamples
 from .model import Base, Object
+from .summary import ParameterSummary, SUMMARY_COLUMNS, summarise
+
+
+class BlobCache:
+    def __init__(self, maxsize: int = 64):
+        """
+        Caches the decompressed bytes of blobs by their hash, discarding the least
+        recently used.
+
+        Fits in a campaign share pickles such as the dataset and mask so loading the
+        same pickle from many fits only reads and decompresses it once. Bytes rather
+        than objects are cached so that every load unpickles its own object, which the
+        caller is free to change.
+
+        Parameters
+        ----------
+        maxsize
+            The maximum number of objects held
+        """
+        self.maxsize = maxsize
+        self._values = OrderedDict()
+
+    def get(self, hash_: str, load):
+        """
+        The bytes with the given hash, calling load to read them if they are not cached.
+        """
+        try:
+            self._values.move_to_end(hash_)
+            return self._values[hash_]
+        except KeyError:
+            pass
+        value = load()
+        self._values[hash_] = value
+        if len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._values.clear()
+
+
+blob_cache = BlobCache()
+
+
+def hash_bytes(string: bytes) -> str:
+    return hashlib.sha1(string).hexdigest()
+
+
+def compress(string: bytes) -> bytes:
+    return zlib.compress(string)
+
+
+class Blob(Base):
+    """
+    The compressed bytes of a pickle, stored once however many fits it
+    belongs to
+    """
+
+    __tablename__ = "blob"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+    hash = Column(
+        String,
+        primary_key=True
+    )
+    # The number of pickles referring to this blob. The blob is deleted when
+    # no pickle refers to it.
+    ref_count = Column(
+        Integer,
+        default=0
+    )
+    # Deferred so that loading a blob does not load its data until it is used
+    data = deferred(Column(
+        LargeBinary
+    ))
+
+    @classmethod
+    def from_bytes(cls, string: bytes) -> "Blob":
+        return Blob(
+            hash=hash_bytes(string),
+            data=compress(string),
+            ref_count=0,
+        )
+
+    @property
+    def string(self) -> bytes:
+        """
+        The decompressed bytes
+        """
+        return zlib.decompress(
+            self.data
+        )
 
 
 class Pickle(Base):
@@ -14,6 +114,12 @@ class Pickle(Base):
     """
 
     __tablename__ = "pickle"
+    __table_args__ = (
+        UniqueConstraint(
+            "fit_id",
+            "name"
+        ),
+    )
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -26,8 +132,23 @@ class Pickle(Base):
     name = Column(
         String
     )
-    string = Column(
-        String
+    # The pickled bytes of pickles stored before pickles were stored as blobs
+    _string = Column(
+        "string",
+        LargeBinary
+    )
+    blob_hash = Column(
+        String,
+        ForeignKey(
+            "blob.hash"
+        ),
+        index=True
+    )
+    # Active history so the blob a pickle referred to is known when it changes
+    blob = relationship(
+        "Blob",
+        uselist=False,
+        active_history=True
     )
     fit_id = Column(
         Integer,
@@ -37,16 +158,43 @@ class Pickle(Base):
     )
     fit = relationship(
         "Fit",
-        uselist=False
+        uselist=False,
+        back_populates="pickles"
     )
 
+    @property
+    def string(self) -> bytes:
+        """
+        The pickled bytes
+        """
+        if self.blob is None:
+            return self._string
+        return self.blob.string
+
+    @string.setter
+    def string(self, string: bytes):
+        self._string = None
+        self.blob = Blob.from_bytes(
+            string
+        )
+
     @property
     def value(self):
         """
-        The unpickled object
+        The unpickled object. The bytes of blobs are cached by their hash, so
+        a blob is only read the first time it is loaded.
         """
+        # The blob is only loaded if it has been set or used since the pickle was loaded
+        hash_ = self.blob.hash if "blob" in self.__dict__ else self.blob_hash
+        if hash_ is None:
+            return pickle.loads(
+                self._string
+            )
         return pickle.loads(
-            self.string
+            blob_cache.get(
+                hash_,
+                lambda: self.string
+            )
         )
 
     @value.setter
@@ -64,11 +212,156 @@ class Fit(Base):
         primary_key=True,
     )
 
+    # The directory the fit was loaded from and a hash of its pickles, used to
+    # skip fits that have already been added
+    path = Column(
+        String,
+        index=True
+    )
+    hash = Column(
+        String
+    )
+
+    # Summaries of the samples and search, extracted when the fit is added so that
+    # fits can be filtered and ordered without unpickling their samples
+    log_evidence = Column(
+        Float,
+        index=True
+    )
+    max_log_likelihood = Column(
+        Float,
+        index=True
+    )
+    total_samples = Column(
+        Integer
+    )
+    run_time = Column(
+        Float
+    )
+    search_name = Column(
+        String,
+        index=True
+    )
+
+    parameter_summaries: List[ParameterSummary] = relationship(
+        "ParameterSummary",
+        cascade="all, delete-orphan",
+        back_populates="fit"
+    )
+
     def __init__(self, **kwargs):
         super().__init__(
             **kwargs
         )
 
+    def summarise(
+            self,
+            samples: Optional[OptimizerSamples] = None,
+            search: Optional[NonLinearSearch] = None
+    ):
+        """
+        Set the summary columns of this fit from its samples and search.
+
+        Parameters
+        ----------
+        samples
+            The samples of the fit. If None the summaries of the samples are unchanged.
+        search
+            The search that produced the samples. If None the search name is unchanged.
+        """
+        summary, parameters = summarise(
+            samples,
+            search
+        )
+        if search is not None:
+            self.search_name = summary["search_name"]
+        if samples is not None:
+            for name in SUMMARY_COLUMNS:
+                if name != "search_name":
+                    setattr(self, name, summary[name])
+            self.parameter_summaries = [
+                ParameterSummary(**parameter)
+                for parameter in parameters
+            ]
+
+    @classmethod
+    def preload(
+            cls,
+            fits: List["Fit"],
+            trees: bool = True,
+            names: Iterable[str] = ()
+    ):
+        """
+        Load the pickle names of many fits and, optionally, the trees of
+        their models and instances with a few queries rather than several
+        queries for each fit.
+
+        Parameters
+        ----------
+        fits
+            Fits loaded from one session
+        trees
+            If True the models and instances are loaded
+        names
+            The names of pickles whose blobs are loaded
+        """
+        if len(fits) == 0:
+            return
+        session = object_session(fits[0])
+        session.query(
+            Fit
+        ).options(
+            selectinload(Fit.pickles)
+        ).filter(
+            Fit.id.in_([
+                fit.id for fit in fits
+            ])
+        ).all()
+        names = list(names)
+        if len(names) > 0:
+            blobs = {
+                blob.hash: blob
+                for blob
+                in session.query(
+                    Blob
+                ).options(
+                    undefer(Blob.data)
+                ).join(
+                    Pickle
+                ).filter(
+                    Pickle.fit_id.in_([
+                        fit.id for fit in fits
+                    ]),
+                    Pickle.name.in_(names)
+                )
+            }
+            for fit in fits:
+                for pickle_ in fit.pickles:
+                    if pickle_.blob_hash in blobs and pickle_.name in names:
+                        set_committed_value(
+                            pickle_,
+                            "blob",
+                            blobs[pickle_.blob_hash]
+                        )
+        if trees:
+            roots = Object.load_trees(
+                session,
+                [fit.model_id for fit in fits]
+                + [fit.instance_id for fit in fits]
+            )
+            # The fits hold the loaded trees, which the session only references weakly
+            for fit in fits:
+                set_committed_value(
+                    fit,
+                    "_Fit__model",
+                    roots.get(fit.model_id)
+                )
+                set_committed_value(
+                    fit,
+                    "_Fit__instance",
+                    roots.get(fit.instance_id)
+                )
+
     @property
     def model(self) -> AbstractPriorModel:
         """
@@ -95,10 +388,19 @@ class Fit(Base):
             instance
         )
 
+    # Loading pickles loads only the name and hash of each
     pickles: List[Pickle] = relationship(
-        "Pickle"
+        "Pickle",
+        cascade="all, delete-orphan",
+        back_populates="fit"
     )
 
+    def _pickle(self, name: str) -> Optional[Pickle]:
+        for pickle_ in self.pickles:
+            if pickle_.name == name:
+                return pickle_
+        return None
+
     def __getitem__(self, item: str):
         """
         Retrieve an object that was a pickle
@@ -115,9 +417,9 @@ class Fit(Base):
         -------
         An unpickled object
         """
-        for p in self.pickles:
-            if p.name == item:
-                return p.value
+        pickle_ = self._pickle(item)
+        if pickle_ is not None:
+            return pickle_.value
         return getattr(
             self,
             item
@@ -132,7 +434,8 @@ class Fit(Base):
         Add a pickle.
 
         If a deserialised object is given then it is serialised
-        before being added to the database.
+        before being added to the database. Samples and searches also
+        set the summary columns of the fit.
 
         Parameters
         ----------
@@ -141,30 +444,35 @@ class Fit(Base):
         value
             A string, bytes or object
         """
-        new = Pickle(
-            name=key
-        )
+        new = self._pickle(key)
+        if new is None:
+            new = Pickle(
+                name=key
+            )
+            self.pickles.append(new)
+        if isinstance(
+                value,
+                str
+        ):
+            value = value.encode()
         if isinstance(
                 value,
-                (str, bytes)
+                bytes
         ):
             new.string = value
         else:
             new.value = value
-        self.pickles = [
-                           p
-                           for p
-                           in self.pickles
-                           if p.name != key
-                       ] + [
-                           new
-                       ]
+            if isinstance(value, OptimizerSamples):
+                self.summarise(samples=value)
+            if isinstance(value, NonLinearSearch):
+                self.summarise(search=value)
 
     model_id = Column(
         Integer,
         ForeignKey(
             "object.id"
-        )
+        ),
+        index=True
     )
     __model = relationship(
         "Object",
@@ -177,7 +485,8 @@ class Fit(Base):
         Integer,
         ForeignKey(
             "object.id"
-        )
+        ),
+        index=True
     )
     __instance = relationship(
         "Object",
@@ -185,3 +494,53 @@ class Fit(Base):
         backref="fit_instance",
         foreign_keys=[instance_id]
     )
+
+
+def count_blob_references(session: Session):
+    """
+    Count the references to blobs whenever a session is flushed, so that blobs
+    are shared by the pickles of its fits and deleted once no pickle refers to
+    them. This is done for the session of each aggregator rather than for every
+    session in the process.
+    """
+    if not event.contains(session, "before_flush", _count_blob_references):
+        event.listen(session, "before_flush", _count_blob_references)
+
+
+def _count_blob_references(session, flush_context, instances):
+    """
+    Replace new blobs by any blob already stored with the same hash, count
+    references from pickles that are new or changed and delete blobs which
+    are no longer referenced.
+    """
+    blobs = dict()
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty):
+            if not isinstance(obj, Pickle) or obj.fit is None:
+                continue
+            history = inspect(obj).attrs.blob.history
+            for blob in history.deleted:
+                if blob is not None:
+                    blob.ref_count -= 1
+            for blob in history.added:
+                if blob is None:
+                    continue
+                if blob.hash not in blobs:
+                    blobs[blob.hash] = session.query(Blob).get(blob.hash) or blob
+                stored = blobs[blob.hash]
+                if stored is not blob:
+                    obj.blob = stored
+                    if blob in session:
+                        session.expunge(blob)
+                stored.ref_count = (stored.ref_count or 0) + 1
+
+        for obj in list(session.deleted):
+            if isinstance(obj, Pickle) and obj.blob is not None:
+                obj.blob.ref_count -= 1
+
+        for obj in list(session.new):
+            if isinstance(obj, Blob) and not obj.ref_count:
+                session.expunge(obj)
+        for obj in list(session.dirty):
+            if isinstance(obj, Blob) and obj.ref_count <= 0:
+                session.delete(obj)
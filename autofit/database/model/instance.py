@@ -1,3 +1,4 @@
+import numpy as np
 from sqlalchemy import Column, Integer, String, ForeignKey, Float
 
 from .model import Object
@@ -24,7 +25,7 @@ class NoneInstance(Object):
 
 class Collection(Object):
     """
-    A tuple or list
+    A tuple, list or numpy array
     """
 
     __tablename__ = "collection"
@@ -57,14 +58,17 @@ class Collection(Object):
         return instance
 
     def __call__(self) -> tuple:
-        return self.cls([
+        items = [
             child()
             for child
             in sorted(
                 self.children,
                 key=lambda child: int(child.name)
             )
-        ])
+        ]
+        if issubclass(self.cls, np.ndarray):
+            return np.array(items)
+        return self.cls(items)
 
 
 class Instance(Object):
@@ -116,7 +120,10 @@ class Value(Object):
         primary_key=True,
     )
 
-    value = Column(Float)
+    value = Column(
+        Float,
+        index=True
+    )
 
     @classmethod
     def _from_object(
@@ -150,7 +157,10 @@ class StringValue(Object):
         primary_key=True,
     )
 
-    value = Column(String)
+    value = Column(
+        String,
+        index=True
+    )
 
     @classmethod
     def _from_object(
@@ -2,17 +2,21 @@ import builtins
 import importlib
 import inspect
 import re
-from typing import List, Tuple, Any, Iterable, Union, ItemsView
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Tuple, Any, Iterable, Union, ItemsView, Dict
 
-from sqlalchemy import Column, Integer, String, ForeignKey
+import numpy as np
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, Session, with_polymorphic
+from sqlalchemy.orm.attributes import set_committed_value
 
 import autofit as af
 
 Base = declarative_base()
 
-_schema_version = 1
+schema_version = 5
 
 
 class Object(Base):
@@ -31,7 +35,8 @@ class Object(Base):
         Integer,
         ForeignKey(
             "object.id"
-        )
+        ),
+        index=True
     )
     parent = relationship(
         "Object",
@@ -49,6 +54,15 @@ class Object(Base):
         'polymorphic_identity': 'object',
         'polymorphic_on': type
     }
+    # Queries match objects by name and select their parent_id so this
+    # index covers them without reading the table
+    __table_args__ = (
+        Index(
+            "ix_object_name_parent_id",
+            "name",
+            "parent_id"
+        ),
+    )
 
     def __repr__(self):
         return f"<{self.__class__.__name__} {self.name}>"
@@ -95,7 +109,7 @@ class Object(Base):
             instance = Value._from_object(
                 source
             )
-        elif isinstance(source, (tuple, list)):
+        elif isinstance(source, (tuple, list, np.ndarray)):
             from .instance import Collection
             instance = Collection._from_object(
                 source
@@ -118,12 +132,82 @@ class Object(Base):
         instance.name = name
         return instance
 
+    @classmethod
+    def load_trees(
+            cls,
+            session: Session,
+            ids: Iterable[int]
+    ) -> Dict[int, "Object"]:
+        """
+        Load the objects with the given ids and all of their descendants
+        with one query.
+
+        Descendants are found with a recursive query on parent_id and the
+        children of each object are attached in memory, so the trees can
+        be converted into models or instances without further queries.
+
+        Parameters
+        ----------
+        session
+            A session connected to the database
+        ids
+            The ids of the roots of the trees, e.g. the model ids of fits
+
+        Returns
+        -------
+        The root objects by id
+        """
+        ids = set(ids)
+        ids.discard(None)
+        if len(ids) == 0:
+            return dict()
+
+        tree = session.query(
+            Object.id
+        ).filter(
+            Object.id.in_(ids)
+        ).cte(
+            recursive=True
+        )
+        tree = tree.union_all(
+            session.query(
+                Object.id
+            ).filter(
+                Object.parent_id == tree.c.id
+            )
+        )
+
+        entity = with_polymorphic(Object, "*")
+        objects = session.query(
+            entity
+        ).filter(
+            entity.id.in_(
+                session.query(tree.c.id)
+            )
+        ).order_by(
+            entity.id
+        ).all()
+
+        children = defaultdict(list)
+        for obj in objects:
+            children[obj.parent_id].append(obj)
+        for obj in objects:
+            set_committed_value(
+                obj,
+                "children",
+                children[obj.id]
+            )
+
+        return {
+            obj.id: obj
+            for obj in objects
+            if obj.id in ids
+        }
+
     @property
     def _constructor_args(self):
-        return set(
-            inspect.getfullargspec(
-                self.cls
-            ).args[1:]
+        return constructor_args(
+            self.cls
         )
 
     def _make_instance(self) -> object:
@@ -177,51 +261,17 @@ class Object(Base):
             )
 
     class_path = Column(
-        String
+        String,
+        index=True
     )
 
-    @property
-    def _class_path_array(self) -> List[str]:
-        """
-        A list of strings describing the module and class of the
-        real object represented here
-        """
-        return self.class_path.split(".")
-
-    @property
-    def _class_name(self) -> str:
-        """
-        The name of the real class
-        """
-        return self._class_path_array[-1]
-
-    @property
-    def _module_path(self) -> str:
-        """
-        The path of the module containing the real class
-        """
-        return ".".join(self._class_path_array[:-1])
-
-    @property
-    def _module(self):
-        """
-        The module containing the real class
-        """
-        try:
-            return importlib.import_module(
-                self._module_path
-            )
-        except ValueError:
-            return builtins
-
     @property
     def cls(self) -> type:
         """
         The class of the real object
         """
-        return getattr(
-            self._module,
-            self._class_name
+        return get_class(
+            self.class_path
         )
 
     @cls.setter
@@ -234,3 +284,36 @@ def get_class_path(cls: type) -> str:
     The full import path of the type
     """
     return re.search("'(.*)'", str(cls))[1]
+
+
+@lru_cache(maxsize=None)
+def get_class(class_path: str) -> type:
+    """
+    The type with the given full import path, e.g. 'autofit.mock.mock.Gaussian'.
+
+    Classes are cached by path so that each module is only looked up once
+    however many objects there are.
+    """
+    *module_path, class_name = class_path.split(".")
+    try:
+        module = importlib.import_module(
+            ".".join(module_path)
+        )
+    except ValueError:
+        module = builtins
+    return getattr(
+        module,
+        class_name
+    )
+
+
+@lru_cache(maxsize=None)
+def constructor_args(cls: type) -> set:
+    """
+    The names of the arguments of the constructor of a class
+    """
+    return set(
+        inspect.getfullargspec(
+            cls
+        ).args[1:]
+    )
@@ -0,0 +1,143 @@
+from numbers import Real
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import Column, Integer, ForeignKey, String, Float, Index
+from sqlalchemy.orm import relationship
+
+from autofit.non_linear.samples import OptimizerSamples, PDFSamples
+from .model import Base
+
+# The sigma of the lower and upper bounds stored for each parameter, as
+# written to model.results
+SIGMA = 3.0
+
+# Columns of the fit table summarising its samples and search
+SUMMARY_COLUMNS = (
+    "log_evidence",
+    "max_log_likelihood",
+    "total_samples",
+    "run_time",
+    "search_name",
+)
+
+
+class ParameterSummary(Base):
+    """
+    The median and the bounds at SIGMA of one parameter of a fit
+    """
+
+    __tablename__ = "parameter_summary"
+    # Parameters are filtered by path and then compared by value
+    __table_args__ = (
+        Index(
+            "ix_parameter_summary_path_median",
+            "path",
+            "median"
+        ),
+    )
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+    id = Column(
+        Integer,
+        primary_key=True
+    )
+
+    fit_id = Column(
+        Integer,
+        ForeignKey(
+            "fit.id"
+        ),
+        index=True
+    )
+    fit = relationship(
+        "Fit",
+        uselist=False,
+        back_populates="parameter_summaries"
+    )
+
+    # The path of the parameter in the model, e.g. galaxies.lens.centre
+    path = Column(
+        String
+    )
+    median = Column(
+        Float
+    )
+    lower = Column(
+        Float
+    )
+    upper = Column(
+        Float
+    )
+
+
+def _seconds(time: Union[str, Real, None]) -> Optional[float]:
+    """
+    The number of seconds in a time written by a search's timer, which is
+    the string of a timedelta, e.g. '1 day, 0:09:26.121256'
+    """
+    if time is None or isinstance(time, Real):
+        return time
+    days = 0
+    if "day" in time:
+        day_string, time = time.split(",")
+        days = int(day_string.split()[0])
+    hours, minutes, seconds = time.split(":")
+    return 86400 * days + 3600 * int(hours) + 60 * int(minutes) + float(seconds)
+
+
+def summarise(
+        samples: Optional[OptimizerSamples] = None,
+        search=None
+) -> Tuple[dict, List[dict]]:
+    """
+    Extract the scalar summaries stored in the columns of a fit so that fits can be
+    filtered and ordered without unpickling their samples.
+
+    Parameters
+    ----------
+    samples
+        The samples of the fit
+    search
+        The search that produced the samples
+
+    Returns
+    -------
+    A value for each summary column of the fit and, if the samples describe a PDF,
+    a row of the parameter_summary table for each parameter of the model
+    """
+    summary = dict.fromkeys(
+        SUMMARY_COLUMNS
+    )
+    parameters = list()
+
+    if search is not None:
+        summary["search_name"] = search.paths.name
+
+    if samples is None:
+        return summary, parameters
+
+    summary["log_evidence"] = getattr(
+        samples,
+        "log_evidence",
+        None
+    )
+    summary["max_log_likelihood"] = samples.max_log_likelihood_sample.log_likelihood
+    summary["total_samples"] = samples.total_samples
+    summary["run_time"] = _seconds(samples.time)
+
+    if isinstance(samples, PDFSamples):
+        for path, median, (lower, upper) in zip(
+                samples.model.unique_prior_paths,
+                samples.median_pdf_vector,
+                samples.vector_at_sigma(SIGMA)
+        ):
+            parameters.append({
+                "path": ".".join(path),
+                "median": median,
+                "lower": lower,
+                "upper": upper,
+            })
+
+    return summary, parameters
@@ -1,4 +1,5 @@
 from .condition import (
+    AbstractCondition,
     NameCondition as N,
     ValueCondition as V,
     StringValueCondition as SV,
@@ -6,3 +7,4 @@ from .condition import (
 )
 from .junction import And, Or
 from .query import NamedQuery as Q
+from .summary import SummaryAttribute, ParameterAttribute
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Set
+from typing import Set, Dict, Optional
 
 from autofit.database.model import get_class_path
 
@@ -27,6 +27,21 @@ class Table:
         """
         return "".join(part[0] for part in self.name.split("_"))
 
+    def alias(
+            self,
+            aliases: Optional[Dict["Table", str]] = None
+    ) -> str:
+        """
+        The alias of this table in a query which may join the same table more
+        than once. Defaults to the abbreviation.
+        """
+        if aliases is None:
+            return self.abbreviation
+        return aliases.get(
+            self,
+            self.abbreviation
+        )
+
     def __str__(self):
         """
         Describes the table in the FROM or JOIN statement
@@ -49,6 +64,8 @@ class Table:
 object_table = Table("object")
 value_table = Table("value")
 string_value_table = Table("string_value")
+fit_table = Table("fit")
+parameter_summary_table = Table("parameter_summary")
 
 
 class AbstractCondition(ABC):
@@ -60,11 +77,22 @@ class AbstractCondition(ABC):
         """
 
     @abstractmethod
-    def __str__(self):
+    def sql(
+            self,
+            aliases: Optional[Dict[Table, str]] = None
+    ) -> str:
         """
         The condition written as SQL
+
+        Parameters
+        ----------
+        aliases
+            The alias of each table where it differs from the abbreviation
         """
 
+    def __str__(self):
+        return self.sql()
+
     def __and__(
             self,
             other:
@@ -140,11 +168,11 @@ class ValueCondition(AbstractValueCondition):
         """
         return {value_table}
 
-    def __str__(self) -> str:
+    def sql(self, aliases=None) -> str:
         """
         The condition in SQL
         """
-        return f"{value_table.abbreviation}.value {self.symbol} {self.value}"
+        return f"{value_table.alias(aliases)}.value {self.symbol} {self.value}"
 
 
 class StringValueCondition(AbstractValueCondition):
@@ -155,11 +183,11 @@ class StringValueCondition(AbstractValueCondition):
         """
         return {string_value_table}
 
-    def __str__(self):
+    def sql(self, aliases=None):
         """
         The condition in SQL
         """
-        return f"{string_value_table.abbreviation}.value {self.symbol} '{self.value}'"
+        return f"{string_value_table.alias(aliases)}.value {self.symbol} '{self.value}'"
 
 
 class NameCondition(AbstractCondition):
@@ -181,11 +209,11 @@ class NameCondition(AbstractCondition):
         """
         return {object_table}
 
-    def __str__(self):
+    def sql(self, aliases=None):
         """
         The condition in SQL
         """
-        return f"{object_table.abbreviation}.name = '{self.name}'"
+        return f"{object_table.alias(aliases)}.name = '{self.name}'"
 
 
 class TypeCondition(AbstractCondition):
@@ -207,11 +235,11 @@ class TypeCondition(AbstractCondition):
         """
         return {object_table}
 
-    def __str__(self):
+    def sql(self, aliases=None):
         """
         The condition in SQL
         """
-        return f"{object_table.abbreviation}.class_path = '{self.class_path}'"
+        return f"{object_table.alias(aliases)}.class_path = '{self.class_path}'"
 
     @property
     def class_path(self) -> str:
@@ -221,3 +249,101 @@ class TypeCondition(AbstractCondition):
         return get_class_path(
             self.cls
         )
+
+
+def _sql_value(value) -> str:
+    """
+    A value written as an SQL literal
+    """
+    if isinstance(value, str):
+        return f"'{value}'"
+    return str(value)
+
+
+class SummaryCondition(AbstractValueCondition):
+    def __init__(
+            self,
+            column: str,
+            symbol: str,
+            value
+    ):
+        """
+        A condition comparing a summary column of the fit table, e.g. log_evidence
+
+        Parameters
+        ----------
+        column
+            The name of the column
+        symbol
+            =, <=, >=, < or >
+        value
+            A string, int or float
+        """
+        super().__init__(
+            symbol,
+            value
+        )
+        self.column = column
+
+    @property
+    def tables(self):
+        """
+        Tables included in the condition string
+        """
+        return {fit_table}
+
+    def sql(self, aliases=None):
+        """
+        The condition in SQL
+        """
+        return f"{fit_table.alias(aliases)}.{self.column} {self.symbol} {_sql_value(self.value)}"
+
+
+class ParameterCondition(AbstractValueCondition):
+    def __init__(
+            self,
+            path: str,
+            column: str,
+            symbol: str,
+            value: float
+    ):
+        """
+        A condition comparing the summary of a parameter of the fit, e.g. the
+        median of galaxies.lens.centre
+
+        Parameters
+        ----------
+        path
+            The path of the parameter in the model
+        column
+            median, lower or upper
+        symbol
+            =, <=, >=, < or >
+        value
+            A float
+        """
+        super().__init__(
+            symbol,
+            value
+        )
+        self.path = path
+        self.column = column
+
+    @property
+    def tables(self):
+        """
+        Tables included in the condition string
+        """
+        return {fit_table}
+
+    def sql(self, aliases=None):
+        """
+        The condition in SQL
+        """
+        alias = parameter_summary_table.abbreviation
+        return (
+            f"{fit_table.alias(aliases)}.id IN ("
+            f"SELECT {alias}.fit_id FROM {parameter_summary_table} "
+            f"WHERE {alias}.path = '{self.path}' "
+            f"AND {alias}.{self.column} {self.symbol} {self.value})"
+        )
@@ -129,16 +129,17 @@ class AbstractJunction(AbstractCondition, ABC):
         SQL string used to conjoin queries
         """
 
-    def __str__(self) -> str:
+    def sql(self, aliases=None) -> str:
         """
         SQL string expressing combined query
         """
-        string = f" {self.join} ".join(map(
-            str,
-            sorted(
+        string = f" {self.join} ".join(
+            condition.sql(aliases)
+            for condition
+            in sorted(
                 self.conditions
             )
-        ))
+        )
         return f"({string})"
 
 
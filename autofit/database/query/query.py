@@ -1,9 +1,10 @@
 import inspect
 from numbers import Real
-from typing import Optional, Set
+from itertools import count
+from typing import Optional, Set, Tuple, List, Iterator
 
 import autofit.database.query.condition as c
-from autofit.database.query.junction import AbstractJunction
+from autofit.database.query.junction import AbstractJunction, And
 
 
 def _make_comparison(
@@ -106,39 +107,128 @@ class NamedQuery(c.AbstractCondition):
             f"'Aggregator' object has no attribute '{self.name}'"
         )
 
-    @property
-    def tables_string(self) -> str:
+    def _joinable(self) -> Tuple[List["NamedQuery"], List[c.AbstractCondition]]:
         """
-        A string found in the FROM component. Includes aliasing and join
-        statements if there is more than one table.
+        Split the child condition into named queries which can be joined into
+        the query of this object and other conditions.
 
-        Currently it is assumed that only the object table and up to one
-        further table are required to execute any given query.
+        A named query can be joined when it must hold for the object to match,
+        i.e. when it is the child condition or part of an And junction. Named
+        queries in an Or junction remain subqueries.
         """
-        tables = sorted(self.tables)
-        first = tables[0]
+        condition = self.other_condition
+        if condition is None:
+            return [], []
+        if isinstance(condition, NamedQuery):
+            return [condition], []
+        if isinstance(condition, And):
+            conditions = list(condition)
+            return [
+                       condition
+                       for condition
+                       in conditions
+                       if isinstance(condition, NamedQuery)
+                   ], [
+                       condition
+                       for condition
+                       in conditions
+                       if not isinstance(condition, NamedQuery)
+                   ]
+        return [], [condition]
+
+    def _join(
+            self,
+            counter: Iterator[int],
+            joins: List[str],
+            conditions: List[str],
+            parent_alias: Optional[str] = None
+    ):
+        """
+        Add the tables and conditions for this object and each joinable child
+        query.
 
-        string = str(first)
+        Each object in the path is joined to its parent through parent_id and
+        given its own aliases, e.g. o, o1, o2.
 
-        if len(tables) == 2:
-            second = tables[1]
-            string = f"{string} JOIN {second} ON {first.abbreviation}.id = {second.abbreviation}.id"
-        if len(tables) > 2:
-            raise AssertionError(
-                "Currently maximum of 2 tables supported"
+        Parameters
+        ----------
+        counter
+            Counts the objects joined into the query so aliases are unique
+        joins
+            The FROM and JOIN components of the query
+        conditions
+            Conditions which are combined with AND in the WHERE component
+        parent_alias
+            The alias of the parent object, or None if this is the outermost object
+        """
+        index = next(counter)
+        suffix = str(index) if index else ""
+        named_queries, others = self._joinable()
+        tables = {
+            table
+            for condition
+            in others
+            for table
+            in condition.tables
+        }
+        aliases = {
+            table: f"{table.abbreviation}{suffix}"
+            for table
+            in tables | {c.object_table}
+        }
+        object_alias = aliases[c.object_table]
+
+        if parent_alias is None:
+            joins.append(
+                f"{c.object_table.name} AS {object_alias}"
+            )
+        else:
+            joins.append(
+                f"JOIN {c.object_table.name} AS {object_alias} "
+                f"ON {object_alias}.parent_id = {parent_alias}.id"
+            )
+        for table in sorted(tables - {c.object_table}):
+            alias = aliases[table]
+            joins.append(
+                f"JOIN {table.name} AS {alias} ON {object_alias}.id = {alias}.id"
             )
 
-        return string
+        conditions.append(
+            c.NameCondition(
+                self.name
+            ).sql(aliases)
+        )
+        for condition in others:
+            conditions.append(
+                condition.sql(aliases)
+            )
+        for named_query in named_queries:
+            named_query._join(
+                counter,
+                joins,
+                conditions,
+                object_alias
+            )
 
     @property
     def query(self) -> str:
         """
         The SQL string produced by this query. This is applied directly to the database.
+
+        Objects in a path which must all match are joined rather than
+        nested in IN subqueries so that indexes on parent_id can be used.
         """
-        return f"SELECT parent_id FROM {self.tables_string} WHERE {self.condition}"
+        joins = list()
+        conditions = list()
+        self._join(
+            count(),
+            joins,
+            conditions
+        )
+        return f"SELECT o.parent_id FROM {' '.join(joins)} WHERE {' AND '.join(conditions)}"
 
-    def __str__(self):
-        return f"o.id IN ({self.query})"
+    def sql(self, aliases=None):
+        return f"{c.object_table.alias(aliases)}.id IN ({self.query})"
 
     def __getattr__(self, item: str):
         """
@@ -271,11 +361,14 @@ class NamedQuery(c.AbstractCondition):
         ):
             return NamedQuery(
                 self.name,
-                self.other_condition == other
+                self.other_condition._recursive_comparison(
+                    symbol,
+                    other
+                )
             )
 
         if isinstance(
-                self._condition,
+                self.other_condition,
                 AbstractJunction
         ):
             raise AssertionError(
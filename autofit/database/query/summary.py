@@ -0,0 +1,126 @@
+import autofit.database.query.condition as c
+
+
+class SummaryAttribute:
+    def __init__(self, column: str):
+        """
+        A summary column of the fit table, such as log_evidence, used to filter
+        and order fits without unpickling their samples.
+
+        e.g.
+        aggregator.log_evidence > 10.0
+
+        Parameters
+        ----------
+        column
+            The name of the column
+        """
+        self.column = column
+
+    def _comparison(
+            self,
+            symbol: str,
+            other
+    ) -> c.SummaryCondition:
+        return c.SummaryCondition(
+            self.column,
+            symbol,
+            other
+        )
+
+    def __eq__(self, other):
+        return self._comparison("=", other)
+
+    def __gt__(self, other):
+        return self._comparison(">", other)
+
+    def __ge__(self, other):
+        return self._comparison(">=", other)
+
+    def __lt__(self, other):
+        return self._comparison("<", other)
+
+    def __le__(self, other):
+        return self._comparison("<=", other)
+
+    def __hash__(self):
+        return hash(self.column)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.column}>"
+
+
+class ParameterAttribute:
+    def __init__(
+            self,
+            path: str,
+            column: str = "median"
+    ):
+        """
+        The summary of a parameter of each fit, compared by its median unless
+        lower or upper is specified.
+
+        e.g.
+        aggregator.parameter("galaxies.lens.centre") > 1.0
+        aggregator.parameter("galaxies.lens.centre").upper < 2.0
+
+        Parameters
+        ----------
+        path
+            The path of the parameter in the model
+        column
+            median, lower or upper
+        """
+        self.path = path
+        self.column = column
+
+    @property
+    def median(self) -> "ParameterAttribute":
+        return ParameterAttribute(self.path, "median")
+
+    @property
+    def lower(self) -> "ParameterAttribute":
+        """
+        The lower bound of the parameter at the sigma stored in the database
+        """
+        return ParameterAttribute(self.path, "lower")
+
+    @property
+    def upper(self) -> "ParameterAttribute":
+        """
+        The upper bound of the parameter at the sigma stored in the database
+        """
+        return ParameterAttribute(self.path, "upper")
+
+    def _comparison(
+            self,
+            symbol: str,
+            other: float
+    ) -> c.ParameterCondition:
+        return c.ParameterCondition(
+            self.path,
+            self.column,
+            symbol,
+            other
+        )
+
+    def __eq__(self, other):
+        return self._comparison("=", other)
+
+    def __gt__(self, other):
+        return self._comparison(">", other)
+
+    def __ge__(self, other):
+        return self._comparison(">=", other)
+
+    def __lt__(self, other):
+        return self._comparison("<", other)
+
+    def __le__(self, other):
+        return self._comparison("<=", other)
+
+    def __hash__(self):
+        return hash((self.path, self.column))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.path}.{self.column}>"
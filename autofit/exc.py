@@ -47,4 +47,12 @@ class AggregatorException(Exception):
 
 
 class GridSearchException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class JobException(Exception):
+    """
+    Exception raised when a job run on a worker process fails
+    """
+
+    pass
@@ -1,18 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import Callable, cast, Set, List, Dict, Optional
+from typing import Callable, cast, Set, List, Dict, Optional, Tuple
 
 import numpy as np
 
 from autofit import ModelInstance, Analysis, Paths
+from autofit import exc
 from autofit.graphical.expectation_propagation import AbstractFactorOptimiser
 from autofit.graphical.expectation_propagation import EPMeanField
 from autofit.graphical.expectation_propagation import EPOptimiser
 from autofit.graphical.factor_graphs.factor import Factor
 from autofit.graphical.factor_graphs.graph import FactorGraph
+from autofit.graphical.factor_graphs.multicall import Multicall
 from autofit.graphical.messages import NormalMessage
 from autofit.mapper.prior.prior import Prior
+from autofit.mapper.prior_model.plan import InstantiationPlan
 from autofit.mapper.prior_model.collection import CollectionPriorModel
 from autofit.mapper.prior_model.prior_model import PriorModel, AbstractPriorModel
+from autofit.non_linear.abstract_search import has_log_likelihood_function_batch
 
 
 class AbstractModelFactor(Analysis, ABC):
@@ -225,16 +229,18 @@ class AbstractModelFactor(Analysis, ABC):
         ])
 
 
-class ModelFactor(Factor, AbstractModelFactor):
+class ModelLikelihood:
     def __init__(
             self,
             prior_model: AbstractPriorModel,
-            analysis: Analysis,
-            optimiser: Optional[AbstractFactorOptimiser] = None
+            analysis: Analysis
     ):
         """
-        A factor in the graph that actually computes the likelihood of a model
-        given values for each variable that model contains
+        The function of a ModelFactor, which creates an instance of the prior
+        model and evaluates its likelihood.
+
+        This is a class rather than a closure so that the factor can be
+        pickled, e.g. to evaluate the likelihood over a ProcessMulticall.
 
         Parameters
         ----------
@@ -243,55 +249,213 @@ class ModelFactor(Factor, AbstractModelFactor):
         analysis
             A class that implements a function which evaluates how well an
             instance of the model fits some data
-        optimiser
-            A custom optimiser that will be used to fit this factor specifically
-            instead of the default optimiser
         """
         self.prior_model = prior_model
         self.analysis = analysis
-        self.optimiser = optimiser
 
-        prior_variable_dict = {
+        self.prior_variable_dict = {
             prior.name: prior
             for prior
             in prior_model.priors
         }
 
-        def _factor(
-                **kwargs: np.ndarray
-        ) -> float:
-            """
-            Returns an instance of the prior model and evaluates it, forming
-            a factor.
-
-            Parameters
-            ----------
-            kwargs
-                Arguments with names that are unique for each prior.
-
-            Returns
-            -------
-            Calculated likelihood
-            """
-            arguments = dict()
-            for name, array in kwargs.items():
-                prior_id = int(name.split("_")[1])
-                prior = prior_model.prior_with_id(
-                    prior_id
-                )
-                arguments[prior] = array
-            instance = prior_model.instance_for_arguments(
-                arguments
-            )
-            return analysis.log_likelihood_function(
+        self._plan_names = (None, (), False)
+
+    @property
+    def batched(self) -> bool:
+        """
+        Whether the likelihood of many samples is evaluated in a single call
+        to the analysis's log_likelihood_function_batch, which depends on the
+        current instantiation plan of the model.
+        """
+        plan = self.prior_model.instantiation_plan
+        if plan is None:
+            return False
+        self._names_for_plan(plan)
+        return self._plan_names[2]
+
+    def __call__(
+            self,
+            **kwargs: np.ndarray
+    ) -> float:
+        """
+        Returns an instance of the prior model and evaluates it, forming
+        a factor.
+
+        The instance is created by the instantiation plan of the model,
+        from the arguments ordered as the priors of the plan, unless the
+        model cannot be compiled.
+
+        Parameters
+        ----------
+        kwargs
+            Arguments with names that are unique for each prior.
+
+        Returns
+        -------
+        Calculated likelihood
+        """
+        plan = self.prior_model.instantiation_plan
+        if plan is None:
+            instance = self.prior_model.instance_for_arguments({
+                self.prior_variable_dict[name]: array
+                for name, array in kwargs.items()
+            })
+            return self.analysis.log_likelihood_function(
                 instance
             )
 
+        vector = [
+            kwargs[name]
+            for name in self._names_for_plan(plan)
+        ]
+        if self._plan_names[2] and any(
+                np.ndim(value) > 0
+                for value in vector
+        ):
+            return self._log_likelihood_batch(
+                plan, vector
+            )
+        instance = plan.instance_from_vector(
+            vector
+        )
+        return self.analysis.log_likelihood_function(
+            instance
+        )
+
+    def _names_for_plan(
+            self,
+            plan: InstantiationPlan
+    ) -> Tuple[str, ...]:
+        """
+        The names of the variables of this factor in the order of the priors
+        of an instantiation plan.
+
+        These are computed once for each plan, which is only compiled again
+        if the model changes, along with whether the plan can create
+        instances for many samples at once.
+        """
+        compiled, names, _ = self._plan_names
+        if compiled is not plan:
+            names = tuple(
+                prior.name
+                for prior in plan.priors
+            )
+            self._plan_names = (
+                plan,
+                names,
+                has_log_likelihood_function_batch(
+                    self.analysis
+                ) and plan.is_batchable
+            )
+        return names
+
+    def _log_likelihood_batch(
+            self,
+            plan: InstantiationPlan,
+            vector: List[np.ndarray]
+    ) -> np.ndarray:
+        """
+        Evaluate the likelihood of many samples in a single call to the
+        analysis's log_likelihood_function_batch.
+
+        Parameters
+        ----------
+        plan
+            The instantiation plan of the model
+        vector
+            Arrays of values for each prior of the plan, with one value for
+            each sample
+
+        Returns
+        -------
+        The log likelihood of each sample
+
+        Raises
+        ------
+        FitException
+            If any sample is outside of the prior limits or fails an assertion
+        """
+        shape = np.broadcast(*vector).shape
+        parameter_array = np.stack([
+            np.broadcast_to(value, shape)
+            for value in vector
+        ], axis=-1).reshape(-1, plan.prior_count)
+
+        if not np.all(plan.valid_mask(parameter_array)):
+            raise exc.FitException(
+                "Some samples are outside of the prior limits or fail an assertion"
+            )
+
+        instance = plan.instance_from_parameter_array(
+            parameter_array
+        )
+        return np.reshape(
+            self.analysis.log_likelihood_function_batch(
+                instance
+            ),
+            shape
+        )
+
+
+class ModelFactor(Factor, AbstractModelFactor):
+    def __init__(
+            self,
+            prior_model: AbstractPriorModel,
+            analysis: Analysis,
+            optimiser: Optional[AbstractFactorOptimiser] = None,
+            multicall: Optional[Multicall] = None,
+            name: str = "_factor"
+    ):
+        """
+        A factor in the graph that actually computes the likelihood of a model
+        given values for each variable that model contains
+
+        Parameters
+        ----------
+        prior_model
+            A model with some dimensionality
+        analysis
+            A class that implements a function which evaluates how well an
+            instance of the model fits some data
+        optimiser
+            A custom optimiser that will be used to fit this factor specifically
+            instead of the default optimiser
+        multicall
+            How the likelihood is evaluated for multiple samples if the analysis
+            does not evaluate them in a batch, e.g. over a pool of processes
+        name
+            The name of the factor
+        """
+        self.prior_model = prior_model
+        self.analysis = analysis
+        self.optimiser = optimiser
+
+        likelihood = ModelLikelihood(
+            prior_model,
+            analysis
+        )
         super().__init__(
-            _factor,
-            **prior_variable_dict
+            likelihood,
+            name=name,
+            multicall=multicall,
+            **likelihood.prior_variable_dict
         )
 
+    @property
+    def vectorised(self) -> bool:
+        """
+        Whether the likelihood is called once with every sample, which is
+        checked for each call as it depends on the current instantiation plan
+        of the model.
+        """
+        return self._factor.batched
+
+    @vectorised.setter
+    def vectorised(self, vectorised: bool):
+        # Factor sets this on construction, but it is decided by the likelihood
+        pass
+
     @property
     def model_factors(self) -> List["ModelFactor"]:
         return [self]
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from concurrent.futures import Executor
 from itertools import count
 from typing import (
     Dict, Tuple, Optional, List,
@@ -143,6 +144,28 @@ class EPMeanField(FactorGraph):
 
     project = project_factor_approx
 
+    def project_factors(
+            self,
+            factor_mean_field: Dict[Factor, MeanField],
+            status: Optional[Status] = None,
+    ) -> Tuple["EPMeanField", Optional[Status]]:
+        """
+        Replace the mean-field approximations of several factors at once,
+        e.g. with updates made in parallel from the same cavity distributions.
+
+        The updates are merged in the order of the factors of the graph, so
+        the result does not depend on the order in which they finished.
+        """
+        new_factor_mean_field = self.factor_mean_field
+        for factor in self.factor_graph.factors:
+            if factor in factor_mean_field:
+                new_factor_mean_field[factor] = factor_mean_field[factor]
+
+        new_approx = type(self)(
+            factor_graph=self._factor_graph,
+            factor_mean_field=new_factor_mean_field)
+        return new_approx, status
+
     @property
     def mean_field(self) -> MeanField:
         return MeanField.prod(
@@ -310,8 +333,37 @@ class EPHistory:
         return stop
 
 
+def _optimise_factor(
+        optimiser: AbstractFactorOptimiser,
+        factor: Factor,
+        model_approx: EPMeanField,
+) -> Tuple[MeanField, Status, AbstractFactorOptimiser]:
+    """
+    Update the approximation of a single factor, returning only its new
+    mean-field so that updates made in other processes are cheap to send
+    back. The optimiser is returned as well, as its state may have changed.
+    """
+    new_approx, status = optimiser.optimise(factor, model_approx)
+    return new_approx._factor_mean_field[factor], status, optimiser
+
+
 class EPOptimiser:
     """
+    Runs expectation propagation, updating the approximation of each
+    factor of the graph with its optimiser.
+
+    By default factors are updated one after another, each from the
+    approximation left by the previous update. If an executor is passed,
+    e.g. a `concurrent.futures.ThreadPoolExecutor` or
+    `ProcessPoolExecutor`, every factor is updated concurrently from the
+    same approximation and the updates are merged, as in parallel EP.
+    Updates are then damped by the delta of each factor's optimiser,
+    which usually needs to be less than 1 for parallel EP to converge.
+    With a process pool the optimisers, factors and approximation must
+    be picklable. Each factor is then given the copy of its optimiser
+    returned by the worker that updated it, so that state the optimiser
+    keeps for the factor, such as the whitening transforms of
+    `LaplaceFactorOptimiser`, carries over to the next update.
     """
 
     def __init__(
@@ -320,7 +372,8 @@ class EPOptimiser:
             default_optimiser: AbstractFactorOptimiser = None,
             factor_optimisers: Dict[Factor, AbstractFactorOptimiser] = None,
             callback: Optional[EPCallBack] = None,
-            factor_order: Optional[List[Factor]] = None
+            factor_order: Optional[List[Factor]] = None,
+            executor: Optional[Executor] = None,
     ):
         factor_optimisers = factor_optimisers or {}
         self.factor_graph = factor_graph
@@ -340,12 +393,16 @@ class EPOptimiser:
                 for factor in self.factors}
 
         self.callback = callback or EPHistory()
+        self.executor = executor
 
     def run(
             self,
             model_approx: EPMeanField,
             max_steps=100,
     ) -> EPMeanField:
+        if self.executor is not None:
+            return self._run_parallel(model_approx, max_steps)
+
         for _ in range(max_steps):
             for factor, optimiser in self.factor_optimisers.items():
                 model_approx, status = optimiser.optimise(factor, model_approx)
@@ -356,3 +413,32 @@ class EPOptimiser:
             break  # stop iterations
 
         return model_approx
+
+    def _run_parallel(
+            self,
+            model_approx: EPMeanField,
+            max_steps=100,
+    ) -> EPMeanField:
+        for _ in range(max_steps):
+            futures = [
+                (factor, self.executor.submit(
+                    _optimise_factor, optimiser, factor, model_approx))
+                for factor, optimiser in self.factor_optimisers.items()
+            ]
+            factor_mean_field = {}
+            statuses = {}
+            for factor, future in futures:
+                factor_mean_field[factor], statuses[factor], optimiser = future.result()
+                self.factor_optimisers[factor] = optimiser
+
+            model_approx, _ = model_approx.project_factors(factor_mean_field)
+
+            # every factor is passed to the callback so its history is complete
+            stop = [
+                self.callback(factor, model_approx, statuses[factor])
+                for factor in factor_mean_field
+            ]
+            if any(stop):
+                break  # callback controls convergence
+
+        return model_approx
@@ -6,6 +6,8 @@ from .factor import \
     AbstractFactor, Factor, DeterministicFactor
 from .jacobians import \
     FactorJacobian, DeterministicFactorJacobian
+from .multicall import \
+    Multicall, VectorisedMulticall, ThreadMulticall, ProcessMulticall
 from .graph import FactorGraph
 from .transform import \
     DiagonalTransform, CholeskyTransform, VariableTransform, \
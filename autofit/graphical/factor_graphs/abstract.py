@@ -282,6 +282,24 @@ class AbstractNode(ABC):
             frozenset(self.name_variable_dict.items()),
             frozenset(self._deterministic_variables),))
 
+    def _output_plates(
+            self, value: FactorValue
+    ) -> Optional[Dict[Optional[Variable], Tuple[Plate, ...]]]:
+        """
+        The plates of each axis of the log value, with key None, 
+        and of the deterministic values returned by this node. 
+
+        These are used by the numerical derivatives, which perturb 
+        the elements of a variable together if each element of the 
+        outputs only depends on the element of the variable with the 
+        same index of a shared plate. Outputs which are not returned 
+        are constant.
+
+        Returns None if any element of the outputs may depend on 
+        every element of the variables
+        """
+        return None
+
     _numerical_func_jacobian = numerical_func_jacobian
     _numerical_func_jacobian_hessian = numerical_func_jacobian_hessian
     func_jacobian = numerical_func_jacobian
@@ -293,10 +311,12 @@ class AbstractNode(ABC):
             variables: Optional[Tuple[Variable, ...]] = None,
             axis: Optional[Union[bool, int, Tuple[int, ...]]] = False, 
             _eps: float = 1e-6,
-            _calc_deterministic: bool = True ) -> JacobianValue:
+            _calc_deterministic: bool = True,
+            **kwargs) -> JacobianValue:
         return self.func_jacobian(
             values, variables, axis, 
-            _eps=_eps, _calc_deterministic=_calc_deterministic)[1]
+            _eps=_eps, _calc_deterministic=_calc_deterministic,
+            **kwargs)[1]
             
     def hessian(
             self, 
@@ -304,10 +324,12 @@ class AbstractNode(ABC):
             variables: Optional[Tuple[Variable, ...]] = None,
             axis: Optional[Union[bool, int, Tuple[int, ...]]] = False, 
             _eps: float = 1e-6,
-            _calc_deterministic: bool = True ) -> HessianValue:
+            _calc_deterministic: bool = True,
+            **kwargs) -> HessianValue:
         return self.func_jacobian_hessian(
             values, variables, axis, 
-            _eps=_eps, _calc_deterministic=_calc_deterministic)[2]
+            _eps=_eps, _calc_deterministic=_calc_deterministic,
+            **kwargs)[2]
 
     def flatten(self, param_shapes: FlattenArrays) -> 'FlattenedNode':
         return FlattenedNode(self, param_shapes)
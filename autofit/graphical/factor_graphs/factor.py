@@ -1,6 +1,6 @@
 from abc import ABC
 from inspect import getfullargspec
-from itertools import chain, repeat
+from itertools import chain
 from typing import \
     Tuple, Dict, Union, Set, NamedTuple, Callable, Optional
 from functools import lru_cache
@@ -11,7 +11,8 @@ from autofit.graphical.utils import \
     aggregate, Axis, cached_property
 from autofit.graphical.factor_graphs.abstract import \
     AbstractNode, FactorValue, JacobianValue
-from autofit.mapper.variable import Variable
+from autofit.graphical.factor_graphs.multicall import Multicall
+from autofit.mapper.variable import Variable, Plate
 
 
 class AbstractFactor(AbstractNode, ABC):
@@ -124,6 +125,10 @@ class Factor(AbstractFactor):
     is_scalar: optional, bool
         if true the factor returns a scalar value. Note if multiple arguments
         are passed then a vector will still be returned
+
+    multicall: optional, Multicall
+        how the function is called over multiple inputs if the factor 
+        is not vectorised, e.g. sequentially or over a pool of workers
         
     kwargs: Variables
         Variables for each keyword argument for the function
@@ -157,6 +162,7 @@ class Factor(AbstractFactor):
             name=None,
             vectorised=False,
             is_scalar=False,
+            multicall: Optional[Multicall] = None,
             **kwargs: Variable
     ):
         """
@@ -173,6 +179,7 @@ class Factor(AbstractFactor):
         """
         self.vectorised = vectorised
         self.is_scalar = is_scalar
+        self.multicall = multicall or Multicall()
         self._factor = factor
 
         args = getfullargspec(self._factor).args
@@ -205,12 +212,21 @@ class Factor(AbstractFactor):
         if self.is_scalar:
             if shift:
                 return np.sum(
-                    factor_val, axis=np.arange(1,np.ndim(factor_val)))
+                    factor_val, axis=tuple(range(1, np.ndim(factor_val))))
             else:
                 return np.sum(factor_val)
         else:
             return np.reshape(factor_val, shape)
 
+    def _output_plates(
+            self, value: FactorValue
+    ) -> Dict[Optional[Variable], Tuple[Plate, ...]]:
+        """
+        The function is called independently over the plates 
+        of the factor
+        """
+        return {None: () if self.is_scalar else self.plates}
+
     def _function_shape(
             self, 
             **kwargs: np.ndarray) -> Tuple[int, Tuple[int, ...]]:
@@ -342,22 +358,7 @@ class Factor(AbstractFactor):
             raise ValueError(
                 f"size mismatch first dimensions passed: {sizes}")
 
-        iter_kws = {
-            k: iter(a) if kw_lens[k] == dim0 else iter(repeat(a[0]))
-            for k, a in kwargs.items()}
-
-        # iterator to generate keyword arguments
-        def gen_kwargs():
-            for _ in range(dim0):
-                yield {
-                    k: next(a) for k, a in iter_kws.items()}
-
-        # TODO this loop can also be parallelised for increased performance
-        res = np.array([
-            self._factor(**kws)
-            for kws in gen_kwargs()])
-
-        return res
+        return self.multicall(self._factor, kwargs, dim0)
 
     # @accept_variable_dict
     def __call__(
@@ -449,6 +450,7 @@ class Factor(AbstractFactor):
         return DeterministicFactor(
             self._factor,
             other,
+            multicall=self.multicall,
             **self._kwargs
         )
 
@@ -516,6 +518,14 @@ class DeterministicFactor(Factor):
             variable
         }
 
+    def _output_plates(
+            self, value: FactorValue
+    ) -> Dict[Optional[Variable], Tuple[Plate, ...]]:
+        """
+        The log value of a deterministic factor is always zero
+        """
+        return {v: v.plates for v in self.deterministic_variables}
+
     def __call__(
             self,
             variable_dict: Dict[Variable, np.ndarray],
@@ -1,5 +1,5 @@
 
-from itertools import repeat, chain
+from itertools import chain
 from typing import \
     Tuple, Dict, List, Callable, Optional, Union
 from functools import reduce 
@@ -11,6 +11,7 @@ from autofit.graphical.factor_graphs.abstract import \
     FactorValue, JacobianValue
 from autofit.graphical.factor_graphs.factor import \
     AbstractFactor, Factor, DeterministicFactor
+from autofit.graphical.factor_graphs.multicall import Multicall
 from autofit.graphical.utils import \
     aggregate, Axis, cached_property
 
@@ -48,6 +49,10 @@ class FactorJacobian(Factor):
         if true the factor returns a scalar value. Note if multiple arguments
         are passed then a vector will still be returned
 
+    multicall: optional, Multicall
+        how the function is called over multiple inputs if the factor 
+        is not vectorised, e.g. sequentially or over a pool of workers
+
     kwargs: Variables
         Variables for each keyword argument for the function
     """
@@ -58,10 +63,12 @@ class FactorJacobian(Factor):
             name=None,
             vectorised=False,
             is_scalar=False, 
+            multicall: Optional[Multicall] = None,
             **kwargs: Variable
     ):
         self.vectorised = vectorised
         self.is_scalar = is_scalar
+        self.multicall = multicall or Multicall()
         self._factor = factor_jacobian
         AbstractFactor.__init__(
             self, 
@@ -144,28 +151,8 @@ class FactorJacobian(Factor):
             raise ValueError(
                 f"size mismatch first dimensions passed: {sizes}")
 
-        iter_kws = {
-            k: iter(a) if kw_lens[k] == dim0 else iter(repeat(a[0]))
-            for k, a in values.items()}
-
-        # TODO this loop can also be parallelised for increased performance
-        fjacs = [
-            self._factor(**{
-                    k: next(a) for k, a in iter_kws.items()}, 
-                    _variables=variables)
-             for _ in range(dim0)]
-        
-        if variables is None:
-            res = np.array([fjac for fjac in fjacs])
-            return res 
-        else:
-            res = np.array([fjac[0] for fjac in fjacs])
-            njac = len(fjacs[0][1])
-            jacs = tuple(
-                np.array([fjac[1][i] for fjac in fjacs])
-                for i in range(njac))
-
-            return res, jacs
+        return self.multicall(
+            self._factor, values, dim0, _variables=variables)
 
     def __call__(
             self,
@@ -244,6 +231,7 @@ class FactorJacobian(Factor):
         return DeterministicFactorJacobian(
             self._factor,
             other,
+            multicall=self.multicall,
             **self._kwargs
         )
 
@@ -286,6 +274,7 @@ class DeterministicFactorJacobian(FactorJacobian):
             variable: Variable,
             vectorised=False,
             is_scalar=False,
+            multicall: Optional[Multicall] = None,
             **kwargs: Variable
     ):
         
@@ -293,6 +282,7 @@ class DeterministicFactorJacobian(FactorJacobian):
             factor_jacobian,
             vectorised=vectorised,
             is_scalar=is_scalar, 
+            multicall=multicall,
             **kwargs
         )
         self._deterministic_variables = variable, 
@@ -0,0 +1,292 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterator, Optional
+
+import numpy as np
+
+from autofit.tools.statistics import StageStatistics
+
+logger = logging.getLogger(__name__)
+
+
+def _call(func: Callable, kwargs: dict, values: Dict[str, np.ndarray]):
+    return func(**values, **kwargs)
+
+
+def _stack(results: list):
+    """
+    Stacks the results of each call, stacking each element separately
+    if the function returns a tuple, e.g. a value and its jacobians
+    """
+    if isinstance(results[0], tuple):
+        return tuple(_stack(list(result)) for result in zip(*results))
+    return np.array(results)
+
+
+def _is_stacked(result, size: int) -> bool:
+    """
+    Whether every array in result has a leading dimension of length size
+    """
+    if isinstance(result, tuple):
+        return all(_is_stacked(r, size) for r in result)
+    shape = np.shape(result)
+    return len(shape) > 0 and shape[0] == size
+
+
+def _starts_with(result, first) -> bool:
+    """
+    Whether the first element of every array in result has the shape and
+    value of the corresponding array in first, the result of calling the
+    function with the first values alone
+    """
+    if isinstance(result, tuple):
+        return (
+                isinstance(first, tuple)
+                and len(result) == len(first)
+                and all(_starts_with(r, f) for r, f in zip(result, first))
+        )
+    return (
+            np.shape(result)[1:] == np.shape(first)
+            and np.allclose(result[0], first, equal_nan=True)
+    )
+
+
+class Multicall:
+    def __init__(self):
+        """
+        Calls a factor that is not vectorised once for each of multiple
+        values of its variables, stacked along their first dimension, e.g.
+        for each sample drawn by an ImportanceSampler.
+
+        This calls the factor sequentially. Subclasses batch the calls or
+        map them over a pool, and can be selected for each factor
+
+        >>> Factor(likelihood, x=x, multicall=ThreadMulticall(4))
+
+        The time spent in each multicall and the number of factor calls
+        are recorded,
+
+        >>> factor.multicall.dict()
+        {"calls": 10, "items": 2000, "total": 1.5, ...}
+
+        Multicalls which create a pool shut it down when closed, or
+        when used as a context manager
+
+        >>> with ProcessMulticall(4) as multicall:
+        ...     factor = Factor(likelihood, x=x, multicall=multicall)
+        """
+        self.statistics = StageStatistics()
+
+    def __call__(
+            self,
+            func: Callable,
+            values: Dict[str, np.ndarray],
+            size: int,
+            **kwargs
+    ):
+        """
+        Call func for each value of its arguments
+
+        Parameters
+        ----------
+        func
+            The function of the factor
+        values
+            The arguments of the function, each with a first dimension
+            of length size or 1, in which case the argument is repeated
+        size
+            The number of calls
+        kwargs
+            Arguments passed unchanged to every call
+
+        Returns
+        -------
+        The results of each call stacked along their first dimension
+        """
+        start = time.perf_counter()
+        result = self._call(func, values, size, kwargs)
+        self.statistics.add(time.perf_counter() - start, size)
+        return result
+
+    def _call(
+            self,
+            func: Callable,
+            values: Dict[str, np.ndarray],
+            size: int,
+            kwargs: dict
+    ):
+        return _stack(self._map(
+            partial(_call, func, kwargs),
+            self._iter_values(values, size)
+        ))
+
+    def _map(self, func: Callable, iterable: Iterator[dict]) -> list:
+        return list(map(func, iterable))
+
+    @staticmethod
+    def _iter_values(
+            values: Dict[str, np.ndarray],
+            size: int
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        for i in range(size):
+            yield {
+                k: a[i] if len(a) == size else a[0]
+                for k, a in values.items()
+            }
+
+    def dict(self) -> dict:
+        """
+        The timings of the calls made by this multicall
+        """
+        return self.statistics.dict()
+
+    def close(self):
+        """
+        Release any resources held by this multicall
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.dict()}>"
+
+
+class VectorisedMulticall(Multicall):
+    def __init__(self):
+        """
+        Tries calling the factor once with every value, as if it were
+        vectorised, and checks that every array returned has a first
+        dimension matching the number of values. The first time, the
+        result is also compared with calling the factor with the first
+        values alone, so that a factor which reduces over an axis that
+        happens to have the same length is not mistaken for vectorised.
+
+        If the call raises a TypeError, ValueError or IndexError, as
+        numpy does for arguments of the wrong shape, or returns the
+        wrong result the values are called sequentially, and are called
+        sequentially for every later call.
+        """
+        super().__init__()
+        self.vectorised = None
+
+    def _call(
+            self,
+            func: Callable,
+            values: Dict[str, np.ndarray],
+            size: int,
+            kwargs: dict
+    ):
+        if self.vectorised is not False:
+            try:
+                result = func(**values, **kwargs)
+            except (TypeError, ValueError, IndexError) as e:
+                logger.info(
+                    f"Calling {func} sequentially as it could not be "
+                    f"called with every value at once: {e}"
+                )
+            else:
+                if _is_stacked(result, size) and (
+                        self.vectorised or _starts_with(result, _call(
+                            func, kwargs, next(self._iter_values(values, size))
+                        ))
+                ):
+                    self.vectorised = True
+                    return result
+                logger.info(
+                    f"Calling {func} sequentially as calling it with every "
+                    f"value at once did not return a result for each value"
+                )
+            self.vectorised = False
+
+        return super()._call(func, values, size, kwargs)
+
+
+class PoolMulticall(Multicall, ABC):
+    def __init__(
+            self,
+            n_workers: Optional[int] = None,
+            executor: Optional[Executor] = None,
+            chunksize: int = 1
+    ):
+        """
+        Maps the calls over a pool of workers.
+
+        Parameters
+        ----------
+        n_workers
+            The number of workers of the pool created if no executor is passed
+        executor
+            An executor to map the calls over, which is not shut down by
+            this multicall. Otherwise a pool is created when first needed,
+            and shut down by close
+        chunksize
+            The number of calls sent to a worker at once, used by process pools
+        """
+        super().__init__()
+        self.n_workers = n_workers
+        self.chunksize = chunksize
+        self._executor = executor
+        self._owns_executor = False
+
+    @abstractmethod
+    def _make_executor(self) -> Executor:
+        """
+        Create the pool the calls are mapped over if no executor was passed
+        """
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._make_executor()
+            self._owns_executor = True
+        return self._executor
+
+    def close(self):
+        """
+        Shut down the pool if it was created by this multicall
+        """
+        if self._owns_executor:
+            self._executor.shutdown()
+            self._executor = None
+            self._owns_executor = False
+
+    def _map(self, func: Callable, iterable: Iterator[dict]) -> list:
+        return list(self.executor.map(
+            func, iterable, chunksize=self.chunksize
+        ))
+
+    def __getstate__(self):
+        # Executors cannot be pickled so a new pool is created when
+        # the factor is copied to another process
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        state["_owns_executor"] = False
+        return state
+
+
+class ThreadMulticall(PoolMulticall):
+    """
+    Maps the calls over a pool of threads, which only run in parallel
+    for factors which release the GIL, e.g. numpy or compiled code.
+    """
+
+    def _make_executor(self) -> Executor:
+        return ThreadPoolExecutor(self.n_workers)
+
+
+class ProcessMulticall(PoolMulticall):
+    """
+    Maps the calls over a pool of processes, for expensive factors
+    written in Python. The function of the factor and its arguments
+    must be picklable.
+    """
+
+    def _make_executor(self) -> Executor:
+        return ProcessPoolExecutor(self.n_workers)
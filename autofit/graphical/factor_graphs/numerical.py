@@ -1,20 +1,33 @@
-from typing import Tuple, Dict, NamedTuple, Optional, Union
+from concurrent.futures import Executor
+from typing import \
+    Tuple, Dict, Optional, Union, List, Callable, Iterable
 from functools import partial
 
 import numpy as np
 
-from autofit.mapper.variable import Variable
+from autofit.mapper.variable import Variable, Plate
 from autofit.graphical.utils import aggregate, Axis
 from autofit.graphical.factor_graphs.abstract import \
     FactorValue, JacobianValue, HessianValue
 
+# The outputs of a factor call, the log value is stored with the key None
+# and the values of the deterministic variables with their variable
+Outputs = Dict[Optional[Variable], np.ndarray]
+OutputPlates = Optional[Dict[Optional[Variable], Tuple[Plate, ...]]]
+
+# Methods of numerical differentiation
+methods = ("forward", "central", "complex")
+
+
 def numerical_func_jacobian(
         factor: "AbstractNode",
         values: Dict[Variable, np.array],
         variables: Optional[Tuple[Variable, ...]] = None,
-        axis: Axis = False, 
+        axis: Axis = False,
         _eps: float = 1e-6,
         _calc_deterministic: bool = True,
+        _method: str = "forward",
+        _executor: Optional[Executor] = None,
 ) -> Tuple[FactorValue, JacobianValue]:
     """Calculates the numerical Jacobian of the passed factor
 
@@ -25,6 +38,18 @@ def numerical_func_jacobian(
 
     _eps specifies the numerical accuracy of the numerical derivative
 
+    _method specifies the finite difference used,
+    'forward' uses (f(x + eps) - f(x))/eps,
+    'central' uses (f(x + eps) - f(x - eps))/2eps,
+    'complex' uses the complex step Im(f(x + i eps))/eps,
+    which requires that the factor can be called with complex values
+
+    The elements of a variable are perturbed together where the plates
+    of the factor show that its outputs only depend on one of them,
+    see `AbstractNode._output_plates`. If the factor is vectorised all
+    the perturbations of a variable are evaluated in a single call,
+    otherwise the calls are mapped over _executor if one is passed.
+
     returns a jac = JacobianValue namedtuple
 
     jac.log_value stores the Jacobian of the factor output as a dictionary
@@ -49,54 +74,23 @@ def numerical_func_jacobian(
     if variables is None:
         variables = factor.variables
 
-
     # copy the input array
-    p0 = {v: np.array(x, dtype=float) for v, x in values.items()}
+    p0 = {v: _as_array(x) for v, x in values.items()}
     f0 = factor(p0, axis=axis)
-    log_f0 = f0.log_value
-    det_vars0 = f0.deterministic_values
+    outputs0 = _outputs(f0, _calc_deterministic)
+    output_plates = factor._output_plates(f0)
 
-    fjac = {
-        v: FactorValue(np.empty(np.shape(log_f0) + np.shape(values[v])))
-        for v in variables}
-    if _calc_deterministic:
-        for v, grad in fjac.items():
-            grad.deterministic_values = {
-                det: np.empty(np.shape(val) + np.shape(values[v]))
-                for det, val in det_vars0.items()
-            }
-        det_slices = {
-            v: (slice(None),) * np.ndim(a) for v, a in det_vars0.items()}
-
-    for v, grad in fjac.items():
-        x0 = p0[v]
-        v_jac = grad.deterministic_values
-        if x0.shape:
-            inds = tuple(a.ravel() for a in np.indices(x0.shape))
-            i0 = tuple(slice(None) for _ in range(np.ndim(log_f0)))
-            for ind in zip(*inds):
-                x0[ind] += _eps
-                p0[v] = x0
-                f = factor(p0, axis=axis)
-                x0[ind] -= _eps
-
-                # print(ind)
-                grad[i0 + ind] = (f - f0) / _eps
-                if _calc_deterministic:
-                    det_vars = f.deterministic_values
-                    for det, val in det_vars.items():
-                        v_jac[det][det_slices[det] + ind] = \
-                            (val - det_vars0[det]) / _eps
-        else:
-            p0[v] += _eps
-            f = factor(p0, axis=axis)
-            p0[v] -= _eps
-
-            grad.itemset((f - f0) / _eps)
-            if _calc_deterministic:
-                det_vars = f.deterministic_values
-                for det, val in det_vars.items():
-                    v_jac[det] = (val - det_vars0[det]) / _eps
+    fjac = {}
+    for v in variables:
+        evaluate = partial(
+            _evaluate_factor, factor, p0, v,
+            axis=axis,
+            _calc_deterministic=_calc_deterministic,
+            _executor=_executor)
+        jacs = _finite_differences(
+            evaluate, p0[v], v.plates, outputs0, output_plates,
+            _method, _eps)
+        fjac[v] = FactorValue(jacs.pop(None), jacs)
 
     return f0, fjac
 
@@ -105,46 +99,66 @@ def numerical_func_jacobian_hessian(
         factor: "AbstractNode",
         values: Dict[Variable, np.array],
         variables: Optional[Tuple[Variable, ...]] = None,
-        axis: Optional[Union[bool, int, Tuple[int, ...]]] = False, 
+        axis: Optional[Union[bool, int, Tuple[int, ...]]] = False,
         _eps: float = 1e-6,
-        _calc_deterministic: bool = True
+        _calc_deterministic: bool = True,
+        _method: str = "forward",
+        _executor: Optional[Executor] = None,
 ) -> Tuple[FactorValue, JacobianValue, HessianValue]:
-    
+    """Calculates the numerical Hessian of the passed factor by
+    taking finite differences of its Jacobian
+
+    _method specifies the finite difference used for the Hessian,
+    see `numerical_func_jacobian`, for 'complex' the Jacobians are
+    calculated with central differences.
+
+    If _executor is passed the Jacobians of the perturbed values
+    are mapped over it.
+    """
     if variables is None:
         variables = factor.variables
 
-    # agg = partial(aggregate, axis=axis)
+    # the complex step can't be taken of complex values
+    jac_method = "central" if _method == "complex" else _method
 
-    p0 = {v: np.array(x, dtype=float) for v, x in values.items()}
-    f0, fjac0 = factor.func_jacobian(p0, variables, axis=axis)
-    # grad_f0, jac_det_vars0 = jac_f0
+    p0 = {v: _as_array(x) for v, x in values.items()}
+    f0, fjac0 = factor.func_jacobian(
+        p0, variables, axis=axis, _eps=_eps, _method=jac_method)
 
     log_f0 = f0.log_value
     det_vars0 = f0.deterministic_values
     f_shape = np.shape(log_f0)
     f_size = np.prod(f_shape, dtype=int)
-    fhess0 = {
-        v: np.empty(f_shape + np.shape(values[v]) * 2)
-        for v in variables}
+    output_plates = factor._output_plates(f0)
+    fhess0 = {}
 
     if _calc_deterministic:
         det_shapes = {v: d.shape for v, d in det_vars0.items()}
         for v in det_vars0:
             fhess0[v] = 0.
 
-    for v, hess in fhess0.items():
+    for v in variables:
         x0 = p0[v]
+        evaluate = partial(
+            _evaluate_jacobian, factor, p0, v,
+            axis=axis,
+            _executor=_executor,
+            _eps=_eps,
+            _method=jac_method)
+        if output_plates is None:
+            jac_plates = None
+        elif None in output_plates:
+            jac_plates = {None: output_plates[None] + v.plates}
+        else:
+            jac_plates = {}
+        fhess0[v] = hess = _finite_differences(
+            evaluate, x0, v.plates, {None: np.asarray(fjac0[v])},
+            jac_plates, _method, _eps)[None]
+
         if x0.shape:
             inds = tuple(a.ravel() for a in np.indices(x0.shape))
             i0 = tuple(slice(None) for _ in f_shape)
-            for ind in zip(*inds):
-                x0[ind] += _eps
-                p0[v] = x0
-                fjac1 = factor.jacobian(
-                    p0, (v,), axis=axis, _eps=_eps, _calc_deterministic=False)
-                x0[ind] -= _eps
-                hess[i0 + ind] = (fjac1[v] - fjac0[v])/_eps
-                
+
             # Symmetrise Hessian
             triu = np.triu_indices(x0.size, 1) # indices of upper diagonal
             i = tuple(ind[triu[0]] for ind in inds)
@@ -152,9 +166,9 @@ def numerical_func_jacobian_hessian(
             upper = i0 + i + j
             lower = i0 + j + i
             hess[upper] += hess[lower]
-            hess[upper] /= 2 
+            hess[upper] /= 2
             hess[lower] = hess[upper]
-            
+
             if _calc_deterministic:
                 var_size = x0.size
                 if f_shape:
@@ -174,20 +188,336 @@ def numerical_func_jacobian_hessian(
                         hess_d = np.linalg.multi_dot(
                             [jac, hess2d, jac.T])
                         fhess0[d] += hess_d.reshape(d_shape + d_shape)
-            
-        else:
-            p0[v] += _eps
-            fjac1 = factor.jacobian(
-                p0, (v,), axis=axis, _eps=_eps, _calc_deterministic=False)
-            p0[v] -= _eps
-            fhess0[v] = hess = (fjac1[v] - fjac0[v])/_eps
-            
-            if _calc_deterministic:
-                hess2d = hess.reshape(f_size, 1, 1)
-                for d, d_shape in det_shapes.items():
-                    jac = fjac0[v][d].reshape(np.prod(d_shape))
-                    fhess0[d] += (
-                        jac[:, None, None] 
-                        * jac[None, :, None] * hess[None, None, :])
+
+        elif _calc_deterministic:
+            hess2d = hess.reshape(f_size, 1, 1)
+            for d, d_shape in det_shapes.items():
+                jac = fjac0[v][d].reshape(np.prod(d_shape))
+                fhess0[d] += (
+                    jac[:, None, None]
+                    * jac[None, :, None] * hess[None, None, :])
 
     return f0, fjac0, fhess0
+
+
+def _as_array(value: np.ndarray) -> np.ndarray:
+    """copies value to an array of floats, or complex numbers
+    if the value is complex
+    """
+    value = np.asarray(value)
+    return np.array(value, dtype=np.result_type(value, float))
+
+
+def _outputs(
+        fval: FactorValue,
+        _calc_deterministic: bool = True
+) -> Outputs:
+    outputs = {None: np.asarray(fval)}
+    if _calc_deterministic:
+        outputs.update(fval.deterministic_values)
+    return outputs
+
+
+def _call_factor(
+        factor: "AbstractNode",
+        values: Dict[Variable, np.ndarray],
+        axis: Axis = False,
+        _calc_deterministic: bool = True,
+) -> Outputs:
+    return _outputs(factor(values, axis=axis), _calc_deterministic)
+
+
+def _call_jacobian(
+        factor: "AbstractNode",
+        values: Dict[Variable, np.ndarray],
+        variable: Variable,
+        axis: Axis = False,
+        **kwargs
+) -> Outputs:
+    jac = factor.jacobian(
+        values, (variable,), axis=axis, _calc_deterministic=False, **kwargs)
+    return {None: np.asarray(jac[variable])}
+
+
+def _map(
+        func: Callable,
+        iterable: Iterable,
+        executor: Optional[Executor] = None
+) -> list:
+    if executor is None:
+        return list(map(func, iterable))
+    return list(executor.map(func, iterable))
+
+
+def _evaluate_factor(
+        factor: "AbstractNode",
+        values: Dict[Variable, np.ndarray],
+        variable: Variable,
+        xs: List[np.ndarray],
+        axis: Axis = False,
+        _calc_deterministic: bool = True,
+        _executor: Optional[Executor] = None,
+) -> List[Outputs]:
+    """Calls the factor for each value in xs of variable
+    """
+    if _is_batchable(factor, values):
+        return _batch_call_factor(
+            factor, values, variable, xs, axis, _calc_deterministic)
+
+    call = partial(
+        _call_factor, factor,
+        axis=axis, _calc_deterministic=_calc_deterministic)
+    return _map(
+        call, ({**values, variable: x} for x in xs), _executor)
+
+
+def _evaluate_jacobian(
+        factor: "AbstractNode",
+        values: Dict[Variable, np.ndarray],
+        variable: Variable,
+        xs: List[np.ndarray],
+        axis: Axis = False,
+        _executor: Optional[Executor] = None,
+        **kwargs
+) -> List[Outputs]:
+    """Calculates the Jacobian of variable for each value in xs
+    """
+    call = partial(
+        _call_jacobian, factor, variable=variable, axis=axis, **kwargs)
+    return _map(
+        call, ({**values, variable: x} for x in xs), _executor)
+
+
+def _is_batchable(
+        factor: "AbstractNode",
+        values: Dict[Variable, np.ndarray],
+) -> bool:
+    """Whether the factor can be called with multiple values
+    of its variables stacked along a new first dimension
+    """
+    # checks the class so that wrapping nodes which pass
+    # attributes through to their node aren't batched
+    if not (getattr(factor, "vectorised", False) and
+            hasattr(type(factor), "_function_shape")):
+        return False
+    try:
+        shift, _ = factor._function_shape(
+            **factor.resolve_variable_dict(values))
+    except (ValueError, AssertionError):
+        return False
+    return shift == 0
+
+
+def _batch_call_factor(
+        factor: "AbstractNode",
+        values: Dict[Variable, np.ndarray],
+        variable: Variable,
+        xs: List[np.ndarray],
+        axis: Axis = False,
+        _calc_deterministic: bool = True,
+) -> List[Outputs]:
+    """Calls a vectorised factor once for all the values in xs
+    of variable, stacking the values of the variables along a
+    new first dimension.
+    """
+    n = len(xs)
+    batch = {
+        v: np.repeat(x[None], n, axis=0) for v, x in values.items()}
+    batch[variable] = np.stack(xs)
+    outputs = _call_factor(factor, batch, False, _calc_deterministic)
+
+    log_value = aggregate(
+        outputs[None], _batch_axis(axis, np.ndim(outputs[None])))
+    # deterministic factors return a log value that is not stacked
+    outputs[None] = np.broadcast_to(
+        log_value, (n,) + np.shape(log_value)[1:])
+
+    return [
+        {k: out[i] for k, out in outputs.items()} for i in range(n)]
+
+
+def _batch_axis(axis: Axis, ndim: int) -> Axis:
+    """Shifts axis to aggregate an array stacked along a new first
+    dimension
+    """
+    if axis is False:
+        return False
+    if axis is None:
+        return tuple(range(1, ndim))
+    if isinstance(axis, int):
+        axis = axis,
+    return tuple(a + 1 if a >= 0 else a for a in axis)
+
+
+def _independent_axes(
+        shape: Tuple[int, ...],
+        plates: Tuple[Plate, ...],
+        outputs: Outputs,
+        output_plates: OutputPlates,
+) -> Dict[int, Dict[Optional[Variable], int]]:
+    """Finds the axes of a variable along which each element only
+    affects the elements of the outputs with the same plate index.
+
+    Returns a dictionary mapping each of these axes to the matching
+    axis of each output that is not constant.
+    """
+    if output_plates is None or len(plates) != len(shape):
+        return {}
+
+    for k, out_plates in output_plates.items():
+        if len(out_plates) != np.ndim(outputs[k]):
+            return {}
+
+    independent = {}
+    for i, (plate, size) in enumerate(zip(plates, shape)):
+        if size < 2:
+            continue
+        axes = {}
+        for k, out_plates in output_plates.items():
+            if plate not in out_plates:
+                break
+            j = out_plates.index(plate)
+            if np.shape(outputs[k])[j] != size:
+                break
+            axes[k] = j
+        else:
+            independent[i] = axes
+
+    return independent
+
+
+def _perturb(
+        x0: np.ndarray,
+        index: tuple,
+        method: str,
+        eps: float
+) -> List[np.ndarray]:
+    if method == "complex":
+        x = x0.astype(complex)
+        x[index] += 1j * eps
+        return [x]
+
+    x = x0.copy()
+    x[index] += eps
+    if method == "forward":
+        return [x]
+
+    y = x0.copy()
+    y[index] -= eps
+    return [x, y]
+
+
+def _difference(
+        outputs: List[Outputs],
+        outputs0: Outputs,
+        method: str,
+        eps: float
+) -> Outputs:
+    if method == "forward":
+        f, = outputs
+        return {k: (f[k] - f0) / eps for k, f0 in outputs0.items()}
+    if method == "central":
+        f, g = outputs
+        return {k: (f[k] - g[k]) / (2 * eps) for k in outputs0}
+
+    f, = outputs
+    return {k: np.imag(f[k]) / eps for k in outputs0}
+
+
+def _scatter(
+        jac: np.ndarray,
+        delta: np.ndarray,
+        index: tuple,
+        axes: Dict[int, int]
+):
+    """Sets the derivatives of an output with respect to the
+    elements of a variable perturbed at index, where the variable
+    was perturbed along the axes of the variable in axes, which
+    map to the matching axes of the output
+    """
+    if not axes:
+        jac[(Ellipsis,) + index] = delta
+        return
+
+    shape = np.shape(delta)
+    coords = np.indices(shape).reshape(len(shape), -1)
+    var_index = tuple(
+        coords[axes[i]] if i in axes else np.full(coords.shape[1], j)
+        for i, j in enumerate(index))
+    jac[tuple(coords) + var_index] = np.ravel(delta)
+
+
+def _finite_differences(
+        evaluate: Callable[[List[np.ndarray]], List[Outputs]],
+        x0: np.ndarray,
+        plates: Tuple[Plate, ...],
+        outputs0: Outputs,
+        output_plates: OutputPlates,
+        method: str = "forward",
+        eps: float = 1e-6,
+) -> Outputs:
+    """Calculates the derivatives of the outputs of evaluate
+    with respect to each element of x0
+
+    Elements along axes of x0 whose plates are shared with all the
+    outputs are perturbed together, outputs that aren't in
+    output_plates are constant and have zero derivatives.
+    If output_plates is None every element is perturbed separately.
+
+    Parameters
+    ----------
+    evaluate
+        returns the outputs for each of a list of values of x
+    x0
+        the value to take the derivatives at
+    plates
+        the plates of the variable
+    outputs0
+        the outputs at x0
+    output_plates
+        the plates of each output
+    method
+        'forward', 'central' or 'complex'
+    eps
+        the size of the finite difference step
+
+    Returns
+    -------
+    the derivatives of each output, with shape
+    output.shape + x0.shape
+    """
+    if method not in methods:
+        raise ValueError(
+            f"method must be one of {methods}, passed {method}")
+
+    if output_plates is not None:
+        output_plates = {
+            k: p for k, p in output_plates.items() if k in outputs0}
+
+    independent = _independent_axes(
+        x0.shape, plates, outputs0, output_plates)
+    indexes = [
+        tuple(slice(None) if i in independent else j
+              for i, j in enumerate(index))
+        for index in np.ndindex(*(
+            1 if i in independent else n
+            for i, n in enumerate(x0.shape)))
+    ]
+    outputs = evaluate([
+        x for index in indexes for x in _perturb(x0, index, method, eps)])
+    step = len(outputs) // len(indexes)
+
+    jacs = {
+        k: np.zeros(
+            np.shape(f0) + x0.shape, dtype=np.result_type(f0, x0, float))
+        for k, f0 in outputs0.items()}
+    varying = outputs0 if output_plates is None else output_plates
+    for n, index in enumerate(indexes):
+        delta = _difference(
+            outputs[n * step: (n + 1) * step], outputs0, method, eps)
+        for k in varying:
+            _scatter(
+                jacs[k], delta[k], index,
+                {i: axes[k] for i, axes in independent.items()})
+
+    return jacs
@@ -64,6 +64,17 @@ class AbstractMessage(ABC):
         else:
             self.parameters = tuple(parameters)
 
+    def __getstate__(self):
+        # np.broadcast objects cannot be pickled, so the broadcast
+        # is made again from the parameters when unpickled
+        state = self.__dict__.copy()
+        del state["_broadcast"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._broadcast = np.broadcast(*self.parameters)
+
 
     def __iter__(self) -> Iterator[np.ndarray]:
         return iter(self.parameters)
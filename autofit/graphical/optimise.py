@@ -1,4 +1,5 @@
 from collections import defaultdict
+from functools import partial
 from itertools import repeat
 from typing import (
     Optional, Dict, Tuple, Any, List, Iterator
@@ -23,6 +24,7 @@ from autofit.graphical.factor_graphs import (
 )
 from autofit.graphical.factor_graphs.transform import (
     AbstractLine1DarTransform,
+    IdentityTransform,
     identity_transform,
     CovarianceTransform
 )
@@ -292,11 +294,12 @@ class LaplaceFactorOptimiser(AbstractFactorOptimiser):
         if initial_values:
             self.initial_values.update(initial_values)
 
-        self.transforms = defaultdict(lambda: identity_transform)
+        # defaults are not lambdas so the optimiser can be sent to other processes
+        self.transforms = defaultdict(IdentityTransform)
         if transforms:
             self.transforms.update(transforms)
 
-        self.deltas = defaultdict(lambda: 1)
+        self.deltas = defaultdict(partial(float, 1))
         if deltas:
             self.deltas.update(deltas)
 
@@ -1,9 +1,11 @@
 from abc import abstractmethod
-from collections import defaultdict
+from collections import defaultdict, deque
+from functools import partial
 from itertools import chain
 from typing import NamedTuple, Tuple, Dict, Optional, List
 
 import numpy as np
+from scipy.special import logsumexp
 
 from autofit.graphical.expectation_propagation import \
     (
@@ -14,9 +16,10 @@ from autofit.graphical.mean_field import \
     (
     MeanField, FactorApproximation, Status
 )
-from autofit.graphical.messages import map_dists
+from autofit.graphical.messages import map_dists, FixedMessage
 from autofit.graphical.messages.abstract import AbstractMessage
 from autofit.graphical.utils import add_arrays
+from autofit.mapper.variable import Variable
 
 
 class SamplingResult(NamedTuple):
@@ -69,20 +72,181 @@ def effective_sample_size(weights: np.ndarray, axis=None) -> np.ndarray:
     return np.sum(weights, axis=axis) ** 2 / np.square(weights).sum(axis=axis)
 
 
-class SamplingHistory(NamedTuple):
-    n_samples: int = 0
-    samples: List[SamplingResult] = list()
-    messages: tuple = ()
+class SampleBatch(NamedTuple):
+    """
+    The samples of a factor drawn from a proposal distribution, which 
+    are kept so they can be reweighted and reused
+    """
+    samples: Dict[Variable, np.ndarray]
+    det_variables: Dict[Variable, np.ndarray]
+    log_factor: np.ndarray
+    proposal_dist: Dict[Variable, AbstractMessage]
+    n_samples: int
+
+
+def _append(
+        array: Optional[np.ndarray],
+        n: int,
+        values: np.ndarray
+) -> np.ndarray:
+    """
+    Writes values to the rows of array after the first n, 
+    doubling the capacity of the array if it is full
+    """
+    size = n + len(values)
+    if array is None or size > len(array):
+        capacity = max(size, 0 if array is None else 2 * len(array))
+        grown = np.empty(
+            (capacity,) + np.shape(values)[1:],
+            dtype=np.result_type(values, *(() if array is None else (array,))))
+        if array is not None:
+            grown[:n] = array[:n]
+        array = grown
+
+    array[n:size] = values
+    return array
+
+
+class SampleBuffer:
+    def __init__(
+            self,
+            factor_approx: FactorApproximation,
+            proposals: List[Dict[Variable, AbstractMessage]]
+    ):
+        """
+        Holds the samples of a factor drawn from several proposal 
+        distributions in arrays which double in size when they are full, 
+        so that adding a batch doesn't copy all the previous samples.
+
+        The samples are weighted as if drawn from the mixture of the 
+        proposals, where each proposal is weighted by the fraction of the 
+        samples drawn from it. This means that samples drawn from the 
+        proposals of previous EP iterations can be reused, whilst the weights
+        stay bounded as long as the current proposal is one of the mixture.
+
+        Parameters
+        ----------
+        factor_approx
+            The factor approximation for which the samples are weighted
+        proposals
+            The distributions from which the samples are drawn
+        """
+        self.factor_approx = factor_approx
+        self.proposals = proposals
+        self.counts = np.zeros(len(proposals), dtype=int)
+        self.n_samples = 0
+
+        self._fixed = {}
+        self._samples = {}
+        self._det_variables = {}
+        self._shape = None
+        self._log_factor = None
+        self._log_measure = None
+        self._log_proposals = None
+
+    def _log_density(
+            self,
+            dists: Dict[Variable, AbstractMessage],
+            values: Dict[Variable, np.ndarray]
+    ) -> np.ndarray:
+        factor = self.factor_approx.factor
+        log_density = 0.
+        for res in map_dists(dists, values):
+            log_density = add_arrays(
+                log_density, factor.broadcast_variable(*res))
+        return log_density
+
+    def append(self, batch: SampleBatch, proposal: int):
+        """
+        Add a batch of samples
+
+        Parameters
+        ----------
+        batch
+            The samples
+        proposal
+            The index of the proposal from which the samples were drawn
+        """
+        n = self.n_samples
+        factor_approx = self.factor_approx
+
+        log_measure = add_arrays(
+            self._log_density(factor_approx.cavity_dist, batch.samples),
+            self._log_density(
+                factor_approx.deterministic_dist, batch.det_variables))
+        log_proposals = [
+            self._log_density(dist, batch.samples)
+            for dist in self.proposals]
+
+        if self._shape is None:
+            self._shape = np.shape(
+                batch.log_factor + log_measure + sum(log_proposals))[1:]
+
+        shape = (batch.n_samples,) + self._shape
+        self._log_factor = _append(
+            self._log_factor, n, np.broadcast_to(batch.log_factor, shape))
+        self._log_measure = _append(
+            self._log_measure, n, np.broadcast_to(log_measure, shape))
+        self._log_proposals = _append(
+            self._log_proposals, n, np.stack([
+                np.broadcast_to(log_propose, shape)
+                for log_propose in log_proposals], axis=1))
+
+        for v, x in batch.samples.items():
+            if isinstance(batch.proposal_dist.get(v), FixedMessage):
+                self._fixed[v] = x
+            else:
+                self._samples[v] = _append(self._samples.get(v), n, x)
+        for v, x in batch.det_variables.items():
+            self._det_variables[v] = _append(
+                self._det_variables.get(v), n, x)
+
+        self.counts[proposal] += batch.n_samples
+        self.n_samples += batch.n_samples
+
+    def result(self) -> SamplingResult:
+        """
+        The samples added so far and their weights
+        """
+        n = self.n_samples
+        with np.errstate(divide="ignore"):
+            log_fractions = np.log(self.counts / n).reshape(
+                (-1,) + tuple(1 for _ in self._shape))
+
+        log_factor = self._log_factor[:n]
+        log_measure = self._log_measure[:n]
+        log_propose = logsumexp(
+            self._log_proposals[:n] + log_fractions, axis=1)
+        log_weights = log_factor + log_measure - log_propose
+
+        assert np.isfinite(log_weights).all()
 
-    def __add__(self, other):
-        return SamplingHistory(*(
-            getattr(self, f) + getattr(other, f)
-            for f in self._fields))
+        return SamplingResult(
+            samples={
+                **{v: x[:n] for v, x in self._samples.items()},
+                **self._fixed},
+            det_variables={
+                v: x[:n] for v, x in self._det_variables.items()},
+            log_weights=log_weights,
+            log_factor=log_factor,
+            log_measure=log_measure,
+            log_propose=log_propose,
+            n_samples=n
+        )
+
+
+def _mean_effective_sample_size(log_weights: np.ndarray) -> float:
+    """
+    The effective sample size averaged over the plates of the factor,
+    where the weights are scaled by their maximum to avoid overflow
+    """
+    weights = np.exp(log_weights - np.max(log_weights, axis=0))
+    return effective_sample_size(weights, 0).mean()
 
 
 class AbstractSampler(AbstractFactorOptimiser):
     def __init__(self, delta=1., deltas=None, sample_kws=None):
-        self.deltas = defaultdict(lambda: delta)
+        self.deltas = defaultdict(partial(float, delta))
         if deltas:
             self.deltas.update(deltas)
 
@@ -118,152 +282,168 @@ class ImportanceSampler(AbstractSampler):
             n_resample: int = 100,
             min_n_eff: int = 100,
             max_samples: int = 1000,
+            min_batches: int = 2,
             force_sample: bool = True,
+            history_size: int = 3,
             delta: float = 1.,
             deltas=None,
             sample_kws=None,
     ):
-
+        """
+        Samples a factor approximation from its model distribution, 
+        drawing batches until the effective sample size is large enough.
+
+        Parameters
+        ----------
+        n_samples
+            The number of samples first drawn
+        n_resample
+            The smallest number of samples drawn when more samples are needed,
+            otherwise the number of samples drawn is estimated from the
+            effective sample size of each sample so far
+        min_n_eff
+            The effective sample size at which sampling stops
+        max_samples
+            Sampling stops once more than this many samples are drawn
+        min_batches
+            The number of batches of n_samples drawn before the stopping
+            criterion is checked against newly drawn samples
+        force_sample
+            If False the batches kept from previous calls for the factor are
+            reweighted and reused, only drawing new samples if their effective 
+            sample size is too small
+        history_size
+            The number of batches kept for each factor
+        """
         self.params = dict(
             n_samples=n_samples, n_resample=n_resample,
             min_n_eff=min_n_eff, max_samples=max_samples,
-            force_sample=force_sample)
-        self._history = defaultdict(SamplingHistory)
+            min_batches=min_batches, force_sample=force_sample)
+        self.history_size = history_size
+        self._history = defaultdict(partial(deque, maxlen=history_size))
 
         super().__init__(
             delta=delta, deltas=deltas, sample_kws=sample_kws)
 
-    def sample(self, factor_approx: "FactorApproximation", **kwargs) -> SamplingResult:
-        # Update default params 
-        params = {**self.params, **kwargs}
-        n_samples = params['n_samples']
-        messages = ()
-
-        factor = factor_approx.factor
-        cavity_dist = factor_approx.cavity_dist
-        deterministic_dist = factor_approx.deterministic_dist
+    @staticmethod
+    def proposal(
+            factor_approx: "FactorApproximation"
+    ) -> Dict[Variable, AbstractMessage]:
+        """
+        The distribution samples are drawn from, the model distribution
+        or the cavity distribution for variables it doesn't contain
+        """
         proposal_dist = factor_approx.model_dist
+        cavity_dist = factor_approx.cavity_dist
+        return {
+            v: proposal_dist.get(v, cavity_dist.get(v))
+            for v in factor_approx.factor.variables
+        }
 
+    def _draw(
+            self,
+            factor_approx: "FactorApproximation",
+            n_samples: int,
+            proposal_dist: Dict[Variable, AbstractMessage]
+    ) -> SampleBatch:
+        factor = factor_approx.factor
         samples = {
-            v: proposal_dist.get(
-                v,
-                cavity_dist.get(v)
-            ).sample(n_samples=n_samples)
-            for v in factor.variables
+            v: dist.sample(n_samples=n_samples)
+            for v, dist in proposal_dist.items()
         }
         fval = factor(samples)
         log_factor = fval + np.zeros(
             (n_samples,) + tuple(1 for _ in range(factor.ndim)))
 
-        sample = self._weight_samples(
-            factor, samples, fval.deterministic_values,
-            log_factor, cavity_dist,
-            deterministic_dist, proposal_dist, n_samples=n_samples)
+        batch = SampleBatch(
+            samples=samples,
+            det_variables=fval.deterministic_values,
+            log_factor=np.asarray(log_factor),
+            proposal_dist=proposal_dist,
+            n_samples=n_samples)
+        self._history[factor].append(batch)
+        return batch
 
-        self._history[factor] += SamplingHistory(n_samples, [sample], messages)
+    def sample(self, factor_approx: "FactorApproximation", **kwargs) -> SamplingResult:
+        # Update default params 
+        params = {**self.params, **kwargs}
+        proposal_dist = self.proposal(factor_approx)
 
-        return sample
+        buffer = SampleBuffer(factor_approx, [proposal_dist])
+        buffer.append(
+            self._draw(factor_approx, params['n_samples'], proposal_dist), 0)
+        return buffer.result()
 
-    def last_samples(self, factor):
-        samples = self._history[factor].samples
+    def last_samples(self, factor) -> Optional[SampleBatch]:
+        samples = self._history[factor]
         if samples:
             return samples[-1]
         return None
 
-    @staticmethod
-    def _weight_samples(
-            factor: "Factor",
-            samples: Dict[str, np.ndarray],
-            det_vars: Dict[str, np.ndarray],
-            log_factor: np.ndarray,
-            cavity_dist: Dict[str, AbstractMessage],
-            deterministic_dist: Dict[str, AbstractMessage],
-            proposal_dist: Dict[str, AbstractMessage],
-            n_samples: int
-    ) -> SamplingResult:
-
-        log_measure = 0.
-        for res in chain(map_dists(cavity_dist, samples),
-                         map_dists(deterministic_dist, det_vars)):
-            # for res in map_dists(cavity_dist, {**det_vars, **samples}):
-            log_measure = add_arrays(
-                log_measure, factor.broadcast_variable(*res))
-
-        log_propose = 0.
-        for res in map_dists(proposal_dist, samples):
-            log_propose = add_arrays(
-                log_propose, factor.broadcast_variable(*res))
-
-        log_weights = log_factor + log_measure - log_propose
-
-        assert np.isfinite(log_weights).all()
-
-        return SamplingResult(
-            samples=samples,
-            det_variables=det_vars,
-            log_weights=log_weights,
-            log_factor=log_factor,
-            log_measure=log_measure,
-            log_propose=log_propose,
-            n_samples=n_samples
-        )
-
-    def reweight_sample(
-            self,
-            factor_approx: "FactorApproximation",
-            sampling_result: SamplingResult
-    ) -> SamplingResult:
-        return self._weight_samples(
-            factor=factor_approx.factor,
-            samples=sampling_result.samples,
-            det_vars=sampling_result.det_variables,
-            log_factor=sampling_result.log_factor,
-            cavity_dist=factor_approx.cavity_dist,
-            deterministic_dist=factor_approx.deterministic_dist,
-            proposal_dist=factor_approx.model_dist,
-            n_samples=sampling_result.n_samples)
-
     def stop_criterion(self, sample: SamplingResult, **kwargs) -> bool:
         params = {**self.params, **kwargs}
-        ess = effective_sample_size(sample.weights, 0).mean()
-        n = len(sample.weights)
+        ess = _mean_effective_sample_size(sample.log_weights)
+        n = len(sample.log_weights)
 
         return ess > params['min_n_eff'] or n > params['max_samples']
 
+    def batch_size(self, sample: SamplingResult, **kwargs) -> int:
+        """
+        The number of samples to draw to reach min_n_eff, assuming new
+        samples have the same effective sample size per sample as the
+        samples so far
+        """
+        params = {**self.params, **kwargs}
+        ess = _mean_effective_sample_size(sample.log_weights)
+        n = len(sample.log_weights)
+
+        n_needed = np.ceil((params['min_n_eff'] - ess) * n / ess)
+        n_max = max(params['max_samples'] + 1 - n, params['n_resample'])
+        return int(np.clip(n_needed, params['n_resample'], n_max))
+
     def __call__(
             self,
             factor_approx: "FactorApproximation",
             **kwargs
     ) -> SamplingResult:
         """
+        Samples the factor approximation until the stopping criterion
+        is met. 
+
+        Unless force_sample is True, the batches kept from previous calls 
+        are reweighted for the current factor approximation first. New 
+        samples are drawn from the current proposal, min_batches batches of
+        n_samples and then as many as estimated from the effective sample 
+        size, and all the samples are weighted by the mixture of the 
+        proposals they were drawn from.
         """
         params = {**self.params, **kwargs}
-        samples = None
-        if params['force_sample']:
-            last_samples = None
-        else:
-            last_samples = self.last_samples(factor_approx.factor)
+        factor = factor_approx.factor
+        proposal_dist = self.proposal(factor_approx)
+
+        reused = [] if params['force_sample'] else list(self._history[factor])
+        buffer = SampleBuffer(
+            factor_approx, 
+            [batch.proposal_dist for batch in reused] + [proposal_dist])
+        for i, batch in enumerate(reused):
+            buffer.append(batch, i)
 
+        min_batches = max(params['min_batches'], 1)
+        n_samples = params['n_samples']
+        n_batches = 0
         while True:
-            if samples is None:
-                if last_samples is None:
-                    samples = self.sample(factor_approx)
-                else:
-                    # update weights of the sample for the new 
-                    # factor approximation
-                    samples = self.reweight_sample(factor_approx, last_samples)
-
-                    # test whether the updated weights satisfy the stopping
-                    # criterion
-                    if self.stop_criterion(samples):
-                        break
-                    else:
-                        # if not then resample
-                        last_samples = None
-            else:
-                samples = samples + self.sample(factor_approx)
-                if self.stop_criterion(samples):
+            if buffer.n_samples and (
+                    n_batches == 0 or n_batches >= min_batches):
+                samples = buffer.result()
+                if self.stop_criterion(samples, **kwargs):
                     break
+            if n_batches >= min_batches:
+                n_samples = self.batch_size(samples, **kwargs)
+
+            buffer.append(
+                self._draw(factor_approx, n_samples, proposal_dist),
+                len(reused))
+            n_batches += 1
 
         return samples
 
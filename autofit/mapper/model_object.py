@@ -1,4 +1,42 @@
 import itertools
+import weakref
+
+
+class Mutation:
+    """
+    Counts changes made to tracked priors and prior models.
+
+    Structures compiled from a model, such as an instantiation plan, track the
+    model and everything it contains, record the count at the time they were
+    compiled and are recompiled once it changes. Priors and prior models that
+    belong to no tracked model, such as those being built for a new model, can be
+    created and changed without invalidating anything.
+
+    The count is shared by every tracked model because a prior may belong to many
+    models. It is also per process, so it must not be compared between processes.
+    """
+    count = 0
+    _tracked = dict()
+
+    @classmethod
+    def register(cls, obj):
+        """
+        Record a change to an object, which is counted if the object is tracked
+        """
+        if id(obj) in cls._tracked:
+            cls.count += 1
+
+    @classmethod
+    def track(cls, obj):
+        """
+        Count every change subsequently made to an object, for as long as it exists
+        """
+        key = id(obj)
+        if key not in cls._tracked:
+            cls._tracked[key] = weakref.ref(
+                obj,
+                lambda _: cls._tracked.pop(key, None)
+            )
 
 
 class ModelObject:
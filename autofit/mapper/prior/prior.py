@@ -12,6 +12,7 @@ from autoconf import conf
 from autofit import exc
 from autofit.mapper.prior.arithmetic import ArithmeticMixin
 from autofit.mapper.prior.deferred import DeferredArgument
+from autofit.mapper.model_object import Mutation
 from autofit.mapper.prior_model.attribute_pair import (
     cast_collection,
     PriorNameValue,
@@ -76,6 +77,10 @@ class TuplePrior:
     A prior comprising one or more priors in a tuple
     """
 
+    def __setattr__(self, key, value):
+        Mutation.register(self)
+        super().__setattr__(key, value)
+
     @property
     @cast_collection(PriorNameValue)
     def prior_tuples(self):
@@ -176,6 +181,10 @@ class Prior(Variable, ABC, ArithmeticMixin):
                 "The upper limit of a prior must be greater than its lower limit"
             )
 
+    def __setattr__(self, key, value):
+        Mutation.register(self)
+        super().__setattr__(key, value)
+
     def assert_within_limits(self, value):
         if not (self.lower_limit <= value <= self.upper_limit):
             raise exc.PriorLimitException(
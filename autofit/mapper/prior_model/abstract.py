@@ -11,6 +11,7 @@ from autoconf import conf
 from autofit import exc
 from autofit.mapper import model
 from autofit.mapper.model import AbstractModel
+from autofit.mapper.model_object import ModelObject, Mutation
 from autofit.mapper.prior.deferred import DeferredArgument
 from autofit.mapper.prior.prior import GaussianPrior
 from autofit.mapper.prior.prior import TuplePrior, Prior, WidthModifier, Limits
@@ -22,30 +23,48 @@ from autofit.text import formatter as frm
 from autofit.text.formatter import TextFormatter
 
 
+def assert_assertions(assertions, arguments):
+    """
+    Raise a FitException if any of a list of assertions fails for a set of arguments.
+
+    Parameters
+    ----------
+    assertions
+        Assertions attached to a prior model
+    arguments
+        Dictionary mapping priors to physical values
+
+    Raises
+    ------
+    exc.FitException
+        If any assertion is False for the arguments
+    """
+    failed_assertions = [
+        assertion
+        for assertion
+        in assertions
+        if assertion is False or assertion is not True and not assertion.instance_for_arguments(
+            arguments
+        )
+    ]
+    number_of_failed_assertions = len(failed_assertions)
+    if number_of_failed_assertions > 0:
+        name_string = "\n".join([
+            assertion.name
+            for assertion
+            in failed_assertions
+            if hasattr(assertion, "name") and assertion.name is not None
+        ])
+        raise exc.FitException(
+            f"{number_of_failed_assertions} assertions failed!\n{name_string}"
+        )
+
+
 def check_assertions(func):
     @wraps(func)
     def wrapper(s, arguments):
         # noinspection PyProtectedMember
-        failed_assertions = [
-            assertion
-            for assertion
-            in s._assertions
-            if assertion is False or assertion is not True and not assertion.instance_for_arguments(
-                arguments
-            )
-        ]
-        number_of_failed_assertions = len(failed_assertions)
-        if number_of_failed_assertions > 0:
-            name_string = "\n".join([
-                assertion.name
-                for assertion
-                in failed_assertions
-                if hasattr(assertion, "name") and assertion.name is not None
-            ])
-            raise exc.FitException(
-                f"{number_of_failed_assertions} assertions failed!\n{name_string}"
-            )
-
+        assert_assertions(s._assertions, arguments)
         return func(s, arguments)
 
     return wrapper
@@ -63,6 +82,33 @@ class AbstractPriorModel(AbstractModel):
         super().__init__()
         self._assertions = list()
 
+    def __setattr__(self, key, value):
+        Mutation.register(self)
+        super().__setattr__(key, value)
+
+    def __delattr__(self, item):
+        Mutation.register(self)
+        super().__delattr__(item)
+
+    def track_mutations(self):
+        """
+        Track changes to this model and to every prior and prior model it contains,
+        so that structures compiled from the model are recompiled once any of them
+        changes.
+        """
+        tracked = set()
+        stack = [self]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, (list, tuple)):
+                stack.extend(obj)
+            elif isinstance(obj, dict):
+                stack.extend(obj.values())
+            elif isinstance(obj, (ModelObject, TuplePrior)) and id(obj) not in tracked:
+                tracked.add(id(obj))
+                Mutation.track(obj)
+                stack.extend(vars(obj).values())
+
     def add_assertion(self, assertion, name=None):
         """
         Assert that some relationship holds between physical values associated with
@@ -81,6 +127,7 @@ class AbstractPriorModel(AbstractModel):
             assertion.name = name
         except AttributeError:
             pass
+        Mutation.register(self)
         self._assertions.append(assertion)
 
     @property
@@ -241,6 +288,8 @@ class AbstractPriorModel(AbstractModel):
         values: [float]
             A vector with values output by priors
         """
+        if len(unit_vector) == self.prior_transform.prior_count:
+            return self.prior_transform.values_for_units(unit_vector).tolist()
         return list(
             map(
                 lambda prior_tuple, unit: prior_tuple.prior.value_for(unit),
@@ -249,6 +298,21 @@ class AbstractPriorModel(AbstractModel):
             )
         )
 
+    def vector_from_unit_array(self, unit_array) -> np.ndarray:
+        """
+        Map many unit hypercube vectors to physical values in a single vectorized pass.
+
+        Parameters
+        ----------
+        unit_array
+            An array of shape (n_points, n_parameters) of unit values ordered by prior id
+
+        Returns
+        -------
+        An array of shape (n_points, n_parameters) of physical values
+        """
+        return self.prior_transform.values_for_units(unit_array)
+
     def random_unit_vector_within_limits(self, lower_limit=0.0, upper_limit=1.0):
         """ Generate a random vector of unit values by drawing uniform random values between 0 and 1.
         Returns
@@ -273,7 +337,7 @@ class AbstractPriorModel(AbstractModel):
         while True:
 
             vector = self.vector_from_unit_vector(
-                list(np.random.uniform(low=lower_limit, high=upper_limit, size=self.prior_count))
+                np.random.uniform(low=lower_limit, high=upper_limit, size=self.prior_count)
             )
 
             try:
@@ -325,6 +389,11 @@ class AbstractPriorModel(AbstractModel):
         model_instance : autofit.mapper.model.ModelInstance
             An object containing reconstructed model_mapper instances
         """
+        if assert_priors_in_limits:
+            plan = self.instantiation_plan
+            if plan is not None and len(vector) == plan.prior_count:
+                return plan.instance_from_vector(vector)
+
         arguments = dict(
             map(
                 lambda prior_tuple, physical_unit: (prior_tuple.prior, physical_unit),
@@ -338,6 +407,31 @@ class AbstractPriorModel(AbstractModel):
             assert_priors_in_limits=assert_priors_in_limits
         )
 
+    @property
+    def instantiation_plan(self):
+        """
+        A plan compiled from the structure of this model which creates instances
+        directly from a vector of physical values.
+
+        The plan is cached and compiled again whenever any prior or prior model is
+        changed. None is returned if the model cannot be instantiated, for example
+        because it contains unpopulated promises.
+        """
+        from autofit.mapper.prior_model.plan import InstantiationPlan
+        return InstantiationPlan.for_model(self)
+
+    @property
+    def prior_transform(self):
+        """
+        Maps unit values to physical values and physical values to log priors for
+        many points at once, grouping priors by type.
+
+        The transform is cached and compiled again whenever any prior or prior model
+        is changed.
+        """
+        from autofit.mapper.prior_model.transform import PriorTransform
+        return PriorTransform.for_model(self)
+
     def mapper_from_partial_prior_arguments(self, arguments):
         """
         Returns a new model mapper from a dictionary mapping_matrix existing priors to
@@ -505,6 +599,8 @@ class AbstractPriorModel(AbstractModel):
         log_priors : []
             An list of the log prior value of every parameter.
         """
+        if len(vector) == self.prior_transform.prior_count:
+            return self.prior_transform.log_priors_for_values(vector).tolist()
         return list(
             map(
                 lambda prior_tuple, value: prior_tuple.prior.log_prior_from_value(value=value),
@@ -513,6 +609,21 @@ class AbstractPriorModel(AbstractModel):
             )
         )
 
+    def log_priors_from_array(self, array) -> np.ndarray:
+        """
+        Compute the log priors of every parameter of many points in a single vectorized pass.
+
+        Parameters
+        ----------
+        array
+            An array of shape (n_points, n_parameters) of physical values ordered by prior id
+
+        Returns
+        -------
+        An array of shape (n_points, n_parameters) of log prior values
+        """
+        return self.prior_transform.log_priors_for_values(array)
+
     def random_instance(self):
         """
         Returns a random instance of the model.
@@ -1,5 +1,6 @@
 from autofit import exc
 from autofit.mapper.model import ModelInstance
+from autofit.mapper.model_object import Mutation
 from autofit.mapper.prior.prior import Prior
 from autofit.mapper.prior_model.abstract import AbstractPriorModel
 from autofit.mapper.prior_model.abstract import check_assertions
@@ -124,6 +125,7 @@ class CollectionPriorModel(AbstractPriorModel):
     def remove(self, item):
         for key, value in self.__dict__.copy().items():
             if value == item:
+                Mutation.register(self)
                 del self.__dict__[key]
 
     @check_assertions
@@ -0,0 +1,481 @@
+import inspect
+import weakref
+from numbers import Number
+
+import numpy as np
+
+from autoconf import conf
+from autofit.mapper.model import ModelInstance
+from autofit.mapper.model_object import Mutation
+from autofit.mapper.prior.prior import Prior
+from autofit.mapper.prior.promise import Promise
+from autofit.mapper.prior_model.abstract import AbstractPriorModel, assert_assertions
+from autofit.mapper.prior_model.collection import CollectionPriorModel
+from autofit.mapper.prior_model.prior_model import PriorModel
+
+
+class NotCompilable(Exception):
+    """
+    Raised when some part of a model cannot be expressed in a plan
+    """
+
+
+class Call:
+    __slots__ = ("priors", "vector", "_arguments", "check_assertions")
+
+    def __init__(self, priors, vector, check_assertions=True):
+        """
+        The state of a single instantiation.
+
+        The dictionary mapping priors to values is only created if an assertion
+        or a delegated model requires it.
+
+        If check_assertions is False assertions are not evaluated. This is the case
+        when each value of the vector is an array of values for many points whose
+        assertions have already been checked.
+        """
+        self.priors = priors
+        self.vector = vector
+        self._arguments = None
+        self.check_assertions = check_assertions
+
+    @property
+    def arguments(self):
+        if self._arguments is None:
+            self._arguments = dict(zip(self.priors, self.vector))
+        return self._arguments
+
+
+class Constant:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, call):
+        return self.value
+
+
+class Index:
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
+    def __call__(self, call):
+        return call.vector[self.index]
+
+
+class UnitIndex:
+    __slots__ = ("prior", "index")
+
+    def __init__(self, prior, index):
+        """
+        A prior sitting directly in a collection. Collections pass the argument for
+        such a prior through the prior's value_for.
+        """
+        self.prior = prior
+        self.index = index
+
+    def __call__(self, call):
+        return self.prior.value_for(call.vector[self.index])
+
+
+class Tuple:
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = items
+
+    def __call__(self, call):
+        return tuple(item(call) for item in self.items)
+
+
+class Delegate:
+    __slots__ = ("model",)
+
+    def __init__(self, model):
+        """
+        A model that is not compiled and is instead instantiated by its own
+        instance_for_arguments method.
+        """
+        self.model = model
+
+    def __call__(self, call):
+        return self.model.instance_for_arguments(call.arguments)
+
+
+class PriorModelNode:
+    def __init__(self, cls, assertions, constructor_arguments, attributes):
+        """
+        Creates an instance of the class associated with a PriorModel.
+
+        Parameters
+        ----------
+        cls
+            The class or constructor function of the PriorModel
+        assertions
+            The list of assertions attached to the PriorModel
+        constructor_arguments
+            Pairs of argument names and nodes producing the argument values
+        attributes
+            Pairs of attribute names and nodes which are set on the instance if
+            it has no attribute with that name after construction
+        """
+        self.cls = cls
+        self.is_class = inspect.isclass(cls)
+        self.assertions = assertions
+        self.constructor_arguments = constructor_arguments
+        self.attributes = attributes
+
+    def __call__(self, call):
+        if self.assertions and call.check_assertions:
+            assert_assertions(self.assertions, call.arguments)
+
+        constructor_arguments = {
+            name: node(call)
+            for name, node in self.constructor_arguments
+        }
+
+        if self.is_class:
+            result = self.cls(**constructor_arguments)
+        else:
+            # noinspection PyProtectedMember
+            result = object.__new__(inspect._findclass(self.cls))
+            self.cls(result, **constructor_arguments)
+
+        for key, node in self.attributes:
+            if not hasattr(result, key):
+                try:
+                    setattr(result, key, node(call))
+                except AttributeError:
+                    pass
+
+        return result
+
+
+class CollectionNode:
+    def __init__(self, assertions, items):
+        """
+        Creates a ModelInstance from a CollectionPriorModel.
+
+        Parameters
+        ----------
+        assertions
+            The list of assertions attached to the collection
+        items
+            Pairs of attribute names and nodes producing their values
+        """
+        self.assertions = assertions
+        self.items = items
+
+    def __call__(self, call):
+        if self.assertions and call.check_assertions:
+            assert_assertions(self.assertions, call.arguments)
+
+        result = ModelInstance()
+        for key, node in self.items:
+            setattr(result, key, node(call))
+        return result
+
+
+class CompiledModel:
+    _compiled = dict()
+
+    @classmethod
+    def for_model(cls, model: AbstractPriorModel):
+        """
+        Retrieve the compiled structure for a model, compiling it if it does not exist
+        or any prior or prior model has been changed since it was compiled.
+
+        Compiled structures are held outside of the model so they are never copied or
+        pickled with it.
+
+        Returns
+        -------
+        The compiled structure or None if the model cannot be compiled
+        """
+        key = (cls, id(model))
+        try:
+            reference, count, compiled = cls._compiled[key]
+            if reference() is model and count == Mutation.count:
+                return compiled
+        except KeyError:
+            weakref.finalize(model, cls._compiled.pop, key, None)
+
+        model.track_mutations()
+        count = Mutation.count
+        try:
+            compiled = cls(model)
+        except NotCompilable:
+            compiled = None
+
+        cls._compiled[key] = (weakref.ref(model), count, compiled)
+        return compiled
+
+
+class InstantiationPlan(CompiledModel):
+    def __init__(self, model: AbstractPriorModel):
+        """
+        A compiled description of how a model is instantiated from a vector of physical
+        values.
+
+        Walking the model tree, ordering priors and inspecting constructors is done once
+        when the plan is compiled. Instantiation then indexes directly into the vector.
+
+        Whether prior limits are ignored is also read from the configuration when the
+        plan is compiled, so changing it afterwards does not affect the plan.
+
+        Parameters
+        ----------
+        model
+            The model from which the plan is compiled
+
+        Raises
+        ------
+        NotCompilable
+            If the model contains promises or priors that cannot be indexed
+        """
+        if model.promise_count > 0:
+            raise NotCompilable(
+                "Models with promises cannot be compiled"
+            )
+
+        self.priors = [
+            prior
+            for _, prior
+            in model.prior_tuples_ordered_by_id
+        ]
+        self.lower_limits = np.array([
+            prior.lower_limit
+            for prior
+            in self.priors
+        ])
+        self.upper_limits = np.array([
+            prior.upper_limit
+            for prior
+            in self.priors
+        ])
+        self.ignore_prior_limits = conf.instance["general"]["model"]["ignore_prior_limits"]
+        self._indices = {
+            prior: index
+            for index, prior
+            in enumerate(self.priors)
+        }
+
+        self.assertions = list()
+        self.delegate_count = 0
+
+        self.root = self._node_for_model(model)
+
+    @property
+    def prior_count(self):
+        return len(self.priors)
+
+    def instance_from_vector(self, vector):
+        """
+        Create an instance of the model from a vector of physical values ordered by
+        prior id, asserting that each value is within the limits of its prior.
+
+        Parameters
+        ----------
+        vector: [float]
+            A vector of physical parameter values
+
+        Returns
+        -------
+        An instance of the model
+        """
+        if not self.ignore_prior_limits:
+            self.assert_within_limits(vector)
+
+        return self.root(Call(
+            self.priors,
+            vector
+        ))
+
+    def assert_within_limits(self, vector):
+        """
+        Check every value of the vector against the limits of its prior at once,
+        falling back to checking priors individually to raise an informative exception.
+
+        Raises
+        ------
+        exc.PriorLimitException
+            If any value lies outside the limits of its prior
+        """
+        values = np.asarray(vector)
+        if values.dtype.kind in "biuf" and np.all(
+                (self.lower_limits <= values) & (values <= self.upper_limits)
+        ):
+            return
+        for prior, value in zip(self.priors, vector):
+            if isinstance(value, Number):
+                prior.assert_within_limits(value)
+
+    @property
+    def is_batchable(self) -> bool:
+        """
+        Can instances be created for many points at once? This is not the case if
+        any part of the model instantiates itself.
+        """
+        return self.delegate_count == 0
+
+    def valid_mask(self, parameter_array: np.ndarray) -> np.ndarray:
+        """
+        Check many points at once against the limits of the priors and the assertions
+        of the model.
+
+        Parameters
+        ----------
+        parameter_array
+            An array of shape (n_points, n_parameters) of physical values
+
+        Returns
+        -------
+        An array of booleans of length n_points which is True for valid points
+        """
+        parameter_array = np.asarray(parameter_array)
+        if self.ignore_prior_limits:
+            mask = np.ones(len(parameter_array), dtype=bool)
+        else:
+            mask = np.all(
+                (self.lower_limits <= parameter_array) & (parameter_array <= self.upper_limits),
+                axis=1
+            )
+
+        if len(self.assertions) > 0:
+            arguments = dict(zip(self.priors, parameter_array.T))
+            for assertion in self.assertions:
+                mask &= self._assertion_mask(assertion, arguments, parameter_array)
+
+        return mask
+
+    def _assertion_mask(self, assertion, arguments, parameter_array):
+        if assertion is True or assertion is False:
+            return assertion
+        try:
+            return np.broadcast_to(
+                np.asarray(assertion.instance_for_arguments(arguments), dtype=bool),
+                len(parameter_array)
+            )
+        except ValueError:
+            # The assertion cannot be evaluated for arrays, e.g. it combines
+            # comparisons with 'and'
+            return np.array([
+                bool(assertion.instance_for_arguments(
+                    dict(zip(self.priors, vector))
+                ))
+                for vector in parameter_array
+            ], dtype=bool)
+
+    def instance_from_parameter_array(self, parameter_array: np.ndarray):
+        """
+        Create a single instance of the model for many points, where the value of
+        each parameter is an array with one value for each point.
+
+        Limits and assertions are not checked; see valid_mask.
+
+        Parameters
+        ----------
+        parameter_array
+            An array of shape (n_points, n_parameters) of physical values
+
+        Returns
+        -------
+        A structure of arrays instance of the model
+        """
+        return self.root(Call(
+            self.priors,
+            list(np.asarray(parameter_array).T),
+            check_assertions=False,
+        ))
+
+    def _index(self, prior):
+        try:
+            return self._indices[prior]
+        except KeyError:
+            raise NotCompilable(
+                f"Prior {prior} is not one of the priors of the model"
+            )
+
+    def _node_for_model(self, model):
+        if (
+                type(model).instance_for_arguments is not AbstractPriorModel.instance_for_arguments
+        ):
+            return self._delegate(model)
+        # noinspection PyProtectedMember
+        method = type(model)._instance_for_arguments
+        if method is PriorModel._instance_for_arguments:
+            if model.is_deferred_arguments:
+                return self._delegate(model)
+            return self._node_for_prior_model(model)
+        if method is CollectionPriorModel._instance_for_arguments:
+            return self._node_for_collection(model)
+        return self._delegate(model)
+
+    def _delegate(self, model):
+        self.delegate_count += 1
+        return Delegate(model)
+
+    def _node_for_tuple_prior(self, tuple_prior):
+        return Tuple([
+            Index(self._index(item.prior)) if hasattr(item, "prior") else Constant(item.instance)
+            for item in sorted(
+                tuple_prior.prior_tuples + tuple_prior.instance_tuples,
+                key=lambda item: item.name
+            )
+        ])
+
+    def _node_for_prior_model(self, prior_model: PriorModel):
+        constructor_argument_names = prior_model.constructor_argument_names
+
+        constructor_arguments = {
+            key: Constant(value)
+            for key, value in prior_model.__dict__.items()
+            if key in constructor_argument_names
+        }
+        for name, tuple_prior in prior_model.tuple_prior_tuples:
+            constructor_arguments[name] = self._node_for_tuple_prior(tuple_prior)
+        for name, child in prior_model.direct_prior_model_tuples:
+            constructor_arguments[name] = self._node_for_model(child)
+        for name, prior in prior_model.direct_prior_tuples:
+            constructor_arguments[name] = Index(self._index(prior))
+
+        attributes = [
+            (
+                key,
+                self._node_for_model(value) if isinstance(value, PriorModel) else Constant(value)
+            )
+            for key, value in prior_model.__dict__.items()
+            if not isinstance(value, (Prior, Promise))
+        ]
+
+        # noinspection PyProtectedMember
+        self.assertions.extend(prior_model._assertions)
+        # noinspection PyProtectedMember
+        return PriorModelNode(
+            cls=prior_model.cls,
+            assertions=prior_model._assertions,
+            constructor_arguments=list(constructor_arguments.items()),
+            attributes=attributes,
+        )
+
+    def _node_for_collection(self, collection: CollectionPriorModel):
+        items = list()
+        for key, value in collection.__dict__.items():
+            if isinstance(value, AbstractPriorModel):
+                node = self._node_for_model(value)
+            elif isinstance(value, Prior):
+                node = UnitIndex(value, self._index(value))
+            else:
+                node = Constant(value)
+            items.append((key, node))
+
+        # noinspection PyProtectedMember
+        self.assertions.extend(collection._assertions)
+        # noinspection PyProtectedMember
+        return CollectionNode(
+            assertions=collection._assertions,
+            items=items
+        )
@@ -0,0 +1,148 @@
+from collections import defaultdict
+
+import numpy as np
+
+from autofit.mapper.prior.prior import GaussianPrior, LogUniformPrior, UniformPrior
+from autofit.mapper.prior_model.abstract import AbstractPriorModel
+from autofit.mapper.prior_model.plan import CompiledModel
+
+vectorized_types = (
+    UniformPrior,
+    LogUniformPrior,
+    GaussianPrior,
+)
+
+
+class PriorGroup:
+    def __init__(self, cls, indices, priors):
+        """
+        Every prior of one type in a model, with the attributes of those priors
+        stacked into arrays.
+
+        The value_for and log_prior_from_value methods of the prior class are
+        called with the group in place of a single prior so values for every
+        prior in the group are computed in one pass by broadcasting.
+
+        Parameters
+        ----------
+        cls
+            The type of the priors
+        indices
+            The index of each prior in a vector ordered by prior id
+        priors
+            The priors
+        """
+        self.cls = cls
+        self.indices = np.array(indices)
+        for key in priors[0].dict:
+            if key != "type":
+                setattr(self, key, np.array([
+                    getattr(prior, key)
+                    for prior in priors
+                ]))
+
+    def value_for(self, units: np.ndarray) -> np.ndarray:
+        return self.cls.value_for(self, units)
+
+    def log_prior_from_value(self, values: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(
+            self.cls.log_prior_from_value(self, values),
+            values.shape
+        )
+
+
+class PriorTransform(CompiledModel):
+    def __init__(self, model: AbstractPriorModel):
+        """
+        Maps arrays of unit values to physical values and physical values to log priors
+        for many points at once.
+
+        Priors are grouped by type so that each group is transformed with a single
+        numpy expression. Priors of any other type are transformed one value at a time.
+
+        Parameters
+        ----------
+        model
+            The model whose priors are used
+        """
+        priors = [
+            prior
+            for _, prior
+            in model.prior_tuples_ordered_by_id
+        ]
+        self.prior_count = len(priors)
+
+        grouped = defaultdict(list)
+        self.scalar_priors = list()
+        for index, prior in enumerate(priors):
+            if type(prior) in vectorized_types:
+                grouped[type(prior)].append((index, prior))
+            else:
+                self.scalar_priors.append((index, prior))
+
+        self.groups = [
+            PriorGroup(
+                cls,
+                indices=[index for index, _ in items],
+                priors=[prior for _, prior in items],
+            )
+            for cls, items in grouped.items()
+        ]
+
+    def _apply(self, array, method_name):
+        array = np.asarray(array, dtype="float64")
+        if array.size == 0:
+            array = array.reshape(0, self.prior_count)
+        if array.shape[-1] != self.prior_count:
+            raise ValueError(
+                f"Expected {self.prior_count} values per point but got {array.shape[-1]}"
+            )
+        array_2d = array.reshape(-1, self.prior_count)
+        result = np.empty_like(array_2d)
+
+        for group in self.groups:
+            result[:, group.indices] = getattr(group, method_name)(
+                array_2d[:, group.indices]
+            )
+        for index, prior in self.scalar_priors:
+            method = getattr(prior, method_name)
+            result[:, index] = [
+                method(value)
+                for value in array_2d[:, index]
+            ]
+
+        return result.reshape(array.shape)
+
+    def values_for_units(self, unit_array) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        unit_array
+            An array of shape (n_points, n_parameters) or (n_parameters,) of unit
+            hypercube values, ordered by prior id
+
+        Returns
+        -------
+        An array of the same shape of physical values
+        """
+        return self._apply(
+            unit_array,
+            "value_for",
+        )
+
+    def log_priors_for_values(self, array) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        array
+            An array of shape (n_points, n_parameters) or (n_parameters,) of physical
+            values, ordered by prior id
+
+        Returns
+        -------
+        An array of the same shape of the log prior of each value
+        """
+        return self._apply(
+            array,
+            "log_prior_from_value",
+        )
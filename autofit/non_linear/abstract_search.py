@@ -1,12 +1,14 @@
 import copy
+import functools
+import json
 import logging
 import multiprocessing as mp
 from os import path
 import os
 import pickle
 import shutil
+import time
 from abc import ABC, abstractmethod
-from time import sleep
 from typing import Dict
 
 import numpy as np
@@ -17,8 +19,13 @@ from autofit.mapper import model_mapper as mm
 from autofit.non_linear.initializer import Initializer
 from autofit.non_linear.log import logger
 from autofit.non_linear.paths import Paths, convert_paths
+from autofit.non_linear import profile
+from autofit.non_linear.pool import WorkerPool
+from autofit.non_linear.profile import profiler
+from autofit.non_linear.sample_log import SampleLog
 from autofit.non_linear import samples as samps
 from autofit.non_linear.timer import Timer
+from autofit.non_linear.update import UpdatePipeline
 from autofit.text import formatter
 from autofit.text import text_util
 
@@ -133,32 +140,119 @@ class NonLinearSearch(ABC):
 
         def fit_instance(self, instance):
 
-            log_likelihood = self.analysis.log_likelihood_function(instance=instance)
+            with profiler("log_likelihood_function"):
+                log_likelihood = self.analysis.log_likelihood_function(instance=instance)
 
             if self.log_likelihood_cap is not None:
                 if log_likelihood > self.log_likelihood_cap:
                     log_likelihood = self.log_likelihood_cap
 
+            self.update_max_log_likelihood(log_likelihood)
+
+            return log_likelihood
+
+        def update_max_log_likelihood(self, log_likelihood):
+
             if log_likelihood > self.max_log_likelihood:
 
                 if self.pool_ids is not None:
                     if mp.current_process().pid != min(self.pool_ids):
-                        return log_likelihood
+                        return
 
                 self.max_log_likelihood = log_likelihood
 
-            return log_likelihood
-
         def log_likelihood_from_parameters(self, parameters):
-            instance = self.model.instance_from_vector(vector=parameters)
+            with profiler("instance_from_vector"):
+                instance = self.model.instance_from_vector(vector=parameters)
             log_likelihood = self.fit_instance(instance)
             return log_likelihood
 
         def log_posterior_from_parameters(self, parameters):
             log_likelihood = self.log_likelihood_from_parameters(parameters=parameters)
-            log_priors = self.model.log_priors_from_vector(vector=parameters)
+            with profiler("log_priors"):
+                log_priors = self.model.log_priors_from_vector(vector=parameters)
             return log_likelihood + sum(log_priors)
 
+        @property
+        def is_batched(self) -> bool:
+            """
+            Can the log likelihoods of many points be computed in a single call? This requires that the analysis
+            implements log_likelihood_function_batch and that instances of the model can be created for many points
+            at once.
+            """
+            if not has_log_likelihood_function_batch(self.analysis):
+                return False
+            plan = self.model.instantiation_plan
+            return plan is not None and plan.is_batchable
+
+        def log_likelihoods_from_parameter_array(self, parameter_array):
+            """
+            Compute the log likelihoods of many points in parameter space.
+
+            If the fitness is batched every valid point is passed to the analysis's log_likelihood_function_batch in
+            one call, otherwise the log likelihood of each point is computed in turn.
+
+            Parameters
+            ----------
+            parameter_array : np.ndarray
+                An array of shape (n_points, n_parameters) of physical values.
+
+            Returns
+            -------
+            An array of the log likelihood of each point, which is NaN for points that are outside of the prior limits,
+            fail an assertion of the model or raise a FitException.
+            """
+            parameter_array = np.asarray(parameter_array, dtype="float64")
+            log_likelihoods = np.full(len(parameter_array), np.nan)
+
+            if not self.is_batched:
+                for index, parameters in enumerate(parameter_array):
+                    try:
+                        log_likelihoods[index] = self.log_likelihood_from_parameters(parameters=parameters)
+                    except exc.FitException:
+                        pass
+                return log_likelihoods
+
+            plan = self.model.instantiation_plan
+            valid = plan.valid_mask(parameter_array)
+
+            if not np.any(valid):
+                return log_likelihoods
+
+            total_valid = int(np.sum(valid))
+
+            with profiler("instance_from_parameter_array", items=total_valid):
+                instance = plan.instance_from_parameter_array(parameter_array[valid])
+
+            try:
+                with profiler("log_likelihood_function_batch", items=total_valid):
+                    valid_log_likelihoods = np.asarray(
+                        self.analysis.log_likelihood_function_batch(instance=instance), dtype="float64"
+                    )
+            except exc.FitException:
+                return log_likelihoods
+
+            if self.log_likelihood_cap is not None:
+                valid_log_likelihoods = np.minimum(valid_log_likelihoods, self.log_likelihood_cap)
+
+            log_likelihoods[valid] = valid_log_likelihoods
+
+            if not np.all(np.isnan(valid_log_likelihoods)):
+                self.update_max_log_likelihood(np.nanmax(valid_log_likelihoods))
+
+            return log_likelihoods
+
+        def log_posteriors_from_parameter_array(self, parameter_array):
+            """
+            Compute the log posteriors of many points in parameter space, which are NaN for invalid points (see
+            log_likelihoods_from_parameter_array).
+            """
+            parameter_array = np.asarray(parameter_array, dtype="float64")
+            log_likelihoods = self.log_likelihoods_from_parameter_array(parameter_array=parameter_array)
+            with profiler("log_priors", items=len(parameter_array)):
+                log_priors = np.sum(self.model.log_priors_from_array(parameter_array), axis=1)
+            return log_likelihoods + log_priors
+
         def figure_of_merit_from_parameters(self, parameters):
             """The figure of merit is the value that the `NonLinearSearch` uses to sample parameter space. This varies
             between different `NonLinearSearch`s, for example:
@@ -174,7 +268,8 @@ class NonLinearSearch(ABC):
 
             # NEVER EVER REFACTOR THIS LINE! Haha.
 
-            phys_cube = model.vector_from_unit_vector(unit_vector=cube)
+            with profiler("prior_transform"):
+                phys_cube = model.vector_from_unit_vector(unit_vector=cube)
 
             for i in range(len(phys_cube)):
                 cube[i] = phys_cube[i]
@@ -183,7 +278,9 @@ class NonLinearSearch(ABC):
 
         @staticmethod
         def fitness(cube, model, fitness_function):
-            return fitness_function(instance=model.instance_from_vector(cube))
+            with profiler("instance_from_vector"):
+                instance = model.instance_from_vector(cube)
+            return fitness_function(instance=instance)
 
         @property
         def samples(self):
@@ -252,13 +349,25 @@ class NonLinearSearch(ABC):
             self.timer.paths = self.paths
             self.timer.start()
 
-            self._fit(model=model, analysis=analysis, log_likelihood_cap=log_likelihood_cap)
+            self.start_profiling()
+            start = time.perf_counter()
+
+            try:
+                with profiler("fit"):
+                    self._fit(model=model, analysis=analysis, log_likelihood_cap=log_likelihood_cap)
+            except BaseException:
+                # Errors of background updates must not hide the error of the search
+                self.update_pipeline.join(raise_errors=False)
+                raise
+            self.update_pipeline.join()
             open(self.paths.has_completed_path, "w+").close()
 
             samples = self.perform_update(
                 model=model, analysis=analysis, during_analysis=False
             )
 
+            self.save_profile(wall_time=time.perf_counter() - start)
+
             analysis.save_results_for_aggregator(paths=self.paths, samples=samples)
 
         else:
@@ -331,10 +440,17 @@ class NonLinearSearch(ABC):
 
         1) Visualize the maximum log likelihood model.
         2) Output the model results to the model.reults file.
+        3) Append samples added since the last update to the sample log. The samples.csv and samples.pickle files
+           are only written at the end of the search.
 
         These task are performed every n updates, set by the relevent *task_every_update* variable, for example
         *visualize_every_update*
 
+        During the search the tasks are performed in a background thread on the samples taken at the time of the
+        update, so sampling resumes immediately. The update at the end of the search waits for these to finish.
+        Visualization uses matplotlib, which is not thread safe, so it is performed before sampling resumes unless the
+        analysis sets `visualize_in_background` to True.
+
         Parameters
         ----------
         model : ModelMapper
@@ -352,36 +468,156 @@ class NonLinearSearch(ABC):
 
         self.timer.update()
 
-        samples = self.samples_via_sampler_from_model(model=model)
-        samples.write_table(filename=self.paths.samples_file)
-        samples.info_to_json(filename=self.paths.info_file)
+        with profiler("update" if during_analysis else "update_final"):
+            samples = self.samples_via_sampler_from_model(model=model)
 
-        self.save_samples(samples=samples)
+        tasks = dict(
+            visualize=self.should_visualize() or not during_analysis,
+            output_model_results=self.should_output_model_results() or not during_analysis,
+        )
+
+        if during_analysis:
+            if tasks["visualize"] and not getattr(analysis, "visualize_in_background", False):
+                tasks["visualize"] = False
+                try:
+                    instance = samples.max_log_likelihood_instance
+                except exc.FitException:
+                    instance = None
+                if instance is not None:
+                    self._visualize(instance, analysis=analysis, during_analysis=True)
+
+            self.update_pipeline.submit(
+                functools.partial(self._output_update, analysis=analysis, during_analysis=True),
+                samples,
+                **tasks
+            )
+            return samples
+
+        self.update_pipeline.join()
+
+        with profiler("update_samples_output"):
+            samples.write_table(filename=self.paths.samples_file)
+            self.save_samples(samples=samples)
+            self.sample_log.clear()
+
+        self._output_update(samples, analysis=analysis, during_analysis=False, **tasks)
+
+        if self.remove_state_files_at_end:
+            try:
+                self.remove_state_files()
+            except FileNotFoundError:
+                pass
+
+        return samples
+
+    def _output_update(self, samples, analysis, during_analysis, visualize, output_model_results):
+        """
+        Output the samples of an update, visualize the maximum log likelihood model and write
+        the model results. During the search this is performed in the background by the
+        `update_pipeline`, so it must only use the samples given and not the sampler.
+        """
+        with profiler("update_samples_output"):
+            samples.info_to_json(filename=self.paths.info_file)
+
+            if during_analysis:
+                self.sample_log.update(samples)
 
         try:
             instance = samples.max_log_likelihood_instance
         except exc.FitException:
-            return samples
+            return
+
+        if visualize:
+            self._visualize(instance, analysis=analysis, during_analysis=during_analysis)
+
+        if output_model_results:
+            with profiler("update_model_results"):
+                text_util.results_to_file(
+                    samples=samples,
+                    filename=self.paths.file_results,
+                    during_analysis=during_analysis,
+                )
 
-        if self.should_visualize() or not during_analysis:
+                text_util.search_summary_to_file(samples=samples, filename=self.paths.file_search_summary)
+
+    def _visualize(self, instance, analysis, during_analysis):
+        with profiler("update_visualize"):
             analysis.visualize(paths=self.paths, instance=instance, during_analysis=during_analysis)
 
-        if self.should_output_model_results() or not during_analysis:
+    def start_profiling(self):
+        """
+        Reset the profiler of this process and of the workers of any pool, enabling them if
+        profiling is turned on in general.ini.
+        """
+        enabled = conf.instance["general"]["profiling"]["profile"]
+        profiler.reset(enabled)
+        for pool in WorkerPool.all():
+            pool.broadcast(profile.reset_worker_profile, enabled)
+
+    def save_profile(self, wall_time):
+        """
+        Write the time spent in each stage of the search to profile.json in the output folder, if profiling
+        is turned on. This includes the likelihood evaluations performed by each worker of the pool the search
+        used and the parallel efficiency of the pool.
 
-            text_util.results_to_file(
-                samples=samples,
-                filename=self.paths.file_results,
-                during_analysis=during_analysis,
+        Parameters
+        ----------
+        wall_time : float
+            How long the search ran for in seconds.
+        """
+        if not profiler.enabled:
+            return
+
+        pool = WorkerPool.existing(self.number_of_cores)
+        workers = pool.broadcast(profile.worker_profile) if pool is not None else list()
+
+        with open(self.paths.file_profile, "w+") as f:
+            json.dump(
+                profile.summary(
+                    wall_time=wall_time,
+                    stages=profiler.dict(),
+                    workers=workers,
+                ),
+                f,
+                indent=4,
             )
 
-            text_util.search_summary_to_file(samples=samples, filename=self.paths.file_search_summary)
+    @property
+    def update_pipeline(self) -> UpdatePipeline:
+        """
+        Performs the output of updates during the search in a background thread.
+        """
+        return UpdatePipeline.for_directory(self.paths.output_path)
 
-        if not during_analysis and self.remove_state_files_at_end:
-            try:
-                self.remove_state_files()
-            except FileNotFoundError:
-                pass
+    @property
+    def sample_log(self) -> SampleLog:
+        """
+        The log to which samples are appended during the search. The samples.csv and samples.pickle
+        files are only written at the end of the search, or on demand by `materialize_samples`.
+        """
+        return SampleLog.for_directory(path.join(self.paths.samples_path, "log"))
+
+    def materialize_samples(self, model):
+        """
+        Write the samples.csv and samples.pickle files from the samples appended to the log so far,
+        so that the samples of a search which is still running can be inspected.
+
+        Parameters
+        ----------
+        model : ModelMapper
+            The model which generates instances for different points in parameter space.
+
+        Returns
+        -------
+        The samples in the log, or None if no update has been performed.
+        """
+        table = self.sample_log.load()
+        if table is None:
+            return None
 
+        samples = samps.OptimizerSamples(model=model, samples=table)
+        samples.write_table(filename=self.paths.samples_file)
+        self.save_samples(samples=samples)
         return samples
 
     def setup_log_file(self):
@@ -501,34 +737,30 @@ class NonLinearSearch(ABC):
     def samples_via_csv_json_from_model(self, model):
         raise NotImplementedError()
 
-    def make_pool(self):
-        """Make the pool instance used to parallelize a `NonLinearSearch` alongside a set of unique ids for every
+    def make_pool(self, model=None, analysis=None):
+        """Retrieve the pool instance used to parallelize a `NonLinearSearch` alongside a set of unique ids for every
         process in the pool. If the specified number of cores is 1, a pool instance is not made and None is returned.
 
-        The pool cannot be set as an attribute of the class itself because this prevents pickling, thus it is generated
-        via this function before calling the non-linear search.
+        The pool cannot be set as an attribute of the class itself because this prevents pickling, thus it is retrieved
+        via this function before calling the non-linear search. Pools are kept alive and reused by every search with
+        the same number of cores, so consecutive phases do not pay the cost of starting new processes.
+
+        The model and analysis are sent to every process of the pool once per search, so that the fitness function
+        passed to the pool for each task references them instead of including the data of the analysis. The analysis
+        is sent again by every search, as it may have been changed in place (e.g. hyper images set on it).
 
         The pool instance is also set up with a list of unique pool ids, which are used during model-fitting to
         identify a 'master core' (the one whose id value is lowest) which handles model result output, visualization,
         etc."""
 
-        if self.number_of_cores == 1:
+        pool = WorkerPool.for_cores(self.number_of_cores)
 
+        if pool is None:
             return None, None
 
-        else:
-
-            manager = mp.Manager()
-            idQueue = manager.Queue()
-
-            [idQueue.put(i) for i in range(self.number_of_cores)]
-
-            pool = mp.Pool(
-                processes=self.number_of_cores, initializer=init, initargs=(idQueue,)
-            )
-            ids = pool.map(f, range(self.number_of_cores))
+        pool.share(model=model, analysis=analysis)
 
-            return pool, [id[1] for id in ids]
+        return pool, pool.ids
 
     def __eq__(self, other):
         return isinstance(other, NonLinearSearch) and self.__dict__ == other.__dict__
@@ -540,9 +772,36 @@ class NonLinearSearch(ABC):
 
 class Analysis(ABC):
 
+    # If True, numpy arrays held by the analysis are placed in shared memory once when a search runs on
+    # multiple cores and every process reads the same copy, instead of each unpickling its own.
+    use_shared_memory = False
+
+    # If True, visualization during a search is performed in the background thread performing updates while sampling
+    # continues. This is only safe if visualize does not use pyplot or other state shared with the main thread.
+    visualize_in_background = False
+
     def log_likelihood_function(self, instance):
         raise NotImplementedError()
 
+    def log_likelihood_function_batch(self, instance):
+        """
+        Optionally implemented to compute the log likelihoods of many points in parameter space at once.
+
+        Searches which evaluate many points together, such as Emcee and PySwarms, use this function in place of
+        log_likelihood_function when it is implemented.
+
+        Parameters
+        ----------
+        instance
+            A structure of arrays instance of the model, where every parameter is a numpy array with one value for
+            each point. Points outside the prior limits or which fail an assertion have already been removed.
+
+        Returns
+        -------
+        An array of the log likelihood of each point.
+        """
+        raise NotImplementedError()
+
     def visualize(self, paths : Paths, instance, during_analysis):
         pass
 
@@ -553,6 +812,14 @@ class Analysis(ABC):
         pass
 
 
+def has_log_likelihood_function_batch(analysis) -> bool:
+    """
+    Does the analysis implement log_likelihood_function_batch?
+    """
+    method = getattr(type(analysis), "log_likelihood_function_batch", None)
+    return method is not None and method is not Analysis.log_likelihood_function_batch
+
+
 class Result:
     """
     @DynamicAttrs
@@ -756,14 +1023,3 @@ class PriorPasser:
         use_widths = config("prior_passer", "use_widths")
         return PriorPasser(sigma=sigma, use_errors=use_errors, use_widths=use_widths)
 
-
-def init(queue):
-    global idx
-    idx = queue.get()
-
-
-def f(x):
-    global idx
-    process = mp.current_process()
-    sleep(1)
-    return idx, process.pid, x * x
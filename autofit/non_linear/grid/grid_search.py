@@ -1,4 +1,6 @@
 import copy
+import hashlib
+import json
 from os import path
 from typing import List, Tuple, Union
 
@@ -8,8 +10,8 @@ from autoconf import conf
 from autofit import exc
 from autofit.mapper import model_mapper as mm
 from autofit.mapper.prior import prior as p
-from autofit.non_linear.abstract_search import Result
-from autofit.non_linear.parallel import AbstractJob, Process, AbstractJobResult
+from autofit.non_linear.abstract_search import IntervalCounter, Result
+from autofit.non_linear.parallel import AbstractJob, AbstractJobResult, Checkpoint, JobScheduler
 from autofit.non_linear.paths import Paths
 
 
@@ -317,7 +319,7 @@ class GridSearch:
             The result of the grid search
         """
 
-        grid_priors = list(set(grid_priors))
+        grid_priors = list(sorted(set(grid_priors), key=lambda prior: prior.id))
         results = []
         lists = self.make_lists(grid_priors)
         physical_lists = self.make_physical_lists(grid_priors)
@@ -328,9 +330,17 @@ class GridSearch:
             + ["likelihood_merit"]
         ]
 
+        checkpoint = self.checkpoint_for(model, grid_priors, lists)
+        completed = checkpoint.completed()
+
         jobs = list()
 
         for index, values in enumerate(lists):
+            if str(index) in completed:
+                result = completed[str(index)]
+                results.append(result)
+                results_list.append(result.result_list_row)
+                continue
             jobs.append(
                 self.job_for_analysis_grid_priors_and_values(
                     analysis=copy.deepcopy(analysis),
@@ -341,12 +351,13 @@ class GridSearch:
                 )
             )
 
-        for result in Process.run_jobs(
-                jobs,
-                self.number_of_cores
-        ):
+        scheduler = JobScheduler(
+            self.number_of_cores,
+            cores_per_job=getattr(self.search, "number_of_cores", 1),
+        )
+        for result in scheduler.run(jobs):
+            checkpoint.save(result.index, result)
             results.append(result)
-            results = sorted(results)
             results_list.append(result.result_list_row)
             self.write_results(results_list)
 
@@ -354,7 +365,7 @@ class GridSearch:
             [
                 result.result
                 for result
-                in results
+                in sorted(results, key=lambda result: result.index)
             ],
             lists,
             physical_lists
@@ -389,16 +400,23 @@ class GridSearch:
             + ["max_log_likelihood"]
         ]
 
+        checkpoint = self.checkpoint_for(model, grid_priors, lists)
+        completed = checkpoint.completed()
+
         for index, values in enumerate(lists):
-            job = self.job_for_analysis_grid_priors_and_values(
-                analysis=analysis,
-                model=model,
-                grid_priors=grid_priors,
-                values=values,
-                index=index,
-            )
+            if str(index) in completed:
+                result = completed[str(index)]
+            else:
+                job = self.job_for_analysis_grid_priors_and_values(
+                    analysis=analysis,
+                    model=model,
+                    grid_priors=grid_priors,
+                    values=values,
+                    index=index,
+                )
 
-            result = job.perform()
+                result = job.perform()
+                checkpoint.save(index, result)
 
             results.append(result.result)
             results_list.append(result.result_list_row)
@@ -407,6 +425,27 @@ class GridSearch:
 
         return GridSearchResult(results, lists, physical_lists)
 
+    def checkpoint_for(self, model, grid_priors, lists) -> Checkpoint:
+        """
+        Stores the result of each grid cell as it completes, so that an interrupted grid search
+        only performs the cells which did not complete when it is resumed.
+
+        Results stored for a different grid, a different model or a search with different
+        settings are discarded.
+        """
+        return Checkpoint(
+            path.join(self.paths.output_path, "grid_checkpoint"),
+            signature=dict(
+                grid_priors=list(map(model.name_for_prior, grid_priors)),
+                lists=lists,
+                model=hashlib.sha1(model.info.encode("utf-8")).hexdigest(),
+                search=hashlib.sha1(json.dumps(
+                    search_settings(self.search),
+                    sort_keys=True,
+                ).encode("utf-8")).hexdigest(),
+            )
+        )
+
     def write_results(self, results_list):
 
         with open(path.join(self.paths.output_path, "results"), "w+") as f:
@@ -476,6 +515,39 @@ class GridSearch:
         return search_instance
 
 
+def search_settings(search) -> dict:
+    """
+    A description of the settings of a search, used to tell whether grid cells were fit
+    by a search with the same settings.
+
+    This comprises the type of the search, every attribute with a value that is a number,
+    string or boolean and the type and such attributes of objects like its initializer.
+    The paths of the search and the state of a search that has run are left out.
+    """
+
+    def is_setting(value):
+        return value is None or isinstance(value, (bool, int, float, str))
+
+    settings = dict(type=type(search).__name__)
+    for key, value in vars(search).items():
+        if key.startswith("_") or key in ("paths", "timer", "iterations") or isinstance(
+                value, IntervalCounter
+        ):
+            continue
+        if is_setting(value):
+            settings[key] = value
+        elif hasattr(value, "__dict__"):
+            settings[key] = dict(
+                type=type(value).__name__,
+                **{
+                    name: attribute
+                    for name, attribute in vars(value).items()
+                    if is_setting(attribute)
+                }
+            )
+    return settings
+
+
 class JobResult(AbstractJobResult):
     def __init__(self, result, result_list_row, number):
         """
@@ -486,12 +558,16 @@ class JobResult(AbstractJobResult):
         result
             The result of a grid search
         result_list_row
-            A row in the result list
+            A row in the result list, beginning with the index of the grid cell
         """
         super().__init__(number)
         self.result = result
         self.result_list_row = result_list_row
 
+    @property
+    def index(self) -> int:
+        return self.result_list_row[0]
+
 
 class Job(AbstractJob):
     def __init__(self, search_instance, model, analysis, arguments, index):
@@ -515,6 +591,8 @@ class Job(AbstractJob):
         self.index = index
 
     def perform(self):
+        if self.number_of_cores > 1:
+            self.search_instance.number_of_cores = self.number_of_cores
         result = self.search_instance.fit(model=self.model, analysis=self.analysis)
         result_list_row = [
             self.index,
@@ -6,7 +6,7 @@ from typing import List, Generator, Callable, Type, Union, Tuple
 
 from autofit import AbstractPriorModel, ModelInstance, Paths, Result, Analysis, NonLinearSearch
 from autofit.non_linear.grid.grid_search import make_lists
-from autofit.non_linear.parallel import AbstractJob, Process, AbstractJobResult
+from autofit.non_linear.parallel import AbstractJob, AbstractJobResult, JobScheduler
 
 
 class JobResult(AbstractJobResult):
@@ -85,6 +85,10 @@ class Job(AbstractJob):
         -------
         An object comprising the results of the two fits
         """
+        if self.number_of_cores > 1:
+            self.search.number_of_cores = self.number_of_cores
+            self.perturbed_search.number_of_cores = self.number_of_cores
+
         result = self.search.fit(
             model=self.model,
             analysis=self.analysis
@@ -181,11 +185,12 @@ class Sensitivity:
         Run fits and comparisons for all perturbations, returning
         a list of results.
         """
+        scheduler = JobScheduler(
+            number_of_cores=self.number_of_cores,
+            cores_per_job=getattr(self.search, "number_of_cores", 1),
+        )
         results = list()
-        for result in Process.run_jobs(
-                self._make_jobs(),
-                number_of_cores=self.number_of_cores
-        ):
+        for result in scheduler.run(self._make_jobs()):
             results.append(result)
         return SensitivityResult(results)
 
@@ -73,25 +73,29 @@ class Initializer:
 
         while point_index < total_points:
 
-            unit_parameters = model.random_unit_vector_within_limits(
-                lower_limit=self.lower_limit, upper_limit=self.upper_limit
+            unit_parameter_array = self.random_unit_array(
+                total_points=total_points - point_index, model=model
             )
-            parameters = model.vector_from_unit_vector(unit_vector=unit_parameters)
+            parameter_array = model.vector_from_unit_array(unit_array=unit_parameter_array)
 
-            try:
-                figure_of_merit = fitness_function.figure_of_merit_from_parameters(
-                    parameters=parameters
-                )
+            for unit_parameters, parameters in zip(
+                    unit_parameter_array.tolist(), parameter_array.tolist()
+            ):
 
-                if np.isnan(figure_of_merit):
-                    raise exc.FitException
+                try:
+                    figure_of_merit = fitness_function.figure_of_merit_from_parameters(
+                        parameters=parameters
+                    )
 
-                initial_unit_parameters.append(unit_parameters)
-                initial_parameters.append(parameters)
-                initial_figures_of_merit.append(figure_of_merit)
-                point_index += 1
-            except exc.FitException:
-                pass
+                    if np.isnan(figure_of_merit):
+                        raise exc.FitException
+
+                    initial_unit_parameters.append(unit_parameters)
+                    initial_parameters.append(parameters)
+                    initial_figures_of_merit.append(figure_of_merit)
+                    point_index += 1
+                except exc.FitException:
+                    pass
 
         return initial_unit_parameters, initial_parameters, initial_figures_of_merit
 
@@ -114,24 +118,31 @@ class Initializer:
             of free dimensions of the model.
         """
 
-        initial_unit_parameters = []
-        initial_parameters = []
-        initial_figures_of_merit = []
+        unit_parameter_array = self.random_unit_array(
+            total_points=total_points, model=model
+        )
+        parameter_array = model.vector_from_unit_array(unit_array=unit_parameter_array)
 
-        point_index = 0
+        initial_unit_parameters = unit_parameter_array.tolist()
+        initial_parameters = parameter_array.tolist()
+        initial_figures_of_merit = total_points * [-1.0e99]
 
-        while point_index < total_points:
+        return initial_unit_parameters, initial_parameters, initial_figures_of_merit
 
-            unit_parameters = model.random_unit_vector_within_limits(
-                lower_limit=self.lower_limit, upper_limit=self.upper_limit
-            )
-            parameters = model.vector_from_unit_vector(unit_vector=unit_parameters)
-            initial_unit_parameters.append(unit_parameters)
-            initial_parameters.append(parameters)
-            initial_figures_of_merit.append(-1.0e99)
-            point_index += 1
+    def random_unit_array(self, total_points, model):
+        """
+        Draw unit values for many points at once from a uniform distribution between the lower_limit and
+        upper_limit of the initializer.
 
-        return initial_unit_parameters, initial_parameters, initial_figures_of_merit
+        Returns
+        -------
+        An array of shape (total_points, model.prior_count)
+        """
+        return np.random.uniform(
+            low=self.lower_limit,
+            high=self.upper_limit,
+            size=(total_points, model.prior_count)
+        )
 
 class InitializerPrior(Initializer):
     def __init__(self):
@@ -0,0 +1,170 @@
+from typing import Optional
+
+import numpy as np
+
+
+class AutoCorrelationEstimator:
+    def __init__(self, c: float = 5.0, max_lag: int = 64):
+        """
+        Estimates the integrated auto correlation time of every parameter of an MCMC chain as
+        the chain grows, with the same estimator as `emcee.autocorr.integrated_time`.
+
+        That function computes the auto correlation function of the entire chain with an FFT
+        every time it is called. Instead, the sums of the products of every step with each of
+        the steps up to max_lag before it are accumulated as steps are added, so an update
+        only does work for the new steps. The auto correlation function is computed from these
+        sums with the mean of the whole chain, and summed up to the window chosen by Sokal's
+        adaptive method, the smallest lag M with M >= c * tau(M). If no lag of the chain
+        satisfies this, the chain is too short for the window and the largest lag is used,
+        as emcee's `auto_window` does.
+
+        If the window needs more lags than are accumulated, max_lag is doubled and the sums
+        computed again from the chain.
+
+        Parameters
+        ----------
+        c
+            The step size of the window search
+        max_lag
+            The initial number of lags for which sums are accumulated
+        """
+        self.c = c
+        self.max_lag = max_lag
+
+        self._steps = 0
+        self._shift = None
+        self._sums = None
+        self._lag_sums = None
+
+    def update(self, chain: np.ndarray):
+        """
+        Accumulate the steps of a (total_steps, total_walkers, total_parameters) chain added
+        since the last update. The chain must include the steps of previous updates unchanged.
+        """
+        if len(chain) <= self._steps:
+            return
+
+        if self._shift is None:
+            # Values are shifted by the first step of each walker, which does not change the
+            # auto correlation function, to limit the loss of precision of the sums
+            self._shift = np.array(chain[0], dtype="float64")
+            self._sums = np.zeros(self._shift.shape)
+            self._lag_sums = np.zeros((self.max_lag + 1,) + self._shift.shape)
+
+        start, stop = self._steps, len(chain)
+
+        self._sums += (chain[start:stop] - self._shift).sum(axis=0)
+        for lag in range(self.max_lag + 1):
+            self._lag_sums[lag] += self._lag_products(chain, lag, start, stop)
+
+        self._steps = stop
+
+    def _lag_products(self, chain: np.ndarray, lag: int, start: int, stop: int) -> np.ndarray:
+        """
+        The sum of the products of the shifted steps from start to stop with the shifted steps
+        lag before them.
+        """
+        start = max(start, lag)
+        if start >= stop:
+            return 0.0
+        return np.sum(
+            (chain[start - lag: stop - lag] - self._shift) * (chain[start:stop] - self._shift),
+            axis=0
+        )
+
+    def auto_correlation_times(
+            self,
+            chain: np.ndarray,
+            total_steps: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        The integrated auto correlation time of every parameter, estimated from the first
+        total_steps steps of the chain.
+
+        Steps of the chain that have not been accumulated are accumulated first. If total_steps
+        is less than the number of steps accumulated, the products of the later steps are
+        subtracted from the sums, so only the difference is computed.
+
+        Parameters
+        ----------
+        chain
+            The (total_steps, total_walkers, total_parameters) chain
+        total_steps
+            The number of steps of the chain from which times are estimated, which defaults
+            to every step
+
+        Returns
+        -------
+        The auto correlation time of each parameter, which is infinite if there are no steps
+        """
+        steps = len(chain) if total_steps is None else total_steps
+
+        if steps == 0:
+            return np.full(np.shape(chain)[-1], np.inf)
+
+        self.update(chain)
+
+        while True:
+            times = self._times(chain, steps)
+            if times is not None:
+                return times
+            self._grow(chain)
+
+    def _grow(self, chain: np.ndarray):
+        """
+        Double the number of lags and accumulate the sums of the chain again.
+        """
+        self.max_lag *= 2
+        self._steps = 0
+        self._shift = None
+        self.update(chain)
+
+    def _times(self, chain: np.ndarray, steps: int) -> Optional[np.ndarray]:
+        """
+        The auto correlation times of the first steps steps of the chain, or None if the
+        window of any parameter exceeds the lags accumulated.
+        """
+        lags = min(self.max_lag, steps - 1)
+
+        sums = self._sums - (chain[steps: self._steps] - self._shift).sum(axis=0)
+        lag_sums = np.array([
+            self._lag_sums[lag] - self._lag_products(chain, lag, steps, self._steps)
+            for lag in range(lags + 1)
+        ])
+
+        # The sums of the first and last lags steps, as the sums of the steps excluded from
+        # each end of the chain by each lag
+        head = np.concatenate((
+            np.zeros((1,) + sums.shape),
+            np.cumsum(chain[:lags] - self._shift, axis=0)
+        ))
+        tail = np.concatenate((
+            np.zeros((1,) + sums.shape),
+            np.cumsum(chain[steps - lags: steps][::-1] - self._shift, axis=0)
+        ))
+
+        mean = sums / steps
+        lag_range = np.arange(lags + 1).reshape(-1, 1, 1)
+
+        auto_covariance = (
+                lag_sums
+                - mean * ((sums - tail) + (sums - head))
+                + (steps - lag_range) * mean ** 2
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            auto_correlation = np.mean(auto_covariance / auto_covariance[0], axis=1)
+
+        taus = 2.0 * np.cumsum(auto_correlation, axis=0) - 1.0
+
+        times = np.empty(taus.shape[1])
+        for parameter in range(taus.shape[1]):
+            within_window = np.arange(lags + 1) < self.c * taus[:, parameter]
+            if np.all(within_window):
+                if lags < steps - 1:
+                    return None
+                times[parameter] = taus[lags, parameter]
+            else:
+                times[parameter] = taus[np.argmin(within_window), parameter]
+
+        return times
@@ -1,6 +1,8 @@
 import json
 import os
-from typing import List
+import threading
+import weakref
+from typing import List, Union
 
 import emcee
 import numpy as np
@@ -11,8 +13,173 @@ from autofit.mapper.prior_model.abstract import AbstractPriorModel
 from autofit.non_linear import samples as samp
 from autofit.non_linear.log import logger
 from autofit.non_linear.mcmc.abstract_mcmc import AbstractMCMC
+from autofit.non_linear.mcmc.auto_correlation import AutoCorrelationEstimator
 from autofit.non_linear.paths import convert_paths
-from autofit.non_linear.samples import MCMCSamples, Sample
+from autofit.non_linear.samples import MCMCSamples, Sample, SampleTable
+
+
+class EmceeChain:
+    _chains = weakref.WeakValueDictionary()
+
+    def __init__(self, filename: str):
+        """
+        The chain and log posteriors stored in an *Emcee* hdf5 backend, cached in memory.
+
+        Each update reads only the steps added since the previous update, so the chain is
+        not copied out of the file in full every time the samples of a search are updated.
+        Auto correlation times are estimated incrementally as the chain grows and cached by
+        the number of steps they are computed from.
+
+        Parameters
+        ----------
+        filename
+            The path of the hdf5 file of the backend
+        """
+        self.filename = filename
+        self.backend = emcee.backends.HDFBackend(filename=filename)
+        self._lock = threading.Lock()
+        self._clear()
+
+    @classmethod
+    def for_file(cls, filename: str) -> "EmceeChain":
+        """
+        Retrieve the chain for a file, creating it if it does not exist. Chains are reused
+        so that one backend serves every read and write of a fit.
+
+        Chains are held weakly, so a chain is released along with its cached steps once
+        the fit and any samples reading it no longer reference it.
+        """
+        chain = cls._chains.get(filename)
+        if chain is None:
+            chain = cls(filename)
+            cls._chains[filename] = chain
+        return chain
+
+    def _clear(self):
+        self._chain = None
+        self._log_prob = None
+        self._steps = 0
+        self._estimator = AutoCorrelationEstimator()
+        self._auto_correlation_times = dict()
+
+    @property
+    def steps(self) -> int:
+        """
+        The number of steps read by the last update.
+        """
+        return self._steps
+
+    @property
+    def chain(self) -> np.ndarray:
+        """
+        The (total_steps, total_walkers, total_parameters) chain read by the last update.
+        """
+        return self._chain[: self._steps]
+
+    @property
+    def log_prob(self) -> np.ndarray:
+        """
+        The (total_steps, total_walkers) log posteriors read by the last update.
+        """
+        return self._log_prob[: self._steps]
+
+    def update(self) -> int:
+        """
+        Read any steps added to the backend since the last update. If the backend no longer
+        holds the steps already read, for example because a search was restarted, the
+        chain is read again from the beginning.
+
+        Updates are locked because samples are also read by the background output of a search.
+
+        Returns
+        -------
+        The total number of steps
+        """
+        if not self.backend.initialized:
+            raise AttributeError(
+                "You must run the sampler with 'store == True' before accessing the results"
+            )
+
+        with self._lock, self.backend.open() as f:
+            group = f[self.backend.name]
+            iteration = group.attrs["iteration"]
+
+            if self._steps > 0 and (
+                    iteration < self._steps
+                    or not np.array_equal(
+                        group["chain"][self._steps - 1], self._chain[self._steps - 1]
+                    )
+            ):
+                self._clear()
+
+            if iteration > self._steps:
+                self._append(
+                    chain=group["chain"][self._steps: iteration],
+                    log_prob=group["log_prob"][self._steps: iteration],
+                )
+
+        return self._steps
+
+    def _append(self, chain: np.ndarray, log_prob: np.ndarray):
+        """
+        Append steps to the cached chain, doubling its capacity when it is full. Steps that
+        have already been read are never written again, so views of them remain valid.
+        """
+        steps = self._steps + len(chain)
+
+        if self._chain is None or steps > len(self._chain):
+            capacity = max(steps, 2 * self._steps)
+            cached_chain = np.empty((capacity,) + chain.shape[1:], dtype=chain.dtype)
+            cached_log_prob = np.empty((capacity,) + log_prob.shape[1:], dtype=log_prob.dtype)
+            if self._steps > 0:
+                cached_chain[: self._steps] = self.chain
+                cached_log_prob[: self._steps] = self.log_prob
+            self._chain = cached_chain
+            self._log_prob = cached_log_prob
+
+        self._chain[self._steps: steps] = chain
+        self._log_prob[self._steps: steps] = log_prob
+        self._steps = steps
+
+    def auto_correlation_times(self, total_steps: int) -> np.ndarray:
+        """
+        The integrated auto correlation time of every parameter, estimated from the first
+        total_steps steps of the chain.
+        """
+        with self._lock:
+            if total_steps not in self._auto_correlation_times:
+                self._auto_correlation_times[total_steps] = self._estimator.auto_correlation_times(
+                    chain=self.chain, total_steps=total_steps
+                )
+            return self._auto_correlation_times[total_steps]
+
+
+class PoolBatch:
+    def __init__(self, pool, function):
+        """
+        Computes the log posteriors of every walker for a vectorized *Emcee* sampler by splitting the walkers
+        into one batch for each process of the pool.
+
+        *Emcee* does not use its pool when it is vectorized, so without this a batched fitness function would
+        run on a single core however many cores the search has.
+
+        Parameters
+        ----------
+        pool
+            The pool whose processes each compute the log posteriors of one batch
+        function
+            The batched fitness function, which is sent to the processes of the pool
+        """
+        self.pool = pool
+        self.function = function
+
+    def __call__(self, parameters):
+        batches = [
+            batch
+            for batch in np.array_split(parameters, self.pool.processes)
+            if len(batch) > 0
+        ]
+        return np.concatenate(self.pool.map(self.function, batches))
 
 
 class Emcee(AbstractMCMC):
@@ -134,6 +301,9 @@ class Emcee(AbstractMCMC):
 
     class Fitness(AbstractMCMC.Fitness):
         def __call__(self, parameters):
+            if np.ndim(parameters) == 2:
+                log_posteriors = self.log_posteriors_from_parameter_array(parameter_array=parameters)
+                return np.where(np.isnan(log_posteriors), self.resample_figure_of_merit, log_posteriors)
             try:
                 return self.figure_of_merit_from_parameters(parameters=parameters)
             except exc.FitException:
@@ -167,20 +337,29 @@ class Emcee(AbstractMCMC):
         chains used by the fit.
         """
 
-        pool, pool_ids = self.make_pool()
+        pool, pool_ids = self.make_pool(model=model, analysis=analysis)
+
+        # Held until the fit returns so that every update during the fit reads from one cached chain
+        chain = self.chain
 
         fitness_function = self.fitness_function_from_model_and_analysis(
             model=model, analysis=analysis, pool_ids=pool_ids
         )
 
+        log_prob_fn = fitness_function.__call__
+
+        if fitness_function.is_batched and pool is not None:
+            logger.info("Splitting each batch of Emcee walkers across the pool.")
+            log_prob_fn = PoolBatch(pool=pool, function=fitness_function)
+            pool = None
+
         emcee_sampler = emcee.EnsembleSampler(
             nwalkers=self.nwalkers,
             ndim=model.prior_count,
-            log_prob_fn=fitness_function.__call__,
-            backend=emcee.backends.HDFBackend(
-                filename=self.paths.samples_path + "/emcee.hdf"
-            ),
+            log_prob_fn=log_prob_fn,
+            backend=chain.backend,
             pool=pool,
+            vectorize=fitness_function.is_batched,
         )
 
         try:
@@ -294,7 +473,8 @@ class Emcee(AbstractMCMC):
     def samples_via_sampler_from_model(self, model):
         """Create a `Samples` object from this non-linear search's output files on the hard-disk and model.
 
-        For Emcee, all quantities are extracted via the hdf5 backend of results.
+        For Emcee, all quantities are extracted via the hdf5 backend of results, reading only the steps added since
+        the previous update.
 
         Parameters
         ----------
@@ -306,28 +486,28 @@ class Emcee(AbstractMCMC):
             etc.
         """
 
-        parameters = self.backend.get_chain(flat=True).tolist()
-        log_priors = [
-            sum(model.log_priors_from_vector(vector=vector)) for vector in parameters
-        ]
-        log_likelihoods = self.backend.get_log_prob(flat=True).tolist()
-        weights = len(log_likelihoods) * [1.0]
-        auto_correlation_time = self.backend.get_autocorr_time(tol=0)
-        total_walkers = len(self.backend.get_chain()[0, :, 0])
-        total_steps = len(self.backend.get_log_prob())
+        chain = self.chain
+        total_steps = chain.update()
+        total_walkers = chain.chain.shape[1]
+
+        parameters = chain.chain.reshape(total_steps * total_walkers, -1)
+        log_priors = np.sum(
+            model.log_priors_from_array(parameters), axis=1
+        )
+        log_likelihoods = chain.log_prob.reshape(-1)
 
         return EmceeSamples(
             model=model,
-            samples=Sample.from_lists(
-                model=model,
+            samples=SampleTable(
+                paths=model.model_component_and_parameter_names,
                 parameters=parameters,
                 log_likelihoods=log_likelihoods,
                 log_priors=log_priors,
-                weights=weights
+                weights=np.ones(len(log_likelihoods)),
             ),
             total_walkers=total_walkers,
             total_steps=total_steps,
-            auto_correlation_times=auto_correlation_time,
+            auto_correlation_times=chain.auto_correlation_times(total_steps),
             auto_correlation_check_size=self.auto_correlation_check_size,
             auto_correlation_required_length=self.auto_correlation_required_length,
             auto_correlation_change_threshold=self.auto_correlation_change_threshold,
@@ -349,7 +529,7 @@ class Emcee(AbstractMCMC):
         return EmceeSamples(
             model=model,
             samples=samples,
-            auto_correlation_times=self.backend.get_autocorr_time(tol=0),
+            auto_correlation_times=self.chain.auto_correlation_times(self.chain.update()),
             auto_correlation_check_size=samples_info["auto_correlation_check_size"],
             auto_correlation_required_length=samples_info[
                 "auto_correlation_required_length"
@@ -363,15 +543,19 @@ class Emcee(AbstractMCMC):
             backend=self.backend
         )
 
+    @property
+    def chain(self) -> EmceeChain:
+        """The cached chain of the *Emcee* hdf5 backend of this search, which is shared by every read of the
+        fit."""
+        return EmceeChain.for_file(self.paths.samples_path + "/emcee.hdf")
+
     @property
     def backend(self) -> emcee.backends.HDFBackend:
         """The *Emcee* hdf5 backend, which provides access to all samples, likelihoods, etc. of the non-linear search.
 
         The sampler is described in the "Results" section at https://dynesty.readthedocs.io/en/latest/quickstart.html"""
         if os.path.isfile(self.paths.samples_path + "/emcee.hdf"):
-            return emcee.backends.HDFBackend(
-                filename=self.paths.samples_path + "/emcee.hdf"
-            )
+            return self.chain.backend
         else:
             raise FileNotFoundError(
                 "The file emcee.hdf does not exist at the path "
@@ -384,7 +568,7 @@ class EmceeSamples(MCMCSamples):
     def __init__(
             self,
             model: ModelMapper,
-            samples: List[Sample],
+            samples: Union[List[Sample], SampleTable],
             auto_correlation_times: np.ndarray,
             auto_correlation_check_size: int,
             auto_correlation_required_length: int,
@@ -420,6 +604,20 @@ class EmceeSamples(MCMCSamples):
 
         self.backend = backend
 
+    @property
+    def chain(self) -> EmceeChain:
+        """
+        The cached chain of the backend, which is only read from the file if it does not
+        yet hold the steps of these samples. Steps taken after these samples were created
+        are excluded from every read by slicing the chain to total_steps.
+        """
+        chain = EmceeChain.for_file(self.backend.filename)
+        if chain.steps < self.total_steps and chain.update() < self.total_steps:
+            raise ValueError(
+                f"The backend {self.backend.filename} holds fewer steps than the samples"
+            )
+        return chain
+
     @property
     def samples_after_burn_in(self) -> [list]:
         """The emcee samples with the initial burn-in samples removed.
@@ -427,10 +625,11 @@ class EmceeSamples(MCMCSamples):
         The burn-in period is estimated using the auto-correlation times of the parameters."""
         discard = int(3.0 * np.max(self.auto_correlation_times))
         thin = int(np.max(self.auto_correlation_times) / 2.0)
-        return self.backend.get_chain(discard=discard, thin=thin, flat=True)
+        chain = self.chain.chain[discard + thin - 1: self.total_steps: thin]
+        return chain.reshape(-1, chain.shape[-1])
 
     @property
     def previous_auto_correlation_times(self) -> [float]:
-        return emcee.autocorr.integrated_time(
-            x=self.backend.get_chain()[: -self.auto_correlation_check_size, :, :], tol=0
+        return self.chain.auto_correlation_times(
+            max(self.total_steps - self.auto_correlation_check_size, 0)
         )
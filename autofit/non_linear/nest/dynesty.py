@@ -1,6 +1,8 @@
 import os
 import pickle
+import shutil
 import sys
+from os import path
 
 import numpy as np
 from dynesty import NestedSampler as StaticSampler
@@ -11,10 +13,176 @@ from autofit.non_linear.abstract_search import Result
 from autofit.non_linear.log import logger
 from autofit.non_linear.nest.abstract_nest import AbstractNest
 from autofit.non_linear.paths import convert_paths
-from autofit.non_linear.samples import NestSamples, Sample
+from autofit.non_linear.sample_log import ColumnStack, SegmentLog
+from autofit.non_linear.samples import NestSamples, SampleTable
 from autofit.text import samples_text
 
 
+class DynestyCheckpoint:
+    # Attributes of the sampler holding the history of dead points, one entry per iteration,
+    # with those holding integers listed separately so they are restored as integers.
+    saved_scalars = (
+        "saved_id",
+        "saved_logl",
+        "saved_logvol",
+        "saved_logwt",
+        "saved_logz",
+        "saved_logzvar",
+        "saved_h",
+        "saved_nc",
+        "saved_boundidx",
+        "saved_it",
+        "saved_bounditer",
+        "saved_scale",
+    )
+    saved_integers = (
+        "saved_id",
+        "saved_nc",
+        "saved_boundidx",
+        "saved_it",
+        "saved_bounditer",
+    )
+    saved_vectors = (
+        "saved_u",
+        "saved_v",
+    )
+
+    def __init__(self, directory: str):
+        """
+        The state of a static Dynesty sampler, stored so that a search can be resumed without
+        pickling the entire sampler at every update.
+
+        The state file holds the live points, the random state and the scalars of the
+        sampler, so its size does not grow during the search. The history of dead points is
+        appended to a segment log, so each update only writes the points that have died
+        since the previous one (and rewrites the live points Dynesty adds to the end of its
+        samples when a run finishes). Bounds are appended to a file of pickles, so each
+        update only writes the bounds constructed since the previous one and a restored
+        sampler keeps every bound.
+
+        Parameters
+        ----------
+        directory
+            The directory in which the state and history are stored
+        """
+        self.directory = directory
+        self._history = SegmentLog(path.join(directory, "history"))
+
+    @property
+    def state_file(self) -> str:
+        return path.join(self.directory, "state.pickle")
+
+    @property
+    def bounds_file(self) -> str:
+        return path.join(self.directory, "bounds.pickle")
+
+    @property
+    def exists(self) -> bool:
+        return path.exists(self.state_file)
+
+    def _load_state(self) -> dict:
+        with open(self.state_file, "rb") as f:
+            return pickle.load(f)
+
+    def _save_bounds(self, bounds: list) -> int:
+        """
+        Append the bounds constructed since the last save to the bounds file, returning its
+        length in bytes. Anything written after the last complete save, e.g. by a save that
+        was interrupted, is discarded first.
+        """
+        bound_count, bounds_length = 0, 0
+        if self.exists:
+            state = self._load_state()
+            bound_count, bounds_length = state["bound_count"], state["bounds_length"]
+        if bound_count > len(bounds):
+            bound_count, bounds_length = 0, 0
+
+        with open(self.bounds_file, "r+b" if path.exists(self.bounds_file) else "wb") as f:
+            f.truncate(bounds_length)
+            f.seek(bounds_length)
+            for bound in bounds[bound_count:]:
+                pickle.dump(bound, f)
+            return f.tell()
+
+    def _load_bounds(self, bound_count: int) -> list:
+        with open(self.bounds_file, "rb") as f:
+            return [pickle.load(f) for _ in range(bound_count)]
+
+    def save(self, sampler):
+        """
+        Write the state of a sampler, appending points that have died since the last save to
+        the history. Only the rows the history reads are converted from the sampler's lists,
+        so a save does not copy the whole history. The history and bounds are written first
+        and the state file replaced afterwards, so an interrupted save leaves the previous
+        state loadable.
+        """
+        history_length = len(sampler.saved_id)
+        if history_length > 0:
+            self._history.update(ColumnStack(
+                *[getattr(sampler, name) for name in self.saved_scalars + self.saved_vectors]
+            ))
+
+        state = sampler.__getstate__()
+        for name in self.saved_scalars + self.saved_vectors:
+            del state[name]
+        del state["bound"]
+        state["loglikelihood"] = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        bounds_length = self._save_bounds(sampler.bound)
+
+        with open(f"{self.state_file}.tmp", "wb") as f:
+            pickle.dump(
+                {
+                    "cls": type(sampler),
+                    "state": state,
+                    "bound_count": len(sampler.bound),
+                    "bounds_length": bounds_length,
+                    "history_length": history_length,
+                    "random_state": np.random.get_state(),
+                },
+                f,
+            )
+        os.replace(f"{self.state_file}.tmp", self.state_file)
+
+    def load(self):
+        """
+        Restore the sampler from the state file and history. The global numpy random state is
+        restored, and the sampler's likelihood function must be set before it is run.
+        """
+        checkpoint = self._load_state()
+
+        sampler = checkpoint["cls"].__new__(checkpoint["cls"])
+        sampler.__dict__.update(checkpoint["state"])
+        sampler.rstate = np.random
+        sampler.bound = self._load_bounds(checkpoint["bound_count"])
+        np.random.set_state(checkpoint["random_state"])
+
+        history_length = checkpoint["history_length"]
+        history = self._history.load() if history_length > 0 else None
+        if history is None:
+            history = np.zeros((0, len(self.saved_scalars) + 2 * sampler.npdim))
+        history = history[:history_length]
+
+        for index, name in enumerate(self.saved_scalars):
+            column = history[:, index]
+            if name in self.saved_integers:
+                column = column.astype("int")
+            setattr(sampler, name, column.tolist())
+
+        start = len(self.saved_scalars)
+        for name in self.saved_vectors:
+            width = (history.shape[1] - start) if name == self.saved_vectors[-1] else sampler.npdim
+            setattr(sampler, name, list(history[:, start:start + width]))
+            start += width
+
+        return sampler
+
+    def clear(self):
+        self._history.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
 class AbstractDynesty(AbstractNest):
     def __init__(
             self,
@@ -54,8 +222,8 @@ class AbstractDynesty(AbstractNest):
 
         Extensions:
 
-        - Allows runs to be terminated and resumed from the point it was terminated. This is achieved by pickling the
-          sampler instance during the model-fit after an input number of iterations.
+        - Allows runs to be terminated and resumed from the point it was terminated. This is achieved by checkpointing
+          the state of the sampler during the model-fit after an input number of iterations.
 
         Attributes unique to **PyAutoFit** are described below, all remaining attributes are DyNesty parameters are
         described at the Dynesty API webpage:
@@ -277,13 +445,13 @@ class AbstractDynesty(AbstractNest):
         set of accepted ssamples of the fit.
         """
 
-        pool, pool_ids = self.make_pool()
+        pool, pool_ids = self.make_pool(model=model, analysis=analysis)
 
         fitness_function = self.fitness_function_from_model_and_analysis(
             model=model, analysis=analysis, pool_ids=pool_ids, log_likelihood_cap=log_likelihood_cap,
         )
 
-        if os.path.exists("{}/{}.pickle".format(self.paths.samples_path, "dynesty")):
+        if self.checkpoint.exists or os.path.exists(self.legacy_pickle_file):
 
             sampler = self.load_sampler
             sampler.loglikelihood = fitness_function
@@ -307,6 +475,20 @@ class AbstractDynesty(AbstractNest):
         else:
             sampler.M = pool.map
 
+        # Updates during the search read the samples from the sampler in memory. It is only held
+        # while this search runs, so copies of the search and later updates read the checkpoint.
+        self._sampler = sampler
+
+        try:
+            self._run_sampler(sampler=sampler, model=model, analysis=analysis)
+        finally:
+            self._sampler = None
+
+    def _run_sampler(self, sampler, model, analysis):
+        """
+        Run the sampler until it converges or reaches maxcall, checkpointing it and performing an update after
+        every iterations_per_update iterations.
+        """
         finished = False
 
         while not finished:
@@ -343,13 +525,7 @@ class AbstractDynesty(AbstractNest):
 
                         continue
 
-            sampler_pickle = sampler
-            sampler_pickle.loglikelihood = None
-
-            with open(f"{self.paths.samples_path}/dynesty.pickle", "wb") as f:
-                pickle.dump(sampler_pickle, f)
-
-            sampler_pickle.loglikelihood = fitness_function
+            self.checkpoint.save(sampler)
 
             self.perform_update(model=model, analysis=analysis, during_analysis=True)
 
@@ -392,9 +568,32 @@ class AbstractDynesty(AbstractNest):
 
         return copy
 
+    def __getstate__(self):
+        """
+        The sampler held in memory during a search is not pickled with the search, for example
+        when the search is saved or its fitness function is sent to the workers of a pool.
+        """
+        state = self.__dict__.copy()
+        state.pop("_sampler", None)
+        return state
+
+    @property
+    def checkpoint(self) -> DynestyCheckpoint:
+        return DynestyCheckpoint(path.join(self.paths.samples_path, "dynesty"))
+
+    @property
+    def legacy_pickle_file(self) -> str:
+        """
+        The pickle of the entire sampler written by previous versions, which is still read so
+        that their searches can be resumed.
+        """
+        return path.join(self.paths.samples_path, "dynesty.pickle")
+
     @property
     def load_sampler(self):
-        with open("{}/{}.pickle".format(self.paths.samples_path, "dynesty"), "rb") as f:
+        if self.checkpoint.exists:
+            return self.checkpoint.load()
+        with open(self.legacy_pickle_file, "rb") as f:
             return pickle.load(f)
 
     def sampler_fom_model_and_fitness(self, model, fitness_function):
@@ -403,7 +602,8 @@ class AbstractDynesty(AbstractNest):
     def samples_via_sampler_from_model(self, model):
         """Create a `Samples` object from this non-linear search's output files on the hard-disk and model.
 
-        For Dynesty, all information that we need is available from the instance of the dynesty sampler.
+        For Dynesty, all information that we need is available from the instance of the dynesty sampler, which is
+        used directly during a search and otherwise restored from its checkpoint.
 
         Parameters
         ----------
@@ -413,11 +613,14 @@ class AbstractDynesty(AbstractNest):
         paths : af.Paths
             Manages all paths, e.g. where the search outputs are stored, the samples, etc.
         """
-        sampler = self.load_sampler
+        sampler = getattr(self, "_sampler", None)
+        if sampler is None:
+            # Outside of a search, e.g. for the final update, the sampler is restored from its checkpoint
+            sampler = self.load_sampler
         parameters = sampler.results.samples.tolist()
-        log_priors = [
-            sum(model.log_priors_from_vector(vector=vector)) for vector in parameters
-        ]
+        log_priors = np.sum(
+            model.log_priors_from_array(parameters), axis=1
+        ).tolist()
         log_likelihoods = list(sampler.results.logl)
 
         try:
@@ -432,7 +635,7 @@ class AbstractDynesty(AbstractNest):
 
         return NestSamples(
             model=model,
-            samples=Sample.from_lists(
+            samples=SampleTable.from_lists(
                 log_priors=log_priors,
                 log_likelihoods=log_likelihoods,
                 weights=weights,
@@ -509,7 +712,9 @@ class AbstractDynesty(AbstractNest):
         return [init_unit_parameters, init_parameters, init_log_likelihoods]
 
     def remove_state_files(self):
-        os.remove(f"{self.paths.samples_path}/dynesty.pickle")
+        self.checkpoint.clear()
+        if os.path.exists(self.legacy_pickle_file):
+            os.remove(self.legacy_pickle_file)
 
 
 class DynestyStatic(AbstractDynesty):
@@ -552,8 +757,8 @@ class DynestyStatic(AbstractDynesty):
 
         Extensions:
 
-        - Allows runs to be terminated and resumed from the point it was terminated. This is achieved by pickling the
-          sampler instance during the model-fit after an input number of iterations.
+        - Allows runs to be terminated and resumed from the point it was terminated. This is achieved by checkpointing
+          the state of the sampler during the model-fit after an input number of iterations.
 
         Dynesty parameters are also described at the Dynesty API webpage:
 
@@ -761,10 +966,8 @@ class DynestyDynamic(AbstractDynesty):
         https://github.com/joshspeagle/dynesty
         https://dynesty.readthedocs.io/en/latest/index.html
 
-        Extensions:
-
-        - Allows runs to be terminated and resumed from the point it was terminated. This is achieved by pickling the
-          sampler instance during the model-fit after an input number of iterations.
+        Unlike `DynestyStatic`, the dynamic sampler is not checkpointed during the model-fit, so a run that is
+        terminated starts again from the beginning when it is resumed.
 
         Dynesty parameters are also described at the Dynesty API webpage:
 
@@ -1016,7 +1219,7 @@ class DynestyDynamic(AbstractDynesty):
         set of accepted ssamples of the fit.
         """
 
-        pool, pool_ids = self.make_pool()
+        pool, pool_ids = self.make_pool(model=model, analysis=analysis)
 
         fitness_function = self.fitness_function_from_model_and_analysis(
             model=model, analysis=analysis, pool_ids=pool_ids
@@ -1117,9 +1320,9 @@ class DynestyDynamic(AbstractDynesty):
         """
 
         parameters = sampler.results.samples.tolist()
-        log_priors = [
-            sum(model.log_priors_from_vector(vector=vector)) for vector in parameters
-        ]
+        log_priors = np.sum(
+            model.log_priors_from_array(parameters), axis=1
+        ).tolist()
         log_likelihoods = list(sampler.results.logl)
 
         try:
@@ -1134,7 +1337,7 @@ class DynestyDynamic(AbstractDynesty):
 
         return NestSamples(
             model=model,
-            samples=Sample.from_lists(
+            samples=SampleTable.from_lists(
                 log_likelihoods=log_likelihoods,
                 log_priors=log_priors,
                 weights=weights,
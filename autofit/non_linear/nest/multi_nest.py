@@ -1,10 +1,13 @@
+import numpy as np
+
 from autoconf import conf
 from autofit.mapper.prior_model.abstract import AbstractPriorModel
 from autofit.non_linear import abstract_search
 from autofit.non_linear.log import logger
 from autofit.non_linear.nest import abstract_nest
 from autofit.non_linear.paths import convert_paths
-from autofit.non_linear.samples import NestSamples, Sample
+from autofit.non_linear.profile import profiler
+from autofit.non_linear.samples import NestSamples, SampleTable
 
 
 class MultiNest(abstract_nest.AbstractNest):
@@ -226,7 +229,8 @@ class MultiNest(abstract_nest.AbstractNest):
             if self.should_update_sym():
                 self.paths.copy_from_sym()
 
-            log_likelihood = self.analysis.log_likelihood_function(instance=instance)
+            with profiler("log_likelihood_function"):
+                log_likelihood = self.analysis.log_likelihood_function(instance=instance)
 
             if self.log_likelihood_cap is not None:
                 if log_likelihood > self.log_likelihood_cap:
@@ -259,7 +263,8 @@ class MultiNest(abstract_nest.AbstractNest):
         def prior(cube, ndim, nparams):
             # NEVER EVER REFACTOR THIS LINE! Haha.
 
-            phys_cube = model.vector_from_unit_vector(unit_vector=cube)
+            with profiler("prior_transform"):
+                phys_cube = model.vector_from_unit_vector(unit_vector=cube)
 
             for i in range(len(phys_cube)):
                 cube[i] = phys_cube[i]
@@ -367,7 +372,8 @@ class MultiNest(abstract_nest.AbstractNest):
 
         For MulitNest, this requires us to load:
 
-            - The parameter samples, log likelihood values and weights from the multinest.txt file.
+            - The parameter samples, log likelihood values and weights from the multinest.txt file, which is read
+              once and only parsed where it has changed since the previous update.
             - The total number of samples (e.g. accepted + rejected) from resume.dat.
             - The log evidence of the model-fit from the multinestsummary.txt file (if this is not yet estimated a
               value of -1.0e99 is used.
@@ -379,22 +385,21 @@ class MultiNest(abstract_nest.AbstractNest):
             cube values to physical values via the priors.
         """
 
-        parameters = parameters_from_file_weighted_samples(
-            file_weighted_samples=self.paths.file_weighted_samples,
-            prior_count=model.prior_count,
+        rows = WeightedSamplesReader.for_file(
+            self.paths.file_weighted_samples
+        ).read(
+            prior_count=model.prior_count
         )
 
-        log_priors = [
-            sum(model.log_priors_from_vector(vector=vector)) for vector in parameters
-        ]
+        parameters = rows[:, 2:]
 
-        log_likelihoods = log_likelihoods_from_file_weighted_samples(
-            file_weighted_samples=self.paths.file_weighted_samples
-        )
+        log_priors = np.sum(
+            model.log_priors_from_array(parameters), axis=1
+        ).tolist()
 
-        weights = weights_from_file_weighted_samples(
-            file_weighted_samples=self.paths.file_weighted_samples
-        )
+        log_likelihoods = (-0.5 * rows[:, 1]).tolist()
+
+        weights = rows[:, 0].tolist()
 
         total_samples = total_samples_from_file_resume(
             file_resume=self.paths.file_resume
@@ -406,7 +411,7 @@ class MultiNest(abstract_nest.AbstractNest):
 
         return NestSamples(
             model=model,
-            samples=Sample.from_lists(
+            samples=SampleTable.from_lists(
                 parameters=parameters,
                 log_likelihoods=log_likelihoods,
                 log_priors=log_priors,
@@ -420,76 +425,110 @@ class MultiNest(abstract_nest.AbstractNest):
         )
 
 
-def parameters_from_file_weighted_samples(
-        file_weighted_samples, prior_count
-) -> [[float]]:
-    """Open the file "multinest.txt" and extract the parameter values of every accepted live point as a list
-    of lists."""
-    weighted_samples = open(file_weighted_samples)
+class WeightedSamplesReader:
+    # The width of each field of multinest.txt
+    field_width = 28
 
-    total_samples = 0
-    for line in weighted_samples:
-        total_samples += 1
+    _readers = dict()
 
-    weighted_samples.seek(0)
-
-    parameters = []
-
-    for line in range(total_samples):
-        vector = []
-        weighted_samples.read(56)
-        for param in range(prior_count):
-            vector.append(float(weighted_samples.read(28)))
-        weighted_samples.readline()
-        parameters.append(vector)
-
-    weighted_samples.close()
+    def __init__(self, file_weighted_samples: str):
+        """
+        Reads the file "multinest.txt", whose rows are the weight, -2 times the log likelihood and parameters of
+        every accepted live point.
 
-    return parameters
+        MultiNest rewrites the file on every update and reweights earlier samples, so rows are not appended and
+        every read of a changed file is a full reparse, with a single numpy conversion of every column. The rows
+        parsed are kept with the contents of the file they were parsed from, so reading the weights, log
+        likelihoods and parameters of the same update parses the file once.
 
+        Parameters
+        ----------
+        file_weighted_samples
+            The path of the multinest.txt file
+        """
+        self.file_weighted_samples = file_weighted_samples
+        self._string = None
+        self._rows = None
 
-def log_likelihoods_from_file_weighted_samples(file_weighted_samples) -> [float]:
-    """Open the file "multinest.txt" and extract the log likelihood values of every accepted live point as a list."""
-    weighted_samples = open(file_weighted_samples)
+    @classmethod
+    def for_file(cls, file_weighted_samples: str) -> "WeightedSamplesReader":
+        """
+        Retrieve the reader for a file, creating it if it does not exist. Readers are reused so that a file
+        which has not changed is not parsed again.
+        """
+        if file_weighted_samples not in cls._readers:
+            cls._readers[file_weighted_samples] = cls(file_weighted_samples)
+        return cls._readers[file_weighted_samples]
 
-    total_samples = 0
-    for line in weighted_samples:
-        total_samples += 1
+    def read(self, prior_count: int) -> np.ndarray:
+        """
+        Parse the file, unless it is unchanged since it was last read.
 
-    weighted_samples.seek(0)
+        Parameters
+        ----------
+        prior_count
+            The number of parameters in each row
 
-    log_likelihoods = []
+        Returns
+        -------
+        A (total_samples, 2 + prior_count) array of the columns of the file
+        """
+        columns = 2 + prior_count
 
-    for line in range(total_samples):
-        weighted_samples.read(28)
-        log_likelihoods.append(-0.5 * float(weighted_samples.read(28)))
-        weighted_samples.readline()
+        with open(self.file_weighted_samples, "rb") as f:
+            string = f.read()
 
-    weighted_samples.close()
+        if string == self._string and self._rows.shape[1] == columns:
+            return self._rows
 
-    return log_likelihoods
+        # A final line without a newline is only parsed once all of its fields have been written
+        last_line = string[string.rfind(b"\n") + 1:]
+        parsed = string
+        if len(last_line) < self.field_width * columns:
+            parsed = string[:len(string) - len(last_line)]
 
+        self._rows = np.array(
+            parsed.split(),
+            dtype=float
+        ).reshape(-1, columns)
+        self._string = string
 
-def weights_from_file_weighted_samples(file_weighted_samples) -> [float]:
-    """Open the file "multinest.txt" and extract the weight values of every accepted live point as a list."""
-    weighted_samples = open(file_weighted_samples)
+        return self._rows
 
-    total_samples = 0
-    for line in weighted_samples:
-        total_samples += 1
 
-    weighted_samples.seek(0)
+def parameters_from_file_weighted_samples(
+        file_weighted_samples, prior_count
+) -> [[float]]:
+    """Open the file "multinest.txt" and extract the parameter values of every accepted live point as a list
+    of lists."""
+    rows = WeightedSamplesReader.for_file(file_weighted_samples).read(prior_count)
+    return rows[:, 2:].tolist()
 
-    log_likelihoods = []
 
-    for line in range(total_samples):
-        weighted_samples.read(4)
-        log_likelihoods.append(float(weighted_samples.read(24)))
-        weighted_samples.readline()
+def log_likelihoods_from_file_weighted_samples(file_weighted_samples, prior_count=None) -> [float]:
+    """Open the file "multinest.txt" and extract the log likelihood values of every accepted live point as a list."""
+    rows = WeightedSamplesReader.for_file(file_weighted_samples).read(
+        _prior_count(file_weighted_samples, prior_count)
+    )
+    return (-0.5 * rows[:, 1]).tolist()
 
-    weighted_samples.close()
 
-    return log_likelihoods
+def weights_from_file_weighted_samples(file_weighted_samples, prior_count=None) -> [float]:
+    """Open the file "multinest.txt" and extract the weight values of every accepted live point as a list."""
+    rows = WeightedSamplesReader.for_file(file_weighted_samples).read(
+        _prior_count(file_weighted_samples, prior_count)
+    )
+    return rows[:, 0].tolist()
+
+
+def _prior_count(file_weighted_samples, prior_count=None) -> int:
+    """
+    The number of parameters in each row of "multinest.txt", found from the first line if it is not given.
+    """
+    if prior_count is not None:
+        return prior_count
+    with open(file_weighted_samples) as weighted_samples:
+        return len(weighted_samples.readline().split()) - 2
 
 
 def total_samples_from_file_resume(file_resume):
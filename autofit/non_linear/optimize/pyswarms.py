@@ -8,7 +8,7 @@ from autofit.mapper.prior_model.abstract import AbstractPriorModel
 from autofit.non_linear.log import logger
 from autofit.non_linear.optimize.abstract_optimize import AbstractOptimizer
 from autofit.non_linear.paths import convert_paths
-from autofit.non_linear.samples import OptimizerSamples, Sample
+from autofit.non_linear.samples import OptimizerSamples, SampleTable
 
 
 class AbstractPySwarms(AbstractOptimizer):
@@ -132,6 +132,14 @@ class AbstractPySwarms(AbstractOptimizer):
     class Fitness(AbstractOptimizer.Fitness):
         def __call__(self, parameters):
 
+            if self.is_batched:
+                log_posteriors = self.log_posteriors_from_parameter_array(parameter_array=parameters)
+                return np.where(
+                    np.isnan(log_posteriors),
+                    -2.0 * self.resample_figure_of_merit,
+                    -2.0 * log_posteriors
+                )
+
             figures_of_merit = []
 
             for params_of_particle in parameters:
@@ -173,7 +181,7 @@ class AbstractPySwarms(AbstractOptimizer):
         A result object comprising the Samples object that inclues the maximum log likelihood instance and full
         chains used by the fit.
         """
-        pool, pool_ids = self.make_pool()
+        pool, pool_ids = self.make_pool(model=model, analysis=analysis)
 
         fitness_function = self.fitness_function_from_model_and_analysis(
             model=model, analysis=analysis, pool_ids=pool_ids
@@ -320,16 +328,16 @@ class AbstractPySwarms(AbstractOptimizer):
         parameters = [
             param.tolist() for parameters in self.load_points for param in parameters
         ]
-        log_priors = [
-            sum(model.log_priors_from_vector(vector=vector)) for vector in parameters
-        ]
+        log_priors = np.sum(
+            model.log_priors_from_array(parameters), axis=1
+        ).tolist()
         log_posteriors = self.load_log_posteriors
         log_likelihoods = [lp - prior for lp, prior in zip(log_posteriors, log_priors)]
         weights = len(log_likelihoods) * [1.0]
 
         return OptimizerSamples(
             model=model,
-            samples=Sample.from_lists(
+            samples=SampleTable.from_lists(
                 parameters=[parameters.tolist()[0] for parameters in self.load_points],
                 log_likelihoods=log_likelihoods,
                 log_priors=log_priors,
@@ -1,9 +1,16 @@
+import json
 import multiprocessing
+import os
+import pickle
+import queue
+import shutil
+import traceback
 from abc import ABC, abstractmethod
 from itertools import count
-from time import sleep
-from typing import Iterable
+from os import path
+from typing import Dict, Iterable, Iterator, Set
 
+from autofit import exc
 from autofit.non_linear.log import logger
 
 
@@ -29,6 +36,7 @@ class AbstractJob(ABC):
 
     def __init__(self):
         self.number = next(self._number)
+        self.number_of_cores = 1
 
     @abstractmethod
     def perform(self):
@@ -37,50 +45,174 @@ class AbstractJob(ABC):
         """
 
 
-class Process(multiprocessing.Process):
-    def __init__(self, name: str, job_queue: multiprocessing.Queue):
+class JobFailure:
+    def __init__(self, number: int, message: str):
         """
-        A parallel process that consumes Jobs through the job queue and outputs results through its own queue.
+        Sent in place of a result when a job raises an exception in a worker.
+        """
+        self.number = number
+        self.message = message
+
+
+def _work(
+        job_queue: multiprocessing.Queue,
+        result_queue: multiprocessing.Queue,
+        current_jobs,
+        index: int,
+):
+    """
+    Take jobs from the shared queue until a None is received, putting the result of
+    each in the result queue.
+
+    The number of the job taken is written to current_jobs[index] first, so the parent
+    knows which job was lost if the worker dies.
+    """
+    for job in iter(job_queue.get, None):
+        current_jobs[index] = job.number
+        try:
+            result = job.perform()
+        except Exception:
+            result = JobFailure(job.number, traceback.format_exc())
+        result_queue.put(result)
+
+
+class JobScheduler:
+    def __init__(
+            self,
+            number_of_cores: int,
+            cores_per_job: int = 1,
+            timeout: float = 1.0,
+    ):
+        """
+        Runs jobs, such as the cells of a grid search, on worker processes.
+
+        Workers take the next job from a shared queue as soon as they finish their last,
+        so a worker given quick jobs goes on to take work that would otherwise wait on
+        a worker with slow jobs. Workers block on the queue of jobs. The parent blocks on
+        the queue of results, checking that no worker has died whenever no result arrives
+        within the timeout.
+
+        Parameters
+        ----------
+        number_of_cores
+            The number of cores this computer has. One core is kept for the parent process,
+            so this must be at least 2.
+        cores_per_job
+            The minimum number of cores each job is given, e.g. the number of cores a search
+            performed by each job parallelizes over. If there are fewer jobs than workers the
+            cores that would be idle are shared between the jobs.
+        timeout
+            The number of seconds the parent waits for a result before checking the workers
+        """
+        if number_of_cores < 2:
+            raise AssertionError(
+                "The number of cores available must be at least 2 for parallel to run"
+            )
+        self.number_of_cores = number_of_cores
+        self.cores_per_job = max(1, min(cores_per_job, number_of_cores - 1))
+        self.timeout = timeout
+
+    def allocate(self, total_jobs: int):
+        """
+        The number of worker processes to start and the number of cores each job is given.
+        """
+        available = self.number_of_cores - 1
+        processes = max(1, min(total_jobs, available // self.cores_per_job))
+        return processes, available // processes
+
+    def run(self, jobs: Iterable[AbstractJob]) -> Iterator[AbstractJobResult]:
+        """
+        Run the jobs, yielding each result as it becomes available.
 
         Parameters
         ----------
-        name: str
-            The name of the process
-        job_queue: multiprocessing.Queue
-            The queue through which jobs are submitted
-        """
-        super().__init__(name=name)
-        logger.info("created process {}".format(name))
-
-        self.job_queue = job_queue
-        self.queue = multiprocessing.Queue()
-        self.count = 0
-        self.max_count = 250
-
-    def run(self):
-        """
-        Run this process, completing each job in the job_queue and
-        passing the result to the queue.
-        """
-        logger.info("starting process {}".format(self.name))
-        while True:
-            sleep(0.025)
-            if self.count >= self.max_count:
-                break
-            if self.job_queue.empty():
-                self.count += 1
-            else:
-                self.count = 0
-                job = self.job_queue.get()
-                self.queue.put(job.perform())
-        logger.info("terminating process {}".format(self.name))
-        self.job_queue.close()
+        jobs
+            Serializable concrete children of the AbstractJob class
+
+        Raises
+        ------
+        JobException
+            If a job raises an exception or a worker dies, e.g. killed for running out of
+            memory
+        """
+        jobs = list(jobs)
+        if len(jobs) == 0:
+            return
+
+        processes, cores = self.allocate(len(jobs))
+        logger.info(
+            f"Running {len(jobs)} jobs on {processes} processes with {cores} cores per job"
+        )
+
+        job_queue = multiprocessing.Queue()
+        result_queue = multiprocessing.Queue()
+
+        for job in jobs:
+            job.number_of_cores = cores
+            job_queue.put(job)
+        for _ in range(processes):
+            job_queue.put(None)
+
+        current_jobs = multiprocessing.Array("l", processes * [-1], lock=False)
+
+        workers = [
+            multiprocessing.Process(
+                target=_work,
+                args=(job_queue, result_queue, current_jobs, number),
+                name=str(number),
+            )
+            for number in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        completed = set()
+
+        try:
+            while len(completed) < len(jobs):
+                try:
+                    result = result_queue.get(timeout=self.timeout)
+                except queue.Empty:
+                    self._check_workers(workers, current_jobs, completed)
+                    continue
+
+                if isinstance(result, JobFailure):
+                    raise exc.JobException(
+                        f"Job {result.number} failed:\n{result.message}"
+                    )
+                completed.add(result.number)
+                yield result
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                worker.join()
+
+    @staticmethod
+    def _check_workers(workers, current_jobs, completed: Set[int]):
+        """
+        Raise an exception if a worker has died while performing a job, or if every
+        worker has exited while jobs remain.
+        """
+        for index, worker in enumerate(workers):
+            number = current_jobs[index]
+            if worker.exitcode not in (None, 0) and number >= 0 and number not in completed:
+                raise exc.JobException(
+                    f"Job {number} was lost as its worker died with exit code {worker.exitcode}"
+                )
+        if not any(worker.is_alive() for worker in workers):
+            raise exc.JobException(
+                "Every worker has exited before all jobs were performed"
+            )
+
 
+class Process:
     @classmethod
     def run_jobs(
             cls,
             jobs: Iterable[AbstractJob],
-            number_of_cores: int
+            number_of_cores: int,
+            cores_per_job: int = 1,
     ):
         """
         Run the collection of jobs across n - 1 other cores.
@@ -91,37 +223,70 @@ class Process(multiprocessing.Process):
             Serializable concrete children of the AbstractJob class
         number_of_cores
             The number of cores this computer has. Must be at least 2.
+        cores_per_job
+            The minimum number of cores each job is given.
         """
-        if number_of_cores < 2:
-            raise AssertionError(
-                "The number of cores available must be at least 2 for parallel to run"
-            )
+        return JobScheduler(
+            number_of_cores,
+            cores_per_job=cores_per_job,
+        ).run(jobs)
 
-        job_queue = multiprocessing.Queue()
 
-        processes = [
-            Process(str(number), job_queue)
-            for number in range(number_of_cores - 1)
-        ]
+class Checkpoint:
+    def __init__(self, directory: str, signature):
+        """
+        Stores the results of completed jobs so that an interrupted set of jobs can be
+        resumed by only running jobs which have not completed.
 
-        total = 0
-        for job in jobs:
-            job_queue.put(job)
-            total += 1
+        Parameters
+        ----------
+        directory
+            Where results are stored
+        signature
+            A JSON serializable description of the set of jobs. Results stored for a
+            different set of jobs are discarded.
+        """
+        self.directory = directory
+        self.signature = json.loads(json.dumps(signature))
 
-        for process in processes:
-            process.start()
+        signature_path = path.join(directory, "signature.json")
+        try:
+            with open(signature_path) as f:
+                is_match = json.load(f) == self.signature
+        except (FileNotFoundError, ValueError):
+            is_match = False
 
-        count = 0
+        if not is_match:
+            shutil.rmtree(directory, ignore_errors=True)
+            os.makedirs(directory)
+            with open(signature_path, "w") as f:
+                json.dump(self.signature, f)
 
-        while count < total:
-            for process in processes:
-                while not process.queue.empty():
-                    result = process.queue.get()
-                    count += 1
-                    yield result
+    def _path_for(self, key) -> str:
+        return path.join(self.directory, f"{key}.pickle")
 
-        job_queue.close()
+    def completed(self) -> Dict[str, object]:
+        """
+        The stored results, by key.
+        """
+        results = dict()
+        for filename in os.listdir(self.directory):
+            key, extension = path.splitext(filename)
+            if extension != ".pickle":
+                continue
+            try:
+                with open(path.join(self.directory, filename), "rb") as f:
+                    results[key] = pickle.load(f)
+            except (EOFError, pickle.UnpicklingError):
+                # Interrupted while the result was being written
+                continue
+        return results
 
-        for process in processes:
-            process.join(timeout=1.0)
+    def save(self, key, result):
+        """
+        Store the result of a job.
+        """
+        temporary_path = f"{self._path_for(key)}.tmp"
+        with open(temporary_path, "wb") as f:
+            pickle.dump(result, f)
+        os.replace(temporary_path, self._path_for(key))
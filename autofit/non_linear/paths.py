@@ -258,6 +258,10 @@ class Paths:
     def file_search_summary(self) -> str:
         return path.join(self.output_path, "search.summary")
 
+    @property
+    def file_profile(self) -> str:
+        return path.join(self.output_path, "profile.json")
+
     @property
     def file_results(self):
         return path.join(self.output_path, "model.results")
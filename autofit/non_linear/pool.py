@@ -0,0 +1,492 @@
+import atexit
+import io
+import itertools
+import multiprocessing as mp
+import multiprocessing.pool
+import os
+import pickle
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from autofit.mapper.model_object import Mutation
+from autofit.mapper.prior_model.abstract import AbstractPriorModel
+from autofit.non_linear.log import logger
+from autofit.non_linear.profile import profiler
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+# Objects that have been sent to pool workers, by key. In the parent process this holds
+# every object shared with a live pool; in a worker it holds every object received.
+_objects = dict()
+
+# Payloads of shared objects whose arrays are in shared memory, by key. The parent
+# process creates and eventually unlinks the blocks; workers attach to them.
+_payloads = dict()
+
+# The key under which each object in _objects was last shared, by id, in the parent process.
+_keys = dict()
+
+_versions = itertools.count()
+
+# Blocks of shared memory which could not be closed as arrays still referenced them.
+_unclosed = list()
+
+_barrier = None
+
+
+def _forget_parent_objects():
+    # A forked child, such as a job of the JobScheduler, inherits the record of objects
+    # its parent shared. Those are held by the workers of its parent's pools, not by
+    # any pool the child creates, so they must not be sent as references.
+    _objects.clear()
+    _keys.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_parent_objects)
+
+
+def key_for(obj) -> tuple:
+    """
+    A key identifying a version of an object.
+
+    Models are versioned by the mutation count so a model that has been changed since
+    it was shared is sent in full rather than resolved to a stale copy. Other objects,
+    such as an Analysis, can be changed in place without any record, e.g. by setting
+    hyper images, so they are given a new key and sent again every time they are shared.
+    """
+    if isinstance(obj, AbstractPriorModel):
+        obj.track_mutations()
+        return id(obj), Mutation.count
+    return id(obj), next(_versions)
+
+
+def shared_key(obj) -> Optional[tuple]:
+    """
+    The key of the copy of an object held by pool workers, or None if the object has not
+    been shared or is a model which has changed since it was shared.
+    """
+    key = _keys.get(id(obj))
+    if key is None or _objects.get(key) is not obj:
+        return None
+    if isinstance(obj, AbstractPriorModel) and key[1] != Mutation.count:
+        return None
+    return key
+
+
+class ReferencePickler(pickle.Pickler):
+    def __init__(self, file):
+        """
+        Pickles an object sent to the workers of a pool, with each object the workers
+        already hold replaced by its key, so the data of an Analysis is not sent for
+        every task.
+        """
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def persistent_id(self, obj):
+        return shared_key(obj)
+
+
+class ReferenceUnpickler(pickle.Unpickler):
+    """
+    Unpickles an object pickled by the ReferencePickler in a worker, resolving each key
+    to the copy of the object the worker holds.
+    """
+
+    def persistent_load(self, key):
+        return _objects[key]
+
+
+def dumps(obj) -> bytes:
+    file = io.BytesIO()
+    ReferencePickler(file).dump(obj)
+    return file.getvalue()
+
+
+def loads(data: bytes):
+    return ReferenceUnpickler(io.BytesIO(data)).load()
+
+
+class SharedMemoryPickler(pickle.Pickler):
+    def __init__(self, file):
+        """
+        Pickles an object with each numpy array it contains copied into a block of
+        shared memory. Only the name, shape and dtype of the block are pickled.
+
+        Only arrays whose type is exactly np.ndarray are shared. Subclasses, such as
+        masked arrays, may hold attributes a plain view onto the block would lose, so
+        they fall back to normal pickling, as do empty arrays and arrays of objects.
+        """
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.blocks = list()
+        self._ids = dict()
+
+    def persistent_id(self, obj):
+        if type(obj) is not np.ndarray or obj.dtype.hasobject or obj.nbytes == 0:
+            return None
+        if id(obj) not in self._ids:
+            block = shared_memory.SharedMemory(create=True, size=obj.nbytes)
+            np.ndarray(obj.shape, dtype=obj.dtype, buffer=block.buf)[...] = obj
+            self.blocks.append(block)
+            self._ids[id(obj)] = (block.name, obj.shape, obj.dtype.str)
+        return self._ids[id(obj)]
+
+
+class SharedMemoryUnpickler(pickle.Unpickler):
+    def __init__(self, file):
+        """
+        Unpickles an object pickled by the SharedMemoryPickler, attaching read only
+        views onto the shared memory in place of each array.
+        """
+        super().__init__(file)
+        self.blocks = list()
+
+    def persistent_load(self, pid):
+        name, shape, dtype = pid
+        block = shared_memory.SharedMemory(name=name)
+        self.blocks.append(block)
+        # Unlike np.ndarray, np.frombuffer holds the buffer of the block, so the block
+        # cannot be closed while the array is in use
+        array = np.frombuffer(
+            block.buf, dtype=dtype, count=int(np.prod(shape))
+        ).reshape(shape)
+        array.flags.writeable = False
+        return array
+
+
+class SharedMemoryPayload:
+    def __init__(self, obj):
+        """
+        An object pickled with its arrays in shared memory, so that every worker
+        attaches to a single copy of the arrays instead of unpickling its own.
+
+        Parameters
+        ----------
+        obj
+            An object, such as an Analysis, holding numpy arrays
+        """
+        file = io.BytesIO()
+        pickler = SharedMemoryPickler(file)
+        pickler.dump(obj)
+        self.data = file.getvalue()
+        self.blocks = pickler.blocks
+
+    def __getstate__(self):
+        return {"data": self.data, "blocks": list()}
+
+    def load(self):
+        unpickler = SharedMemoryUnpickler(io.BytesIO(self.data))
+        obj = unpickler.load()
+        self.blocks = unpickler.blocks
+        return obj
+
+
+def _try_close(block) -> bool:
+    try:
+        block.close()
+        return True
+    except BufferError:
+        return False
+
+
+def _close(blocks, unlink=False):
+    # Blocks still referenced by an array are kept, and closed by a later call once
+    # the arrays have been released
+    _unclosed[:] = [block for block in _unclosed if not _try_close(block)]
+    for block in blocks:
+        if not _try_close(block):
+            _unclosed.append(block)
+        if unlink:
+            # The segment is removed once every process has closed it
+            block.unlink()
+
+
+def _initialize_worker(queue, barrier):
+    global _barrier
+    _barrier = barrier
+    # Timings recorded by the parent before the fork are not the worker's
+    profiler.reset()
+    queue.put(os.getpid())
+
+
+def _call(arguments):
+    function, item = arguments
+    return loads(function)(loads(item))
+
+
+def _call_once(arguments):
+    function, args = arguments
+    result = function(*args)
+    _barrier.wait()
+    return result
+
+
+def _store(arguments):
+    objects, previous_keys = arguments
+    for key in previous_keys:
+        _objects.pop(key, None)
+        payload = _payloads.pop(key, None)
+        if payload is not None:
+            _close(payload.blocks)
+    for key, obj in objects.items():
+        if isinstance(obj, SharedMemoryPayload):
+            payload = obj
+            obj = payload.load()
+            _payloads[key] = payload
+        _objects[key] = obj
+    _barrier.wait()
+
+
+class WorkerPool:
+    # Pools by the id of the process that created them and their number of processes
+    _pools: Dict[Tuple[int, int], "WorkerPool"] = dict()
+
+    def __init__(self, processes: int):
+        """
+        A pool of worker processes which stays alive across searches.
+
+        Large objects such as the Analysis are sent to every worker once through
+        `share`. Afterwards the functions and arguments passed to `map` are pickled
+        with only a key for each, so the data is not sent again for every task.
+
+        Parameters
+        ----------
+        processes
+            The number of worker processes
+        """
+        self.processes = processes
+
+        if shared_memory is not None:
+            # Workers attaching to shared memory then register it with the resource tracker
+            # of this process rather than starting their own, which would unlink the memory
+            # when the workers exit.
+            from multiprocessing import resource_tracker
+            resource_tracker.ensure_running()
+
+        queue = mp.Queue()
+        self._pool = mp.Pool(
+            processes=processes,
+            initializer=_initialize_worker,
+            initargs=(queue, mp.Barrier(processes)),
+        )
+        self.ids: List[int] = [
+            queue.get() for _ in range(processes)
+        ]
+        self._shared = dict()
+
+    @classmethod
+    def for_cores(cls, number_of_cores: int) -> Optional["WorkerPool"]:
+        """
+        Retrieve the pool with a given number of processes, creating it the first time
+        it is requested. None is returned for a single core.
+
+        Pools belong to the process that created them, so a forked child creates its own
+        rather than using the workers of its parent. A pool is created again if any of its
+        workers has exited, as the workers replacing them hold none of the shared objects.
+        """
+        if number_of_cores == 1:
+            return None
+        key = (os.getpid(), number_of_cores)
+        pool = cls._pools.get(key)
+        if pool is not None and not pool.is_alive:
+            logger.warning(
+                f"A worker of the pool with {number_of_cores} processes has exited; starting a new pool"
+            )
+            del cls._pools[key]
+            pool.terminate()
+            pool = None
+        if pool is None:
+            pool = cls._pools[key] = cls(number_of_cores)
+        return pool
+
+    @classmethod
+    def existing(cls, number_of_cores: int) -> Optional["WorkerPool"]:
+        """
+        The pool with a given number of processes if this process has created it, otherwise None.
+        """
+        return cls._pools.get((os.getpid(), number_of_cores))
+
+    @classmethod
+    def all(cls) -> List["WorkerPool"]:
+        """
+        Every pool created by this process
+        """
+        pid = os.getpid()
+        return [
+            pool
+            for (owner, _), pool in cls._pools.items()
+            if owner == pid
+        ]
+
+    @classmethod
+    def close_all(cls):
+        """
+        Terminate every pool created by this process and forget those inherited from a parent
+        """
+        pools = cls.all()
+        cls._pools = dict()
+        for pool in pools:
+            pool.terminate()
+
+    @property
+    def is_alive(self) -> bool:
+        """
+        Are all the workers the pool started with still running?
+        """
+        # noinspection PyProtectedMember
+        workers = self._pool._pool
+        return all(
+            worker.is_alive() for worker in workers
+        ) and {worker.pid for worker in workers} == set(self.ids)
+
+    def _stop_workers(self):
+        """
+        Stop the workers of a pool one of whose workers has exited.
+
+        A worker killed while waiting for a task exits holding the lock of the task
+        queue, which terminating the pool would wait for forever. Replacement workers
+        are no longer started, the remaining workers are killed and the lock replaced.
+        """
+        # noinspection PyProtectedMember
+        pool = self._pool
+        pool._worker_handler._state = mp.pool.TERMINATE
+        pool._change_notifier.put(None)
+        pool._worker_handler.join()
+        for worker in pool._pool:
+            worker.kill()
+            worker.join()
+        pool._inqueue._rlock = mp.Lock()
+
+    @property
+    def keys(self):
+        return {key for key, _ in self._shared.values()}
+
+    def map(self, func, iterable, chunksize=None):
+        """
+        Call a function for each item of an iterable in the workers, with any object
+        the workers already hold sent as a reference to their copy.
+        """
+        with profiler("pool_map"):
+            function = dumps(func)
+            return self._pool.map(
+                _call,
+                [(function, dumps(item)) for item in iterable],
+                chunksize
+            )
+
+    def broadcast(self, function, *args) -> list:
+        """
+        Call a function once in every worker.
+
+        Parameters
+        ----------
+        function
+            A function which can be pickled, e.g. one defined at module level
+        args
+            Arguments passed to the function
+
+        Returns
+        -------
+        The value returned by the function in each worker
+        """
+        # Each task blocks on a barrier until every worker has taken one
+        return self._pool.map(
+            _call_once,
+            self.processes * [(function, args)],
+            chunksize=1,
+        )
+
+    def share(self, **objects):
+        """
+        Send objects to every worker, replacing any object previously shared under
+        the same name. Models that workers already hold unchanged are not sent again;
+        other objects are always sent, as they may have changed in place.
+
+        Parameters
+        ----------
+        objects
+            Objects to share by name, e.g. model=model, analysis=analysis
+        """
+        updates = {
+            name: (key, obj)
+            for name, obj, key in (
+                (name, obj, key_for(obj))
+                for name, obj in objects.items()
+                if obj is not None
+            )
+            if name not in self._shared or self._shared[name][0] != key
+        }
+        if len(updates) == 0:
+            return
+
+        previous_keys = [
+            self._shared[name][0]
+            for name in updates
+            if name in self._shared
+        ]
+        arguments = (
+            {
+                key: self._payload_for(key, obj)
+                for key, obj in updates.values()
+            },
+            previous_keys
+        )
+
+        # Each task blocks on a barrier until every worker has taken one, so every
+        # worker receives exactly one copy.
+        self._pool.map(
+            _store,
+            self.processes * [arguments],
+            chunksize=1,
+        )
+
+        self._shared.update(updates)
+        _objects.update(updates.values())
+        _keys.update(
+            (id(obj), key)
+            for key, obj in updates.values()
+        )
+        self._release(previous_keys)
+
+    @staticmethod
+    def _payload_for(key, obj):
+        """
+        The object as it is sent to workers. Objects with a use_shared_memory attribute
+        set to True, such as an Analysis opting in, have their arrays placed in shared
+        memory once; the blocks are unlinked when the object is released.
+        """
+        if not getattr(obj, "use_shared_memory", False):
+            return obj
+        if shared_memory is None:
+            logger.warning(
+                "Shared memory requires Python 3.8 or later; sending arrays to every worker instead"
+            )
+            return obj
+        if key not in _payloads:
+            _payloads[key] = SharedMemoryPayload(obj)
+        return _payloads[key]
+
+    def _release(self, keys):
+        for key in keys:
+            if not any(key in pool.keys for pool in self._pools.values()):
+                _objects.pop(key, None)
+                if _keys.get(key[0]) == key:
+                    del _keys[key[0]]
+                payload = _payloads.pop(key, None)
+                if payload is not None:
+                    _close(payload.blocks, unlink=True)
+
+    def terminate(self):
+        if not self.is_alive:
+            self._stop_workers()
+        self._pool.terminate()
+        keys = self.keys
+        self._shared = dict()
+        self._release(keys)
+
+
+atexit.register(WorkerPool.close_all)
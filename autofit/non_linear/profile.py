@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from autofit.tools.statistics import StageStatistics
+
+
+class _Timing:
+    __slots__ = ("profiler", "name", "items", "start")
+
+    def __init__(self, profiler, name, items):
+        self.profiler = profiler
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.profiler.stage(self.name).add(
+            time.perf_counter() - self.start,
+            self.items,
+        )
+
+
+class _NoTiming:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_no_timing = _NoTiming()
+
+
+class Profiler:
+    def __init__(self, enabled: bool = False):
+        """
+        Records how long each stage of a search takes, e.g. creating instances or calling
+        the log likelihood function.
+
+        Stages are timed by using the profiler as a context manager:
+
+        with profiler("log_likelihood_function"):
+            analysis.log_likelihood_function(instance)
+
+        When the profiler is disabled this returns a context manager which does nothing,
+        so instrumentation costs only the call.
+
+        Parameters
+        ----------
+        enabled
+            Whether stages are timed
+        """
+        self.enabled = enabled
+        self.stages: Dict[str, StageStatistics] = defaultdict(StageStatistics)
+        self._lock = threading.Lock()
+
+    def stage(self, name: str) -> StageStatistics:
+        """
+        The statistics of a stage, created the first time it is timed. Stages may be timed
+        from the background thread performing updates, so creation is guarded by a lock.
+        """
+        stages = self.stages
+        if name not in stages:
+            with self._lock:
+                return stages[name]
+        return stages[name]
+
+    def __call__(self, name: str, items: int = 1):
+        if not self.enabled:
+            return _no_timing
+        return _Timing(self, name, items)
+
+    def reset(self, enabled: bool = None):
+        """
+        Discard every recorded timing, optionally enabling or disabling the profiler.
+        """
+        if enabled is not None:
+            self.enabled = enabled
+        self.stages = defaultdict(StageStatistics)
+
+    def dict(self) -> Dict[str, dict]:
+        with self._lock:
+            stages = sorted(self.stages.items())
+        return {
+            name: stage.dict()
+            for name, stage in stages
+        }
+
+
+# The profiler of this process. Each worker process of a pool has its own.
+profiler = Profiler()
+
+
+def worker_profile() -> dict:
+    """
+    The timings recorded by the profiler of a worker process, used to summarise the work
+    done by each worker of a pool.
+    """
+    return {
+        "pid": os.getpid(),
+        "stages": profiler.dict(),
+    }
+
+
+def reset_worker_profile(enabled: bool):
+    profiler.reset(enabled)
+
+
+EVALUATION_STAGES = (
+    "log_likelihood_function",
+    "log_likelihood_function_batch",
+)
+
+
+def _evaluations(stages: Dict[str, dict]):
+    """
+    The number of likelihood evaluations and the time spent performing them.
+    """
+    evaluations = sum(
+        stages[name]["items"]
+        for name in EVALUATION_STAGES
+        if name in stages
+    )
+    busy_time = sum(
+        stage["total"]
+        for name, stage in stages.items()
+        if name not in ("fit", "pool_map") and not name.startswith("update")
+    )
+    return evaluations, busy_time
+
+
+def summary(
+        wall_time: float,
+        stages: Dict[str, dict],
+        workers: List[dict],
+) -> dict:
+    """
+    Summarise the timings of a search, as written to profile.json.
+
+    Parameters
+    ----------
+    wall_time
+        How long the search ran for in seconds
+    stages
+        The timings recorded in the parent process
+    workers
+        The timings recorded by each worker process of the pool the search used, if any
+
+    Returns
+    -------
+    A dictionary with the timings of each stage, the throughput of each worker and of
+    the search, and the parallel efficiency of the pool: the fraction of the time spent
+    mapping over the pool that its workers spent evaluating. The sampler time is the time
+    spent in the search that is not accounted for by any stage, i.e. in the sampler itself.
+    """
+    worker_summaries = dict()
+    total_evaluations, _ = _evaluations(stages)
+    total_busy_time = 0.0
+
+    for worker in workers:
+        evaluations, busy_time = _evaluations(worker["stages"])
+        total_evaluations += evaluations
+        total_busy_time += busy_time
+        worker_summaries[str(worker["pid"])] = {
+            "likelihood_evaluations": evaluations,
+            "busy_time": busy_time,
+            "evaluations_per_second": evaluations / busy_time if busy_time else 0.0,
+            "stages": worker["stages"],
+        }
+
+    profile = {
+        "wall_time": wall_time,
+        "likelihood_evaluations": total_evaluations,
+        "evaluations_per_second": total_evaluations / wall_time if wall_time else 0.0,
+        "stages": stages,
+        "workers": worker_summaries,
+    }
+
+    pool_time = stages.get("pool_map", {}).get("total", 0.0)
+    if len(workers) > 0 and pool_time > 0:
+        profile["parallel_efficiency"] = total_busy_time / (pool_time * len(workers))
+
+    if "fit" in stages:
+        _, parent_busy_time = _evaluations(stages)
+        profile["sampler_time"] = max(
+            0.0,
+            stages["fit"]["total"] - parent_busy_time - pool_time - stages.get("update", {}).get("total", 0.0)
+        )
+
+    return profile
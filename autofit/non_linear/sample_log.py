@@ -0,0 +1,324 @@
+import hashlib
+import json
+import os
+import shutil
+from os import path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from autofit.non_linear.samples import OptimizerSamples, SampleTable
+
+
+class ColumnStack:
+    def __init__(self, *columns: Sequence):
+        """
+        The columns of an array, which are only converted and stacked into rows for the
+        slices of the array a segment log reads. Stacking every row on each update would
+        cost as much as the whole history.
+
+        Parameters
+        ----------
+        columns
+            Arrays or lists of equal length, each of which is one or more columns
+        """
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __getitem__(self, item: slice) -> np.ndarray:
+        return np.column_stack([
+            np.asarray(column[item])
+            for column in self.columns
+        ])
+
+
+class SegmentLog:
+    def __init__(self, directory: str):
+        """
+        An append-only log of the rows of an array, stored as a series of .npy segments.
+
+        Each update writes only the rows added since the previous update. Rows are only
+        expected to change at the end of the array, for example because a nested sampler
+        has replaced the live points at the end of its samples. Segments are therefore
+        checked against the array from the last, and once one is unchanged every earlier
+        segment is assumed to be too. Changed segments are removed and written again along
+        with every later row, so only the tail of the log is ever read or rewritten.
+
+        Parameters
+        ----------
+        directory
+            The directory in which segments are stored
+        """
+        self.directory = directory
+        self._segments = None
+
+    def _segment_path(self, index: int) -> str:
+        return path.join(self.directory, f"segment_{index:05d}.npy")
+
+    def _load_segments(self):
+        """
+        Read the existing segments, e.g. when a search is resumed, to find the rows each
+        one holds and their digest.
+        """
+        self._segments = list()
+        stop = 0
+        while path.exists(self._segment_path(len(self._segments))):
+            segment = np.load(self._segment_path(len(self._segments)))
+            start, stop = stop, stop + len(segment)
+            self._segments.append(
+                (start, stop, hashlib.sha1(segment.tobytes()).digest())
+            )
+
+    @property
+    def count(self) -> int:
+        """
+        The number of rows that have been written.
+        """
+        if self._segments is None:
+            self._load_segments()
+        if len(self._segments) == 0:
+            return 0
+        return self._segments[-1][1]
+
+    def update(self, array: Sequence[np.ndarray]) -> int:
+        """
+        Persist an array whose rows are expected to extend the rows already written.
+
+        Parameters
+        ----------
+        array
+            The complete array, including rows written by previous updates, or a
+            ColumnStack of its columns
+
+        Returns
+        -------
+        The number of rows written
+        """
+        if self._segments is None:
+            self._load_segments()
+
+        for index in reversed(range(len(self._segments))):
+            start, stop, digest = self._segments[index]
+            if stop <= len(array) and hashlib.sha1(
+                    _rows(array, start, stop).tobytes()
+            ).digest() == digest:
+                break
+            self._truncate(index)
+
+        new = _rows(array, self.count, len(array))
+        if len(new) > 0:
+            self._write(new)
+            self._segments.append(
+                (self.count, len(array), hashlib.sha1(new.tobytes()).digest())
+            )
+        return len(new)
+
+    def _write(self, rows: np.ndarray):
+        """
+        Write rows as a new segment after the last.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        np.save(self._segment_path(len(self._segments)), rows)
+
+    def _truncate(self, index: int):
+        """
+        Remove the segment at an index and every segment after it.
+        """
+        for i in range(index, len(self._segments)):
+            os.remove(self._segment_path(i))
+        self._segments = self._segments[:index]
+
+    def load(self) -> Optional[np.ndarray]:
+        """
+        Concatenate every segment into a single array, or None if nothing has been written.
+        """
+        segments = list()
+        while path.exists(self._segment_path(len(segments))):
+            segments.append(np.load(self._segment_path(len(segments))))
+        if len(segments) == 0:
+            return None
+        return np.concatenate(segments)
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._segments = None
+
+
+class WeightLog(SegmentLog):
+    """
+    A segment log of sample weights, which an update may rescale altogether. This is the
+    case for a nested sampler, whose weights are normalised by an evidence that changes as
+    sampling goes on.
+
+    The weights of each segment are stored as they were written, along with the factor by
+    which they have been scaled since. An update which rescales every weight only finds
+    the factor from the last segment and rewrites the factors.
+    """
+
+    @property
+    def _scales_path(self) -> str:
+        return path.join(self.directory, "scales.json")
+
+    def _load_segments(self):
+        scales = list()
+        if path.exists(self._scales_path):
+            with open(self._scales_path) as f:
+                scales = json.load(f)
+
+        self._segments = list()
+        stop = 0
+        while path.exists(self._segment_path(len(self._segments))):
+            index = len(self._segments)
+            length = len(np.load(self._segment_path(index), mmap_mode="r"))
+            start, stop = stop, stop + length
+            self._segments.append(
+                (start, stop, scales[index] if index < len(scales) else 1.0)
+            )
+
+    def _factor(self, index: int, weights: np.ndarray) -> Optional[float]:
+        """
+        The factor by which the weights of a segment have been scaled, or None if they
+        have changed in some other way.
+        """
+        written = np.load(self._segment_path(index)) * self._segments[index][2]
+        reference = np.argmax(written)
+        if written[reference] == 0.0:
+            factor = 1.0
+        else:
+            factor = weights[reference] / written[reference]
+        if np.allclose(weights, factor * written, rtol=1e-10, atol=0.0):
+            return factor
+        return None
+
+    def update(self, array: Sequence[np.ndarray]) -> int:
+        """
+        Persist the weights of every sample, including samples written by previous updates.
+
+        Returns
+        -------
+        The number of weights written
+        """
+        if self._segments is None:
+            self._load_segments()
+
+        factor = 1.0
+        for index in reversed(range(len(self._segments))):
+            start, stop, _ = self._segments[index]
+            if stop <= len(array):
+                matched = self._factor(index, _rows(array, start, stop))
+                if matched is not None:
+                    factor = matched
+                    break
+            self._truncate(index)
+
+        self._segments = [
+            (start, stop, scale * factor)
+            for start, stop, scale in self._segments
+        ]
+
+        new = _rows(array, self.count, len(array))
+        if len(new) > 0:
+            self._write(new)
+            self._segments.append((self.count, len(array), 1.0))
+
+        if len(self._segments) > 0:
+            with open(self._scales_path, "w") as f:
+                json.dump([scale for _, _, scale in self._segments], f)
+        return len(new)
+
+    def load(self) -> Optional[np.ndarray]:
+        if self._segments is None:
+            self._load_segments()
+        if len(self._segments) == 0:
+            return None
+        return np.concatenate([
+            np.load(self._segment_path(index)) * scale
+            for index, (_, _, scale) in enumerate(self._segments)
+        ])
+
+
+def _rows(array: Sequence[np.ndarray], start: int, stop: int) -> np.ndarray:
+    return np.ascontiguousarray(array[start:stop], dtype="float64")
+
+
+class SampleLog:
+    _logs = dict()
+
+    def __init__(self, directory: str):
+        """
+        Incrementally persists the samples of a search during sampling.
+
+        Parameters, log likelihoods and log priors are held in one segment log and
+        weights in a weight log, because nested samplers rescale the weights of existing
+        samples as they go without changing the samples themselves.
+
+        The samples.csv and samples.pickle views are written from the samples at the
+        end of the search, or on demand from this log.
+
+        Parameters
+        ----------
+        directory
+            The directory in which the log is stored
+        """
+        self.directory = directory
+        self._values = SegmentLog(path.join(directory, "values"))
+        self._weights = WeightLog(path.join(directory, "weights"))
+
+    @classmethod
+    def for_directory(cls, directory: str) -> "SampleLog":
+        """
+        Retrieve the log for a directory, creating it if it does not exist. Logs are
+        reused so that the state of previous updates is not read back from disk.
+        """
+        if directory not in cls._logs:
+            cls._logs[directory] = cls(directory)
+        return cls._logs[directory]
+
+    @property
+    def paths_file(self) -> str:
+        return path.join(self.directory, "paths.json")
+
+    def update(self, samples: OptimizerSamples):
+        """
+        Append any samples added since the last update.
+        """
+        table = samples.samples
+
+        if not path.exists(self.paths_file) or self._paths() != table.paths:
+            self.clear()
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.paths_file, "w") as f:
+                json.dump(table.paths, f)
+
+        self._values.update(ColumnStack(
+            table.parameters,
+            table.log_likelihoods,
+            table.log_priors,
+        ))
+        self._weights.update(table.weights)
+
+    def _paths(self) -> List[str]:
+        with open(self.paths_file) as f:
+            return json.load(f)
+
+    def load(self) -> Optional[SampleTable]:
+        """
+        Read the samples in the log, or None if no samples have been written.
+        """
+        values = self._values.load()
+        if values is None:
+            return None
+        return SampleTable(
+            paths=self._paths(),
+            parameters=values[:, :-2],
+            log_likelihoods=values[:, -2],
+            log_priors=values[:, -1],
+            weights=self._weights.load(),
+        )
+
+    def clear(self):
+        self._values.clear()
+        self._weights.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
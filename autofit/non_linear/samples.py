@@ -1,12 +1,13 @@
 import csv
 import json
 import math
-from typing import List
+from typing import List, Union
 
 import numpy as np
 
 from autofit.mapper.model import ModelInstance
 from autofit.mapper.model_mapper import ModelMapper
+from autofit.mapper.model_object import Mutation
 from autofit.mapper.prior_model.abstract import AbstractPriorModel
 from autofit.tools import util
 
@@ -177,7 +178,153 @@ class Sample:
             )
 
 
-def load_from_table(filename: str) -> List[Sample]:
+class SampleTable:
+    def __init__(
+            self,
+            paths: List[str],
+            parameters: np.ndarray,
+            log_likelihoods: np.ndarray,
+            log_priors: np.ndarray,
+            weights: np.ndarray,
+    ):
+        """
+        The samples taken during a search, stored column-wise in contiguous arrays.
+
+        The table behaves as a sequence of `Sample` objects, which are only created when
+        an individual sample is accessed.
+
+        Parameters
+        ----------
+        paths
+            The model path of each parameter column
+        parameters
+            A (total_samples, total_parameters) array of physical parameter values
+        log_likelihoods
+            The log likelihood of every sample
+        log_priors
+            The log prior of every sample
+        weights
+            The weight of every sample
+        """
+        self.paths = list(paths)
+        self.log_likelihoods = np.asarray(log_likelihoods, dtype="float64")
+        self.log_priors = np.asarray(log_priors, dtype="float64")
+        self.weights = np.asarray(weights, dtype="float64")
+        self.parameters = np.asarray(parameters, dtype="float64").reshape(
+            len(self.log_likelihoods), len(self.paths)
+        )
+        self._path_indices = {
+            path: index
+            for index, path
+            in enumerate(self.paths)
+        }
+
+    @classmethod
+    def from_lists(
+            cls,
+            model: AbstractPriorModel,
+            parameters: List[List[float]],
+            log_likelihoods: List[float],
+            log_priors: List[float],
+            weights: List[float]
+    ) -> "SampleTable":
+        """
+        Create a table from lists of values for each sample, with parameters in the
+        same order as priors in the model.
+
+        As with `Sample.from_lists` the number of samples is that of the shortest list.
+        """
+        total_samples = min(map(len, (parameters, log_likelihoods, log_priors, weights)))
+        return cls(
+            paths=model.model_component_and_parameter_names,
+            parameters=np.asarray(parameters[:total_samples], dtype="float64"),
+            log_likelihoods=log_likelihoods[:total_samples],
+            log_priors=log_priors[:total_samples],
+            weights=weights[:total_samples],
+        )
+
+    @classmethod
+    def from_samples(cls, samples: Union[List[Sample], "SampleTable"]) -> "SampleTable":
+        """
+        Create a table from a list of samples, which are assumed to share parameter paths.
+        """
+        if isinstance(samples, SampleTable):
+            return samples
+
+        paths = list(samples[0].kwargs) if len(samples) > 0 else []
+
+        return cls(
+            paths=paths,
+            parameters=[
+                [sample.kwargs[path] for path in paths]
+                for sample in samples
+            ],
+            log_likelihoods=[sample.log_likelihood for sample in samples],
+            log_priors=[sample.log_prior for sample in samples],
+            weights=[sample.weights for sample in samples],
+        )
+
+    def __len__(self):
+        return len(self.log_likelihoods)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.subset(item)
+        return Sample(
+            log_likelihood=float(self.log_likelihoods[item]),
+            log_prior=float(self.log_priors[item]),
+            weights=float(self.weights[item]),
+            **dict(zip(self.paths, self.parameters[item].tolist()))
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def log_posteriors(self) -> np.ndarray:
+        return self.log_likelihoods + self.log_priors
+
+    def subset(self, item) -> "SampleTable":
+        """
+        A table of the samples selected by a slice, index array or boolean mask.
+        """
+        return SampleTable(
+            paths=self.paths,
+            parameters=self.parameters[item],
+            log_likelihoods=self.log_likelihoods[item],
+            log_priors=self.log_priors[item],
+            weights=self.weights[item],
+        )
+
+    def parameters_for_paths(self, paths: List[str]) -> np.ndarray:
+        """
+        The parameter columns for a list of model paths, in the order of those paths.
+
+        Parameters
+        ----------
+        paths
+            Paths for parameters of a model, as given by model_component_and_parameter_names
+
+        Returns
+        -------
+        A (total_samples, len(paths)) array
+        """
+        try:
+            indices = [self._path_indices[path] for path in paths]
+        except KeyError:
+            paths = util.convert_paths_for_backwards_compatibility(
+                paths=paths,
+                kwargs=self._path_indices
+            )
+            indices = [self._path_indices[path] for path in paths]
+
+        if indices == list(range(len(self.paths))):
+            return self.parameters
+        return self.parameters[:, indices]
+
+
+def load_from_table(filename: str) -> SampleTable:
     """
     Load samples from a table
 
@@ -188,35 +335,38 @@ def load_from_table(filename: str) -> List[Sample]:
 
     Returns
     -------
-    A list of samples, one for each row in the CSV
+    A table of samples, one for each row in the CSV
     """
-    samples = list()
-
     with open(filename, "r+", newline="") as f:
-        reader = csv.reader(f)
-        headers = next(reader)
-        for row in reader:
-            samples.append(
-                Sample(
-                    **{
-                        header: float(value)
-                        for header, value
-                        in zip(
-                            headers,
-                            row
-                        )
-                    }
-                )
-            )
-
-    return samples
+        headers = next(csv.reader(f))
+        values = np.loadtxt(f, delimiter=",", ndmin=2)
+
+    values = values.reshape(-1, len(headers))
+    columns = {
+        header: values[:, index]
+        for index, header
+        in enumerate(headers)
+    }
+    paths = [
+        header
+        for header in headers
+        if header not in ("log_likelihood", "log_prior", "log_posterior", "weights")
+    ]
+
+    return SampleTable(
+        paths=paths,
+        parameters=values[:, [headers.index(path) for path in paths]],
+        log_likelihoods=columns["log_likelihood"],
+        log_priors=columns["log_prior"],
+        weights=columns["weights"],
+    )
 
 
 class OptimizerSamples:
     def __init__(
             self,
             model: ModelMapper,
-            samples: List[Sample],
+            samples: Union[List[Sample], SampleTable],
             time: float = None,
     ):
         """The `Samples` of a non-linear search, specifically the samples of an search which only provides
@@ -227,74 +377,88 @@ class OptimizerSamples:
         ----------
         model : af.ModelMapper
             Maps input vectors of unit parameter values to physical values and model instances via priors.
+        samples
+            The samples of the search, either as a list of `Sample` objects or a `SampleTable`.
         """
         self.model = model
         self.samples = samples
         self.time = time
 
     @property
-    def parameters(self):
+    def samples(self) -> SampleTable:
+        return self._sample_table
+
+    @samples.setter
+    def samples(self, samples):
+        self._sample_table = SampleTable.from_samples(samples)
+        self._model_paths = None
+
+    def __getstate__(self):
+        return {
+            key: value
+            for key, value in self.__dict__.items()
+            if key != "_model_paths"
+        }
 
-        paths = self.model.model_component_and_parameter_names
+    def __setstate__(self, state):
+        if "samples" in state:
+            state["_sample_table"] = SampleTable.from_samples(state.pop("samples"))
+        state["_model_paths"] = None
+        self.__dict__.update(state)
 
-        try:
-            return [
-                sample.parameters_for_model(
-                    self.model, paths
-                )
-                for sample in self.samples
-            ]
-        except KeyError:
-            paths = util.convert_paths_for_backwards_compatibility(paths=paths, kwargs=self.samples[0].kwargs)
-            return [
-                sample.parameters_for_model(
-                    self.model, paths
-                )
-                for sample in self.samples
-            ]
+    @property
+    def model_paths(self) -> List[str]:
+        """
+        The path of every parameter of the model, which is cached until the model changes.
+        """
+        if (
+                self._model_paths is None
+                or self._model_paths[0] is not self.model
+                or self._model_paths[1] != Mutation.count
+        ):
+            self.model.track_mutations()
+            self._model_paths = (
+                self.model,
+                Mutation.count,
+                self.model.model_component_and_parameter_names
+            )
+        return self._model_paths[2]
+
+    @property
+    def parameter_array(self) -> np.ndarray:
+        """
+        A (total_samples, prior_count) array of the physical parameters of every sample, in the same order as
+        priors of the model.
+        """
+        return self._sample_table.parameters_for_paths(self.model_paths)
+
+    @property
+    def parameters(self):
+        return self.parameter_array.tolist()
 
     @property
     def total_samples(self):
-        return len(self.samples)
+        return len(self._sample_table)
 
     @property
     def weights(self):
-        return [
-            sample.weights
-            for sample
-            in self.samples
-        ]
+        return self._sample_table.weights.tolist()
 
     @property
     def log_likelihoods(self):
-        return [
-            sample.log_likelihood
-            for sample
-            in self.samples
-        ]
+        return self._sample_table.log_likelihoods.tolist()
 
     @property
     def log_posteriors(self):
-        return [
-            sample.log_posterior
-            for sample
-            in self.samples
-        ]
+        return self._sample_table.log_posteriors.tolist()
 
     @property
     def log_priors(self):
-        return [
-            sample.log_prior
-            for sample
-            in self.samples
-        ]
+        return self._sample_table.log_priors.tolist()
 
     @property
     def parameters_extract(self):
-        return [
-            [params[i] for params in self.parameters]
-            for i in range(self.model.prior_count)
-        ]
+        return self.parameter_array.T.tolist()
 
     @property
     def _headers(self) -> List[str]:
@@ -302,7 +466,7 @@ class OptimizerSamples:
         Headers for the samples table
         """
 
-        return self.model.model_component_and_parameter_names + [
+        return self.model_paths + [
             "log_likelihood",
             "log_prior",
             "log_posterior",
@@ -314,19 +478,15 @@ class OptimizerSamples:
         """
         Rows in the samples table
         """
+        table = self._sample_table
 
-        log_likelihoods = self.log_likelihoods
-        log_priors = self.log_priors
-        log_posteriors = self.log_posteriors
-        weights = self.weights
-
-        for index, row in enumerate(self.parameters):
-            yield row + [
-                log_likelihoods[index],
-                log_priors[index],
-                log_posteriors[index],
-                weights[index],
-            ]
+        yield from np.column_stack((
+            self.parameter_array,
+            table.log_likelihoods,
+            table.log_priors,
+            table.log_posteriors,
+            table.weights,
+        )).tolist()
 
     def write_table(self, filename: str):
         """
@@ -341,8 +501,7 @@ class OptimizerSamples:
         with open(filename, "w+", newline="") as f:
             writer = csv.writer(f)
             writer.writerow(self._headers)
-            for row in self._rows:
-                writer.writerow(row)
+            writer.writerows(self._rows)
 
     def info_to_json(self, filename):
 
@@ -352,37 +511,37 @@ class OptimizerSamples:
             json.dump(info, outfile)
 
     @property
-    def max_log_likelihood_sample(self) -> Sample:
+    def max_log_likelihood_index(self) -> int:
         """The index of the sample with the highest log likelihood."""
-        most_likely_sample = None
-        for sample in self.samples:
-            if most_likely_sample is None or sample.log_likelihood > most_likely_sample.log_likelihood:
-                most_likely_sample = sample
-        return most_likely_sample
+        log_likelihoods = self._sample_table.log_likelihoods
+        return int(np.argmax(np.where(np.isnan(log_likelihoods), -np.inf, log_likelihoods)))
+
+    @property
+    def max_log_likelihood_sample(self) -> Sample:
+        """The sample with the highest log likelihood."""
+        return self._sample_table[self.max_log_likelihood_index]
 
     @property
     def max_log_likelihood_vector(self) -> [float]:
         """ The parameters of the maximum log likelihood sample of the `NonLinearSearch` returned as a list of values."""
-        return self.max_log_likelihood_sample.parameters_for_model(
-            self.model
-        )
+        return self.parameter_array[self.max_log_likelihood_index].tolist()
 
     @property
     def max_log_likelihood_instance(self) -> ModelInstance:
         """  The parameters of the maximum log likelihood sample of the `NonLinearSearch` returned as a model instance."""
-        return self.max_log_likelihood_sample.instance_for_model(
-            self.model
+        return self.model.instance_from_vector(
+            vector=self.max_log_likelihood_vector
         )
 
     @property
     def max_log_posterior_index(self) -> int:
         """The index of the sample with the highest log posterior."""
-        return int(np.argmax(self.log_posteriors))
+        return int(np.argmax(self._sample_table.log_posteriors))
 
     @property
     def max_log_posterior_vector(self) -> [float]:
         """ The parameters of the maximum log posterior sample of the `NonLinearSearch` returned as a list of values."""
-        return self.parameters[self.max_log_posterior_index]
+        return self.parameter_array[self.max_log_posterior_index].tolist()
 
     @property
     def max_log_posterior_instance(self) -> ModelInstance:
@@ -413,14 +572,14 @@ class OptimizerSamples:
         sample_index : int
             The sample index of the weighted sample to return.
         """
-        return self.model.instance_from_vector(vector=self.parameters[sample_index])
+        return self.model.instance_from_vector(vector=self.parameter_array[sample_index].tolist())
 
 
 class PDFSamples(OptimizerSamples):
     def __init__(
             self,
             model: ModelMapper,
-            samples: List[Sample],
+            samples: Union[List[Sample], SampleTable],
             unconverged_sample_size: int = 100,
             time: float = None,
     ):
@@ -484,7 +643,7 @@ class PDFSamples(OptimizerSamples):
 
         This does not necessarily imply the `NonLinearSearch` has converged overall, only that errors and visualization
         can be performed numerically.."""
-        if np.max(self.weights) > 0.99:
+        if np.max(self._sample_table.weights) > 0.99:
             return False
         return True
 
@@ -493,10 +652,9 @@ class PDFSamples(OptimizerSamples):
         """ The median of the probability density function (PDF) of every parameter marginalized in 1D, returned
         as a list of values."""
         if self.pdf_converged:
-            return [
-                quantile(x=params, q=0.5, weights=self.weights)[0]
-                for params in self.parameters_extract
-            ]
+            return quantile_columns(
+                x=self.parameter_array, q=[0.5], weights=self._sample_table.weights
+            )[0].tolist()
         return self.max_log_likelihood_vector
 
     @property
@@ -528,29 +686,25 @@ class PDFSamples(OptimizerSamples):
         if self.pdf_converged:
             limit = math.erf(0.5 * sigma * math.sqrt(2))
 
-            lower_errors = [
-                quantile(x=params, q=1.0 - limit, weights=self.weights)[0]
-                for params in self.parameters_extract
-            ]
-
-            upper_errors = [
-                quantile(x=params, q=limit, weights=self.weights)[0]
-                for params in self.parameters_extract
-            ]
+            lower_errors, upper_errors = quantile_columns(
+                x=self.parameter_array, q=[1.0 - limit, limit], weights=self._sample_table.weights
+            ).tolist()
 
             return [(lower, upper) for lower, upper in zip(lower_errors, upper_errors)]
 
-        parameters_min = list(
-            np.min(self.parameters[-self.unconverged_sample_size:], axis=0)
-        )
-        parameters_max = list(
-            np.max(self.parameters[-self.unconverged_sample_size:], axis=0)
-        )
+        return self._unconverged_vector_at_sigma()
 
-        return [
-            (parameters_min[index], parameters_max[index])
-            for index in range(len(parameters_min))
-        ]
+    def _unconverged_vector_at_sigma(self) -> [(float, float)]:
+        """
+        A crude estimate of the range of every parameter, using the minimum and maximum values of the most recent
+        *unconverged_sample_size* samples.
+        """
+        parameters = self.parameter_array[-self.unconverged_sample_size:]
+
+        return list(zip(
+            np.min(parameters, axis=0).tolist(),
+            np.max(parameters, axis=0).tolist()
+        ))
 
     def vector_at_upper_sigma(self, sigma) -> [float]:
         """The upper value of every parameter marginalized in 1D at an input sigma value of its probability density
@@ -880,7 +1034,7 @@ class MCMCSamples(PDFSamples):
     def __init__(
             self,
             model: ModelMapper,
-            samples: List[Sample],
+            samples: Union[List[Sample], SampleTable],
             auto_correlation_times: np.ndarray,
             auto_correlation_check_size: int,
             auto_correlation_required_length: int,
@@ -1005,10 +1159,7 @@ class MCMCSamples(PDFSamples):
 
         This is computed by binning all sampls after burn-in into a histogram and take its median (e.g. 50%) value. """
         if self.pdf_converged:
-            return [
-                float(np.percentile(self.samples_after_burn_in[:, i], [50]))
-                for i in range(self.model.prior_count)
-            ]
+            return np.percentile(self.samples_after_burn_in, 50, axis=0).tolist()
 
         return self.max_log_likelihood_vector
 
@@ -1033,33 +1184,20 @@ class MCMCSamples(PDFSamples):
         limit = math.erf(0.5 * sigma * math.sqrt(2))
 
         if self.pdf_converged:
-            samples = self.samples_after_burn_in
+            lower, upper = np.percentile(
+                self.samples_after_burn_in, [100.0 * (1.0 - limit), 100.0 * limit], axis=0
+            ).tolist()
 
-            return [
-                tuple(
-                    np.percentile(samples[:, i], [100.0 * (1.0 - limit), 100.0 * limit])
-                )
-                for i in range(self.model.prior_count)
-            ]
+            return list(zip(lower, upper))
 
-        parameters_min = list(
-            np.min(self.parameters[-self.unconverged_sample_size:], axis=0)
-        )
-        parameters_max = list(
-            np.max(self.parameters[-self.unconverged_sample_size:], axis=0)
-        )
-
-        return [
-            (parameters_min[index], parameters_max[index])
-            for index in range(len(parameters_min))
-        ]
+        return self._unconverged_vector_at_sigma()
 
 
 class NestSamples(PDFSamples):
     def __init__(
             self,
             model: ModelMapper,
-            samples: List[Sample],
+            samples: Union[List[Sample], SampleTable],
             number_live_points: int,
             log_evidence: float,
             total_samples: float,
@@ -1115,7 +1253,7 @@ class NestSamples(PDFSamples):
     def total_accepted_samples(self) -> int:
         """The total number of accepted samples performed by the nested sampler.
         """
-        return len(self.log_likelihoods)
+        return len(self._sample_table)
 
     @property
     def acceptance_ratio(self) -> float:
@@ -1150,29 +1288,10 @@ class NestSamples(PDFSamples):
             to be kept.
         """
 
-        parameter_list = []
-        log_likelihoods = []
-        log_priors = []
-        weights = []
-
-        for sample in self.samples:
+        parameters = self.parameter_array[:, parameter_index]
 
-            parameters = sample.parameters_for_model(model=self.model)
-
-            if (parameters[parameter_index] > parameter_range[0]) and (
-                    parameters[parameter_index] < parameter_range[1]):
-
-                parameter_list.append(parameters)
-                log_likelihoods.append(sample.log_likelihood)
-                log_priors.append(sample.log_prior)
-                weights.append(sample.weights)
-
-        samples = Sample.from_lists(
-            model=self.model,
-            parameters=parameter_list,
-            log_likelihoods=log_likelihoods,
-            log_priors=log_priors,
-            weights=weights
+        samples = self._sample_table.subset(
+            (parameters > parameter_range[0]) & (parameters < parameter_range[1])
         )
 
         return NestSamples(
@@ -1232,3 +1351,45 @@ def quantile(x, q, weights=None):
         cdf /= cdf[-1]
         cdf = np.append(0, cdf)
         return np.interp(q, cdf, x[idx]).tolist()
+
+
+def quantile_columns(x, q, weights):
+    """
+    Compute weighted quantiles of every column of a 2D array of samples at once.
+
+    This gives the same values as calling *quantile* on each column, but sorts all columns in one call.
+
+    Parameters
+    ----------
+    x : array_like[nsamples, ncolumns]
+       The samples.
+    q : array_like[nquantiles,]
+       The list of quantiles to compute. These should all be in the range ``[0, 1]``.
+    weights : array_like[nsamples,]
+        The weight corresponding to each sample.
+
+    Returns
+    -------
+    quantiles : np.ndarray[nquantiles, ncolumns]
+        The sample quantiles of every column computed at ``q``.
+    """
+    x = np.asarray(x)
+    q = np.atleast_1d(q)
+    weights = np.atleast_1d(weights)
+
+    if np.any(q < 0.0) or np.any(q > 1.0):
+        raise ValueError("Quantiles must be between 0 and 1")
+    if len(x) != len(weights):
+        raise ValueError("Dimension mismatch: len(weights) != len(x)")
+
+    idx = np.argsort(x, axis=0)
+    sw = weights[idx]
+    cdf = np.cumsum(sw, axis=0)[:-1]
+    cdf /= cdf[-1]
+    cdf = np.vstack((np.zeros((1, x.shape[1])), cdf))
+    x_sorted = np.take_along_axis(x, idx, axis=0)
+
+    return np.array([
+        np.interp(q, cdf[:, column], x_sorted[:, column])
+        for column in range(x.shape[1])
+    ]).reshape(x.shape[1], len(q)).T
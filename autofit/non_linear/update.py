@@ -0,0 +1,98 @@
+import threading
+from typing import Callable, Dict
+
+from autofit.non_linear.log import logger
+
+
+class UpdatePipeline:
+    _pipelines: Dict[str, "UpdatePipeline"] = dict()
+
+    def __init__(self):
+        """
+        Performs the output tasks of search updates, such as visualization, in a background
+        thread so that sampling resumes as soon as a snapshot of the samples has been taken.
+
+        Updates are performed one at a time and in order. If updates are submitted faster
+        than they are performed they are coalesced: only the latest waiting update is
+        performed, with every task requested by the updates it replaced.
+        """
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._pending = None
+        self._errors = list()
+
+    @classmethod
+    def for_directory(cls, directory: str) -> "UpdatePipeline":
+        """
+        Retrieve the pipeline for the output directory of a search, creating it if it does
+        not exist.
+        """
+        if directory not in cls._pipelines:
+            cls._pipelines[directory] = cls()
+        return cls._pipelines[directory]
+
+    def submit(self, function: Callable, samples, **tasks: bool):
+        """
+        Perform an update in the background.
+
+        Parameters
+        ----------
+        function
+            Called with the samples and the tasks to perform
+        samples
+            A snapshot of the samples of the search, which must not change while sampling continues
+        tasks
+            Flags indicating which tasks the update performs, e.g. visualize=True
+        """
+        with self._lock:
+            if self._pending is not None:
+                _, _, pending_tasks = self._pending
+                tasks = {
+                    name: flag or pending_tasks.get(name, False)
+                    for name, flag in {**pending_tasks, **tasks}.items()
+                }
+            self._pending = (function, samples, tasks)
+
+            if self._idle.is_set():
+                self._idle.clear()
+                threading.Thread(target=self._run).start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._pending is None:
+                    self._idle.set()
+                    return
+                function, samples, tasks = self._pending
+                self._pending = None
+            try:
+                function(samples, **tasks)
+            except Exception as e:
+                logger.exception("Background update failed")
+                self._errors.append(e)
+
+    def join(self, raise_errors: bool = True):
+        """
+        Wait for every submitted update to be performed.
+
+        Parameters
+        ----------
+        raise_errors
+            If False, exceptions raised by updates are only logged, e.g. when the search
+            itself has raised an exception that they must not hide
+
+        Raises
+        ------
+        Exception
+            The first exception raised by an update since the pipeline was last joined
+        """
+        self._idle.wait()
+        errors, self._errors = self._errors, list()
+        if len(errors) == 0:
+            return
+        if raise_errors:
+            raise errors[0]
+        logger.warning(
+            f"{len(errors)} background update(s) failed while the search was failing; the first was: {errors[0]!r}"
+        )
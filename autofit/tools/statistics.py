@@ -0,0 +1,85 @@
+import random
+import threading
+from typing import List
+
+
+class StageStatistics:
+    def __init__(self, reservoir_size: int = 1000):
+        """
+        Timing statistics for a repeated call, e.g. one stage of a search or the calls a
+        multicall makes to a factor.
+
+        The total time and number of calls are exact. Percentiles are estimated from a
+        uniform sample of at most reservoir_size call durations, so memory does not grow
+        with the length of the search.
+
+        Calls may be recorded from several threads, e.g. by updates performed in the
+        background while sampling continues, so the statistics are guarded by a lock.
+
+        Parameters
+        ----------
+        reservoir_size
+            The maximum number of durations held to estimate percentiles
+        """
+        self.reservoir_size = reservoir_size
+        self.calls = 0
+        self.items = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.durations: List[float] = list()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, duration: float, items: int = 1):
+        """
+        Record a call to the stage.
+
+        Parameters
+        ----------
+        duration
+            How long the call took in seconds
+        items
+            How many items were processed by the call, e.g. the number of points whose log
+            likelihood was computed in a batch
+        """
+        with self._lock:
+            self.calls += 1
+            self.items += items
+            self.total += duration
+            self.maximum = max(self.maximum, duration)
+
+            if len(self.durations) < self.reservoir_size:
+                self.durations.append(duration)
+            else:
+                index = random.randrange(self.calls)
+                if index < self.reservoir_size:
+                    self.durations[index] = duration
+
+    def percentile(self, percentile: float) -> float:
+        with self._lock:
+            durations = sorted(self.durations)
+        if len(durations) == 0:
+            return 0.0
+        return durations[min(len(durations) - 1, int(percentile / 100 * len(durations)))]
+
+    def dict(self) -> dict:
+        with self._lock:
+            calls, items, total, maximum = self.calls, self.items, self.total, self.maximum
+        return {
+            "calls": calls,
+            "items": items,
+            "total": total,
+            "mean": total / calls if calls else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": maximum,
+        }
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Time aggregator queries against a synthetic database of fits.
+
+Usage: ./benchmark_database_query.py [--fits 100000] [--no-indexes] [database]
+
+The database is created the first time the script is run with a given path
+and reused afterwards. Pass --no-indexes to drop the indexes of the schema
+and compare the time of each query with full table scans.
+"""
+import os
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+
+import autofit as af
+from autofit import database as db
+from autofit.database import ingest
+from autofit.mock import mock
+
+
+# Placeholder centres replaced by the centres of each fit
+LENS_CENTRE = -1.0
+SOURCE_CENTRE = -2.0
+
+
+def make_rows():
+    """
+    Rows for the model and instance of a fit with placeholder centres, so that
+    the tree of objects is only built and flattened once.
+    """
+    model = af.CollectionPriorModel(
+        lens=af.PriorModel(mock.Gaussian),
+        source=af.PriorModel(mock.Gaussian),
+    )
+    instance = af.ModelInstance(dict(
+        lens=mock.Gaussian(
+            centre=LENS_CENTRE,
+            intensity=1.0,
+            sigma=1.0,
+        ),
+        source=mock.Gaussian(
+            centre=SOURCE_CENTRE,
+            intensity=1.0,
+            sigma=1.0,
+        ),
+    ))
+    return (
+        ingest.flatten(db.Object.from_object(model)),
+        ingest.flatten(db.Object.from_object(instance)),
+    )
+
+
+def make_fit(
+        index: int,
+        centres: np.ndarray,
+        model_rows,
+        instance_rows,
+) -> ingest.FlatFit:
+    values = {
+        LENS_CENTRE: float(centres[0]),
+        SOURCE_CENTRE: float(centres[1]),
+    }
+    instance = list()
+    for table, row in instance_rows:
+        if table == "value" and row["value"] in values:
+            row = {**row, "value": values[row["value"]]}
+        instance.append((table, row))
+    return ingest.FlatFit(
+        path=f"fit_{index}",
+        hash_=str(index),
+        model=model_rows,
+        instance=instance,
+        pickles=[],
+    )
+
+
+def populate(
+        aggregator: db.Aggregator,
+        number: int,
+        batch_size: int = 1000
+):
+    centres = np.random.default_rng(1).uniform(
+        0.0, 2.0, size=(number, 2)
+    )
+    model_rows, instance_rows = make_rows()
+    writer = ingest.BulkWriter(aggregator.session)
+    for index in range(number):
+        writer.add(make_fit(
+            index,
+            centres[index],
+            model_rows,
+            instance_rows,
+        ))
+        if (index + 1) % batch_size == 0:
+            writer.flush()
+    writer.flush()
+    aggregator.session.commit()
+
+
+def drop_indexes(aggregator: db.Aggregator):
+    for table in db.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            aggregator.session.execute(
+                f"DROP INDEX IF EXISTS {index.name}"
+            )
+    aggregator.session.commit()
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("database", nargs="?", default="benchmark.sqlite")
+    parser.add_argument("--fits", type=int, default=100000)
+    parser.add_argument("--no-indexes", action="store_true")
+    args = parser.parse_args()
+
+    exists = os.path.exists(args.database)
+    aggregator = db.Aggregator.from_database(args.database)
+    if not exists:
+        start = time.perf_counter()
+        populate(aggregator, args.fits)
+        print(f"Created {args.fits} fits in {time.perf_counter() - start:.1f}s")
+    if args.no_indexes:
+        drop_indexes(aggregator)
+
+    queries = {
+        "type": aggregator.lens == mock.Gaussian,
+        "value": aggregator.lens.centre > 1.0,
+        "and": (aggregator.lens == mock.Gaussian) & (aggregator.lens.centre > 1.0),
+        "or": (aggregator.lens.centre > 1.9) | (aggregator.lens.centre < 0.1),
+    }
+    for name, predicate in queries.items():
+        query = aggregator._query_string(predicate)
+        start = time.perf_counter()
+        count = len(aggregator.session.execute(query).fetchall())
+        print(f"{name}: {count} fits in {time.perf_counter() - start:.3f}s")
+        print(aggregator.explain(predicate))
+        print()
+
+
+if __name__ == "__main__":
+    main()
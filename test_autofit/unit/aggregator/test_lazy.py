@@ -0,0 +1,64 @@
+import os
+import shutil
+from os import path
+
+import pytest
+
+import autofit as af
+from autofit.aggregator.aggregator import ZipIndex
+
+
+@pytest.fixture(name="lazy_directory")
+def make_lazy_directory(aggregator_directory, tmpdir):
+    directory = str(tmpdir.join("aggregator"))
+    shutil.copytree(aggregator_directory, directory)
+    return directory
+
+
+@pytest.fixture(name="lazy_aggregator")
+def make_lazy_aggregator(lazy_directory):
+    return af.Aggregator(lazy_directory, lazy=True)
+
+
+class TestLazy:
+    def test_not_extracted(self, lazy_aggregator, lazy_directory):
+        assert len(lazy_aggregator) == 2
+        assert sorted(os.listdir(lazy_directory)) == [
+            ZipIndex.filename,
+            "phase.zip",
+            "phase_completed.zip",
+        ]
+
+    def test_pickles(self, lazy_aggregator):
+        assert list(lazy_aggregator.values("dataset"))[0]["name"] == "dataset"
+        assert list(lazy_aggregator.values("model"))[0]["name"] == "model"
+        assert list(lazy_aggregator.values("nonsense"))[0] is None
+
+    def test_metadata(self, lazy_aggregator, path_aggregator):
+        assert sorted(
+            phase.text for phase in lazy_aggregator
+        ) == sorted(
+            phase.text for phase in path_aggregator
+        )
+
+    def test_completed_only(self, lazy_directory):
+        aggregator = af.Aggregator(lazy_directory, completed_only=True, lazy=True)
+        assert len(aggregator) == 1
+        assert "completed" in aggregator[0].directory
+
+    def test_index_reused(self, lazy_directory, monkeypatch):
+        af.Aggregator(lazy_directory, lazy=True)
+
+        def scan(zip_path):
+            raise AssertionError(f"{zip_path} should not be scanned")
+
+        monkeypatch.setattr(ZipIndex, "_scan", staticmethod(scan))
+        assert len(af.Aggregator(lazy_directory, lazy=True)) == 2
+
+    def test_removed_zip_dropped(self, lazy_directory):
+        af.Aggregator(lazy_directory, lazy=True)
+        os.remove(path.join(lazy_directory, "phase.zip"))
+
+        aggregator = af.Aggregator(lazy_directory, lazy=True)
+        assert len(aggregator) == 1
+        assert list(ZipIndex(lazy_directory)._entries) == ["phase_completed.zip"]
@@ -46,6 +46,10 @@ def test_second_level(aggregator):
     assert (aggregator.lens.centre == 1) == q.Q("lens", q.Q("centre", q.V("=", 1)))
 
 
+def test_second_level_inequality(aggregator):
+    assert (aggregator.lens.centre > 1) == q.Q("lens", q.Q("centre", q.V(">", 1)))
+
+
 def test_third_level(aggregator):
     assert (aggregator.lens.centre.x == 1) == q.Q("lens", q.Q("centre", q.Q("x", q.V("=", 1))))
 
@@ -0,0 +1,98 @@
+import pickle
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from autofit import database as db
+from autofit import exc
+from autofit.database.aggregator import Aggregator, _create_indexes
+
+
+def test_indexes_used(aggregator):
+    explanation = aggregator.explain(
+        aggregator.gaussian.centre > 1.0
+    )
+    query, *plan = explanation.split("\n")
+
+    assert query.startswith("SELECT f.id FROM fit AS f WHERE f.instance_id IN")
+    assert "JOIN object AS o1 ON o1.parent_id = o.id" in query
+    assert not any(
+        step.startswith("SCAN")
+        for step in plan
+    )
+
+
+def test_create_missing_indexes(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'database.sqlite'}"
+    )
+    db.Base.metadata.create_all(engine)
+    engine.execute("DROP INDEX ix_object_name_parent_id")
+
+    _create_indexes(engine)
+
+    assert "ix_object_name_parent_id" in {
+        index["name"]
+        for index
+        in inspect(engine).get_indexes("object")
+    }
+
+
+@pytest.fixture(
+    name="legacy_filename"
+)
+def make_legacy_filename(tmp_path):
+    filename = tmp_path / "legacy.sqlite"
+    engine = create_engine(
+        f"sqlite:///{filename}"
+    )
+    engine.execute(
+        "CREATE TABLE fit (id INTEGER NOT NULL, model_id INTEGER, "
+        "instance_id INTEGER, PRIMARY KEY (id))"
+    )
+    engine.execute(
+        "CREATE TABLE pickle (id INTEGER NOT NULL, name VARCHAR, "
+        "string VARCHAR, fit_id INTEGER, PRIMARY KEY (id))"
+    )
+    engine.execute(
+        "INSERT INTO fit (id) VALUES (1)"
+    )
+    engine.execute(
+        "INSERT INTO pickle (id, name, string, fit_id) VALUES (1, 'dataset', ?, 1)",
+        pickle.dumps("value")
+    )
+    return filename
+
+
+def test_migrate_earlier_schema(legacy_filename):
+    aggregator = Aggregator.from_database(
+        str(legacy_filename)
+    )
+    fit, = aggregator.session.query(db.Fit).all()
+    assert fit["dataset"] == "value"
+    assert fit.search_name is None
+
+    inspector = inspect(aggregator.session.bind)
+    assert "ix_fit_search_name" in {
+        index["name"]
+        for index
+        in inspector.get_indexes("fit")
+    }
+    assert "blob_hash" in {
+        column["name"]
+        for column
+        in inspector.get_columns("pickle")
+    }
+
+
+def test_newer_schema(tmp_path):
+    filename = tmp_path / "newer.sqlite"
+    create_engine(
+        f"sqlite:///{filename}"
+    ).execute(
+        f"PRAGMA user_version = {db.schema_version + 1}"
+    )
+    with pytest.raises(exc.AggregatorException):
+        Aggregator.from_database(
+            str(filename)
+        )
@@ -8,7 +8,7 @@ class TestString:
         )
 
         assert query.query == (
-            "SELECT parent_id "
+            "SELECT o.parent_id "
             "FROM object AS o "
             "WHERE o.name = 'a'"
         )
@@ -23,12 +23,12 @@ class TestString:
         )
 
         assert query.query == (
-            "SELECT parent_id "
+            "SELECT o.parent_id "
             "FROM object AS o "
             "JOIN string_value AS sv "
             "ON o.id = sv.id "
-            "WHERE (o.name = 'a' "
-            "AND sv.value = 'value')"
+            "WHERE o.name = 'a' "
+            "AND sv.value = 'value'"
         )
 
     def test_with_value(self):
@@ -41,12 +41,12 @@ class TestString:
         )
 
         assert query.query == (
-            "SELECT parent_id "
+            "SELECT o.parent_id "
             "FROM object AS o "
             "JOIN value AS v "
             "ON o.id = v.id "
-            "WHERE (o.name = 'a' "
-            "AND v.value = 1)"
+            "WHERE o.name = 'a' "
+            "AND v.value = 1"
         )
 
     def test_simple_and(
@@ -54,13 +54,13 @@ class TestString:
             simple_and
     ):
         assert simple_and.query == (
-            "SELECT parent_id "
+            "SELECT o.parent_id "
             "FROM object AS o "
             "JOIN value AS v "
             "ON o.id = v.id "
-            "WHERE (o.name = 'a' "
+            "WHERE o.name = 'a' "
             "AND v.value < 1 "
-            "AND v.value > 0)"
+            "AND v.value > 0"
         )
 
     def test_simple_or(
@@ -68,13 +68,13 @@ class TestString:
             simple_or
     ):
         assert simple_or.query == (
-            "SELECT parent_id "
+            "SELECT o.parent_id "
             "FROM object AS o "
             "JOIN value AS v "
             "ON o.id = v.id "
-            "WHERE ((v.value < 1 "
-            "OR v.value > 0) "
-            "AND o.name = 'a')"
+            "WHERE o.name = 'a' "
+            "AND (v.value < 1 "
+            "OR v.value > 0)"
         )
 
     def test_second_level(
@@ -82,17 +82,44 @@ class TestString:
             second_level
     ):
         assert second_level.query == (
-            'SELECT parent_id '
-            'FROM object AS o '
-            'JOIN value AS v '
-            'ON o.id = v.id '
-            'WHERE (o.id IN ('
-            'SELECT parent_id '
-            'FROM object AS o '
-            'JOIN value AS v '
-            'ON o.id = v.id '
-            "WHERE (o.name = 'b' "
-            "AND v.value > 0)) "
-            "AND o.name = 'a' "
-            "AND v.value < 1)"
+            "SELECT o.parent_id "
+            "FROM object AS o "
+            "JOIN value AS v "
+            "ON o.id = v.id "
+            "JOIN object AS o1 "
+            "ON o1.parent_id = o.id "
+            "JOIN value AS v1 "
+            "ON o1.id = v1.id "
+            "WHERE o.name = 'a' "
+            "AND v.value < 1 "
+            "AND o1.name = 'b' "
+            "AND v1.value > 0"
+        )
+
+    def test_nested_or(
+            self,
+            less_than,
+            greater_than
+    ):
+        query = q.Q(
+            "a",
+            q.Or(
+                less_than,
+                q.Q("b", greater_than)
+            )
+        )
+        assert query.query == (
+            "SELECT o.parent_id "
+            "FROM object AS o "
+            "JOIN value AS v "
+            "ON o.id = v.id "
+            "WHERE o.name = 'a' "
+            "AND (o.id IN ("
+            "SELECT o.parent_id "
+            "FROM object AS o "
+            "JOIN value AS v "
+            "ON o.id = v.id "
+            "WHERE o.name = 'b' "
+            "AND v.value > 0) "
+            "OR v.value < 1)"
         )
@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import event
+
+import autofit as af
+from autofit import database as db
+from autofit.database.aggregator import Aggregator
+from autofit.mock import mock as m
+
+
+@pytest.fixture(
+    name="aggregator"
+)
+def make_aggregator(session):
+    for centre in range(5):
+        fit = db.Fit(
+            model=af.CollectionPriorModel(
+                gaussian=af.PriorModel(m.Gaussian)
+            ),
+            instance=af.ModelInstance(dict(
+                gaussian=m.Gaussian(centre=float(centre))
+            )),
+        )
+        fit["centre"] = centre
+        session.add(fit)
+    session.commit()
+    session.expunge_all()
+    return Aggregator(session)
+
+
+@pytest.fixture(
+    name="statements"
+)
+def count_statements(session):
+    statements = list()
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_load_trees(aggregator, session, statements):
+    fits = aggregator.fits
+    statements.clear()
+
+    db.Fit.preload(fits)
+    count = len(statements)
+
+    models = [fit.model for fit in fits]
+    instances = [fit.instance for fit in fits]
+    assert len(statements) == count
+
+    assert all(model.gaussian.cls is m.Gaussian for model in models)
+    assert [instance.gaussian.centre for instance in instances] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_values_in_batches(aggregator, statements):
+    aggregator.batch_size = 2
+    assert len(aggregator.values("model")) == 5
+    assert aggregator.values("centre") == [0, 1, 2, 3, 4]
+
+    # Loading fits and each batch of pickle names, blobs, models and instances
+    assert len(statements) < 25
+
+
+def test_query_batches(aggregator):
+    aggregator.batch_size = 2
+    result = aggregator.query(
+        aggregator.gaussian == m.Gaussian
+    )
+    assert len(result) == 5
+    assert [len(batch) for batch in result.batches(batch_size=2)] == [2, 2, 1]
+
+
+def test_class_cached():
+    assert db.get_class("autofit.mock.mock.Gaussian") is m.Gaussian
+    assert db.get_class("float") is float
+    assert db.get_class.cache_info().hits + db.get_class.cache_info().misses > 0
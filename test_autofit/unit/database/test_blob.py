@@ -0,0 +1,138 @@
+import pickle
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from autofit import database as db
+from autofit.database.model import fit as fit_module
+
+
+@pytest.fixture(
+    autouse=True
+)
+def clear_cache():
+    db.blob_cache.clear()
+    yield
+    db.blob_cache.clear()
+
+
+@pytest.fixture(
+    autouse=True
+)
+def count_references(session):
+    db.count_blob_references(session)
+
+
+def make_fit(**pickles):
+    fit = db.Fit()
+    for name, value in pickles.items():
+        fit[name] = value
+    return fit
+
+
+def test_identical_pickles_stored_once(session):
+    session.add_all([
+        make_fit(dataset=[1, 2, 3], search="first"),
+        make_fit(dataset=[1, 2, 3], search="second"),
+    ])
+    session.commit()
+
+    blobs = {
+        blob.hash: blob.ref_count
+        for blob in session.query(db.Blob)
+    }
+    assert len(blobs) == 3
+    assert sorted(blobs.values()) == [1, 1, 2]
+
+    first, second = session.query(db.Fit).all()
+    assert first["dataset"] == second["dataset"] == [1, 2, 3]
+
+
+def test_stored_by_existing_blob(session):
+    session.add(make_fit(dataset=[1, 2, 3]))
+    session.commit()
+    session.add(make_fit(dataset=[1, 2, 3]))
+    session.commit()
+
+    blob, = session.query(db.Blob).all()
+    assert blob.ref_count == 2
+
+
+def test_replace(session):
+    fit = make_fit(dataset=[1, 2, 3])
+    session.add(fit)
+    session.commit()
+
+    fit["dataset"] = [4, 5, 6]
+    session.commit()
+
+    blob, = session.query(db.Blob).all()
+    assert blob.ref_count == 1
+    assert fit["dataset"] == [4, 5, 6]
+    assert session.query(db.Pickle).count() == 1
+
+
+def test_delete(session):
+    first = make_fit(dataset=[1, 2, 3])
+    second = make_fit(dataset=[1, 2, 3])
+    session.add_all([first, second])
+    session.commit()
+
+    session.delete(first)
+    session.commit()
+    assert session.query(db.Blob).one().ref_count == 1
+
+    session.delete(second)
+    session.commit()
+    assert session.query(db.Blob).count() == 0
+
+
+def test_value_cached(session):
+    session.add(make_fit(dataset=[1, 2, 3]))
+    session.commit()
+    session.expunge_all()
+
+    fit = session.query(db.Fit).one()
+    first = fit["dataset"]
+    first.append(4)
+    session.expunge_all()
+
+    fit = session.query(db.Fit).one()
+    assert fit["dataset"] == [1, 2, 3]
+    assert "blob" not in fit.pickles[0].__dict__
+
+
+def test_legacy_string(session):
+    session.add(make_fit())
+    session.commit()
+    session.execute(
+        "INSERT INTO pickle (name, string, fit_id) VALUES ('dataset', :string, 1)",
+        {"string": pickle.dumps([1, 2, 3])}
+    )
+
+    fit = session.query(db.Fit).one()
+    assert fit["dataset"] == [1, 2, 3]
+
+
+def test_counted_for_registered_sessions(session):
+    assert event.contains(session, "before_flush", fit_module._count_blob_references)
+    assert not event.contains(Session, "before_flush", fit_module._count_blob_references)
+
+
+def test_cache_bounded():
+    cache = db.BlobCache(maxsize=2)
+    for i in range(3):
+        cache.get(str(i), lambda: i)
+    assert cache.get("0", lambda: "loaded") == "loaded"
+    assert cache.get("2", lambda: "loaded") == 2
+
+
+def test_replace_before_flush(session):
+    fit = make_fit(dataset=[1, 2, 3])
+    session.add(fit)
+    session.commit()
+
+    assert fit["dataset"] == [1, 2, 3]
+    fit["dataset"] = [4, 5, 6]
+    assert fit["dataset"] == [4, 5, 6]
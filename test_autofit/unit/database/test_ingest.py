@@ -0,0 +1,107 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+import autofit as af
+from autofit import database as db
+from autofit.database import ingest
+from autofit.database.aggregator import Aggregator
+from autofit.mock import mock as m
+
+directory = Path(__file__).parent / "mass_sie__source_sersic"
+
+
+@pytest.fixture(
+    name="aggregator"
+)
+def make_aggregator(session):
+    return Aggregator(session)
+
+
+@pytest.fixture(
+    name="campaign"
+)
+def make_campaign(tmp_path):
+    for i in range(3):
+        shutil.copytree(
+            directory,
+            tmp_path / str(i) / directory.name
+        )
+    return tmp_path
+
+
+def test_flatten_round_trip(session):
+    model = af.CollectionPriorModel(
+        gaussian=af.PriorModel(m.Gaussian),
+        numbers=(1, 2.0),
+    )
+    writer = ingest.BulkWriter(session)
+    writer.add(ingest.FlatFit(
+        path="path",
+        hash_="hash",
+        model=ingest.flatten(db.Object.from_object(model)),
+        instance=ingest.flatten(db.Object.from_object(m.Gaussian(centre=1.0))),
+        pickles=[("name", db.hash_bytes(b"string"), db.compress(b"string"))],
+    ))
+    writer.flush()
+
+    fit, = session.query(db.Fit).all()
+    assert fit.model.gaussian.cls is m.Gaussian
+    assert fit.model.numbers == (1, 2.0)
+    assert fit.instance.centre == 1.0
+    assert fit.path == "path"
+    assert fit.pickles[0].string == b"string"
+
+
+def test_add_twice(aggregator):
+    assert aggregator.add_directory(str(directory)) == 1
+    assert aggregator.add_directory(str(directory)) == 0
+    assert len(aggregator) == 1
+
+    fit, = aggregator
+    assert fit.path.startswith(str(directory.absolute()))
+    assert len(fit.hash) == 40
+
+
+def test_parallel(aggregator, campaign):
+    assert aggregator.add_directory(
+        str(campaign),
+        processes=2,
+        batch_size=2,
+    ) == 3
+    assert len(aggregator) == 3
+    assert len({fit.path for fit in aggregator}) == 3
+
+    for fit in aggregator:
+        assert isinstance(fit.model, af.CollectionPriorModel)
+        assert fit["samples"] is not None
+
+
+def test_changed_fit_added(aggregator, campaign):
+    aggregator.add_directory(str(campaign))
+
+    pickle_path, = (campaign / "0").rglob("pickles")
+    with open(pickle_path / "info.pickle", "ab") as f:
+        f.write(b"changed")
+
+    assert aggregator.add_directory(str(campaign)) == 1
+
+
+def test_blobs_shared(aggregator, campaign, session):
+    aggregator.add_directory(
+        str(campaign),
+        batch_size=2
+    )
+    blobs = session.query(db.Blob).all()
+    assert len(blobs) == 8
+    assert {blob.ref_count for blob in blobs} == {3}
+
+
+def test_known_fit_skipped(campaign):
+    pickle_path, = (campaign / "0").rglob("pickles")
+    path = str(pickle_path.parent)
+
+    fit = ingest._flat_fit((path, frozenset()))
+    assert fit.path == path
+    assert ingest._flat_fit((path, frozenset({fit.hash}))) is None
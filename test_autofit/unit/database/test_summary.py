@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import pytest
+
+from autofit import database as db
+from autofit.database.aggregator import Aggregator
+from autofit.mock import mock as m
+
+directory = Path(__file__).parent
+
+
+@pytest.fixture(
+    name="aggregator"
+)
+def make_aggregator(
+        session
+):
+    aggregator = Aggregator(
+        session
+    )
+    aggregator.add_directory(
+        str(directory)
+    )
+    return aggregator
+
+
+@pytest.fixture(
+    name="fit"
+)
+def make_fit(
+        aggregator
+):
+    return aggregator[0]
+
+
+def test_summary_columns(fit):
+    samples = fit["samples"]
+
+    assert fit.log_evidence == samples.log_evidence
+    assert fit.max_log_likelihood == samples.max_log_likelihood_sample.log_likelihood
+    assert fit.total_samples == samples.total_samples
+    assert fit.run_time == pytest.approx(566.121256)
+    assert fit.search_name == "phase_mass[sie]_source[bulge]"
+
+
+def test_parameter_summaries(fit):
+    samples = fit["samples"]
+
+    assert [
+               parameter.path
+               for parameter
+               in fit.parameter_summaries
+           ] == [
+               "galaxies.lens.centre",
+               "galaxies.lens.intensity",
+               "galaxies.lens.sigma",
+           ]
+    assert [
+               parameter.median
+               for parameter
+               in fit.parameter_summaries
+           ] == samples.median_pdf_vector
+
+
+def test_summarise_samples(fit):
+    new = db.Fit()
+    new["samples"] = fit["samples"]
+
+    assert new.log_evidence == fit.log_evidence
+    assert len(new.parameter_summaries) == 3
+
+
+def test_seconds():
+    assert db.summary._seconds("0:09:26.5") == 566.5
+    assert db.summary._seconds("1 day, 0:00:01") == 86401.0
+    assert db.summary._seconds(None) is None
+
+
+def test_query_summary(aggregator, fit):
+    assert aggregator.query(
+        aggregator.log_evidence > fit.log_evidence - 1
+    ) == [fit]
+    assert aggregator.query(
+        aggregator.log_evidence > fit.log_evidence + 1
+    ) == []
+    assert aggregator.query(
+        aggregator.search_name == "phase_mass[sie]_source[bulge]"
+    ) == [fit]
+
+
+def test_query_parameter(aggregator, fit):
+    centre = aggregator.parameter("galaxies.lens.centre")
+    assert aggregator.query(centre >= 1.0) == [fit]
+    assert aggregator.query(centre.upper < 1.0) == []
+
+
+def test_combined_with_model(aggregator, fit):
+    assert aggregator.query(
+        (aggregator.galaxies.lens == m.Gaussian)
+        & (aggregator.log_evidence > 0.0)
+    ) == [fit]
+    assert aggregator.query(
+        (aggregator.galaxies.lens == m.Gaussian)
+        & (aggregator.log_evidence < 0.0)
+    ) == []
+
+
+def test_order(session):
+    for log_evidence in (2.0, 1.0, 3.0):
+        session.add(
+            db.Fit(
+                log_evidence=log_evidence,
+                instance=m.Gaussian()
+            )
+        )
+    session.commit()
+
+    aggregator = Aggregator(session)
+    ordered = aggregator.query(
+        order_by=aggregator.log_evidence,
+        reverse=True
+    )
+    assert [fit.log_evidence for fit in ordered] == [3.0, 2.0, 1.0]
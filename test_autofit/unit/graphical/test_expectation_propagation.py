@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
 import numpy as np
 import pytest
 from scipy import stats
@@ -130,3 +132,130 @@ def test_looped_importance_sampling(
 
     assert result.mu == pytest.approx(-0.243, rel=0.1)
     assert result.sigma == pytest.approx(0.466, rel=0.1)
+
+
+def probit(x):
+    return stats.norm.logcdf(x)
+
+
+def normal(x):
+    return stats.norm.logpdf(x, loc=-0.5, scale=0.5)
+
+
+@pytest.mark.parametrize(
+    "executor_class",
+    [ThreadPoolExecutor, ProcessPoolExecutor]
+)
+def test_parallel_laplace(
+        x,
+        executor_class
+):
+    # factors of functions that can be sent to other processes
+    model = mp.Factor(probit, x=x) * mp.Factor(normal, x=x)
+    model_approx = mp.EPMeanField.from_kws(
+        model,
+        {x: autofit.graphical.messages.normal.NormalMessage(0, 1)}
+    )
+
+    laplace = mp.LaplaceFactorOptimiser(deltas={
+        factor: 0.5 for factor in model.factors
+    })
+    serial = mp.EPOptimiser(
+        model,
+        default_optimiser=laplace,
+        callback=mp.expectation_propagation.EPHistory(kl_tol=1e-4),
+    ).run(model_approx)
+
+    with executor_class(2) as executor:
+        parallel = mp.EPOptimiser(
+            model,
+            default_optimiser=mp.LaplaceFactorOptimiser(deltas={
+                factor: 0.5 for factor in model.factors
+            }),
+            callback=mp.expectation_propagation.EPHistory(kl_tol=1e-4),
+            executor=executor,
+        ).run(model_approx)
+
+    assert parallel.mean_field[x].mu == pytest.approx(
+        serial.mean_field[x].mu, rel=0.05
+    )
+    assert parallel.mean_field[x].sigma == pytest.approx(
+        serial.mean_field[x].sigma, rel=0.05
+    )
+
+
+def test_project_factors(
+        model_approx,
+        probit_factor,
+        normal_factor,
+        x
+):
+    factor_mean_field = {
+        probit_factor: mp.MeanField({
+            x: autofit.graphical.messages.normal.NormalMessage(1, 2)
+        }),
+        normal_factor: mp.MeanField({
+            x: autofit.graphical.messages.normal.NormalMessage(-1, 3)
+        }),
+    }
+    new_approx, _ = model_approx.project_factors(factor_mean_field)
+
+    assert new_approx.factor_mean_field == factor_mean_field
+    assert model_approx.factor_mean_field != factor_mean_field
+
+
+def test_append_sample_buffer():
+    array = mp.sampling._append(None, 0, np.arange(3))
+    assert len(array) == 3
+
+    array = mp.sampling._append(array, 3, np.arange(2))
+    assert len(array) == 6
+    assert (array[:5] == [0, 1, 2, 0, 1]).all()
+
+    grown = mp.sampling._append(array, 5, np.arange(1))
+    assert grown is array
+
+
+def test_adaptive_importance_sampling(
+        probit_approx,
+        probit_factor
+):
+    sampler = mp.ImportanceSampler(
+        n_samples=50, n_resample=20, min_n_eff=150, max_samples=1000
+    )
+    sample = sampler(probit_approx)
+
+    assert sample.n_samples > 50
+    assert mp.sampling._mean_effective_sample_size(sample.log_weights) > 150
+    assert len(sampler._history[probit_factor]) > 1
+
+
+def test_importance_sampling_history(
+        probit_approx,
+        probit_factor
+):
+    sampler = mp.ImportanceSampler(
+        n_samples=100, history_size=2, force_sample=False
+    )
+    sampler.sample(probit_approx)
+    sampler.sample(probit_approx)
+    sampler.sample(probit_approx)
+
+    assert len(sampler._history[probit_factor]) == 2
+
+    # the samples kept are enough, so none are drawn
+    sample = sampler(probit_approx, min_n_eff=10)
+    assert sample.n_samples == 200
+    assert len(sampler._history[probit_factor]) == 2
+
+    forced = sampler(probit_approx, min_n_eff=10, force_sample=True)
+    assert forced.n_samples == 200
+    assert sampler.last_samples(probit_factor).n_samples == 100
+
+
+def test_importance_sampling_min_batches(
+        probit_approx
+):
+    sampler = mp.ImportanceSampler(n_samples=100, min_n_eff=10)
+    assert sampler(probit_approx).n_samples == 200
+    assert sampler(probit_approx, min_batches=1).n_samples == 100
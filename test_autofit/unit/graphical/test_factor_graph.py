@@ -262,3 +262,115 @@ class TestFactorGraph:
             {x: 2},
             [x],
         )[x] == pytest.approx(coefficient)
+
+
+class TestNumericalJacobian:
+    @pytest.fixture(name="obs")
+    def make_obs(self):
+        return autofit.mapper.variable.Plate(name='obs')
+
+    @pytest.fixture(name="dims")
+    def make_dims(self):
+        return autofit.mapper.variable.Plate(name='dims')
+
+    @pytest.fixture(name="a")
+    def make_a(self, obs, dims):
+        return autofit.mapper.variable.Variable('a', obs, dims)
+
+    @pytest.fixture(name="b")
+    def make_b(self, dims):
+        return autofit.mapper.variable.Variable('b', dims)
+
+    @pytest.fixture(name="values")
+    def make_values(self, a, b):
+        return {
+            a: np.linspace(-1, 1, 12).reshape(4, 3),
+            b: np.array([1., 2., 3.])
+        }
+
+    @staticmethod
+    def expected_jacobian(values, a, b):
+        x, y = values[a], values[b]
+        grad_a = np.zeros(x.shape * 2)
+        grad_b = np.zeros(x.shape + y.shape)
+        for i, j in np.ndindex(*x.shape):
+            grad_a[i, j, i, j] = np.cos(x[i, j]) * y[j]
+            grad_b[i, j, j] = np.sin(x[i, j])
+        return grad_a, grad_b
+
+    @pytest.mark.parametrize(
+        "method, rel",
+        [("forward", 1e-4), ("central", 1e-8), ("complex", 1e-10)]
+    )
+    def test_methods(self, a, b, values, method, rel):
+        factor = mp.Factor(lambda a, b: np.sin(a) * b, a=a, b=b)
+        jac = factor.jacobian(values, _method=method)
+        grad_a, grad_b = self.expected_jacobian(values, a, b)
+
+        assert jac[a] == pytest.approx(grad_a, rel=rel, abs=rel)
+        assert jac[b] == pytest.approx(grad_b, rel=rel, abs=rel)
+
+    def test_vectorised_single_call(self, a, b, values):
+        calls = []
+
+        def func(a, b):
+            calls.append(a.shape)
+            return np.sin(a) * b[..., None, :]
+
+        factor = mp.Factor(func, a=a, b=b, vectorised=True)
+        jac = factor.jacobian(values)
+        grad_a, grad_b = self.expected_jacobian(values, a, b)
+
+        # the elements along the obs and dims plates are perturbed together
+        assert calls == [(4, 3), (1, 4, 3), (1, 4, 3)]
+        assert jac[a] == pytest.approx(grad_a, rel=1e-4, abs=1e-4)
+        assert jac[b] == pytest.approx(grad_b, rel=1e-4, abs=1e-4)
+
+    def test_dense_batched(self, dims):
+        calls = []
+
+        def func(x, y):
+            calls.append(np.shape(x))
+            return np.sum(x * y, axis=-1)
+
+        x = autofit.mapper.variable.Variable('x', dims)
+        y = autofit.mapper.variable.Variable('y', dims)
+        factor = mp.Factor(
+            func, x=x, y=y, vectorised=True, is_scalar=True)
+        values = {x: np.array([1., 2., 3.]), y: np.array([4., 5., 6.])}
+        jac = factor.jacobian(values, _method="central")
+
+        # each element is perturbed separately, in a single call
+        assert calls == [(3,), (6, 3), (6, 3)]
+        assert jac[x] == pytest.approx(values[y])
+        assert jac[y] == pytest.approx(values[x])
+
+    def test_executor(self, a, b, values):
+        from concurrent.futures import ThreadPoolExecutor
+
+        factor = mp.Factor(lambda a, b: np.sin(a) * b, a=a, b=b)
+        with ThreadPoolExecutor(2) as executor:
+            jac = factor.jacobian(
+                values, _method="central", _executor=executor)
+        grad_a, grad_b = self.expected_jacobian(values, a, b)
+
+        assert jac[a] == pytest.approx(grad_a, rel=1e-8, abs=1e-8)
+        assert jac[b] == pytest.approx(grad_b, rel=1e-8, abs=1e-8)
+
+    @pytest.mark.parametrize(
+        "method, rel",
+        [("forward", 1e-3), ("central", 1e-5), ("complex", 1e-5)]
+    )
+    def test_hessian(self, a, b, values, method, rel):
+        factor = mp.Factor(
+            lambda a, b: np.sin(a) * b[..., None, :],
+            a=a, b=b, vectorised=True)
+        hess = factor.hessian(values, _method=method, _eps=1e-4)
+
+        x, y = values[a], values[b]
+        expected = np.zeros(x.shape * 3)
+        for i, j in np.ndindex(*x.shape):
+            expected[i, j, i, j, i, j] = - np.sin(x[i, j]) * y[j]
+
+        assert hess[a] == pytest.approx(expected, rel=rel, abs=rel)
+        assert hess[b] == pytest.approx(0, abs=rel)
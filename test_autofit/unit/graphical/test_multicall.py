@@ -0,0 +1,153 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from autofit import graphical as mp
+from autofit.graphical.factor_graphs.multicall import PoolMulticall
+
+
+def quadratic(x, y):
+    return - float(x - y) ** 2
+
+
+def quadratic_jacobian(x, y, _variables=None):
+    value = - (x - y) ** 2
+    if _variables is None:
+        return value
+    jacs = {"x": - 2 * (x - y), "y": 2 * (x - y)}
+    return value, tuple(jacs[v] for v in _variables)
+
+
+@pytest.fixture(name="x")
+def make_x():
+    return mp.Variable("x")
+
+
+@pytest.fixture(name="y")
+def make_y():
+    return mp.Variable("y")
+
+
+@pytest.fixture(name="values")
+def make_values(x, y):
+    return {x: np.linspace(-1, 1, 10), y: np.array([0.5])}
+
+
+@pytest.fixture(
+    name="multicall",
+    params=[
+        mp.Multicall,
+        mp.VectorisedMulticall,
+        lambda: mp.ThreadMulticall(2),
+        lambda: mp.ProcessMulticall(2),
+    ]
+)
+def make_multicall(request):
+    with request.param() as multicall:
+        yield multicall
+
+
+def test_factor(x, y, values, multicall):
+    factor = mp.Factor(quadratic, x=x, y=y, multicall=multicall)
+    value = factor(values).log_value
+
+    assert value == pytest.approx(- (values[x] - 0.5) ** 2)
+    assert multicall.dict()["calls"] == 1
+    assert multicall.dict()["items"] == 10
+
+
+def test_factor_jacobian(x, y, values, multicall):
+    factor = mp.FactorJacobian(
+        quadratic_jacobian, x=x, y=y, multicall=multicall)
+    value, jacobian = factor.func_jacobian(values, (x, y))
+
+    assert value == pytest.approx(- (values[x] - 0.5) ** 2)
+    assert jacobian[x] == pytest.approx(- 2 * (values[x] - 0.5))
+    assert jacobian[y] == pytest.approx(2 * (values[x] - 0.5))
+
+
+def test_vectorised(x, y, values):
+    multicall = mp.VectorisedMulticall()
+    factor = mp.FactorJacobian(
+        quadratic_jacobian, x=x, y=y, multicall=multicall)
+    factor.func_jacobian(values, (x,))
+
+    assert multicall.vectorised
+
+    multicall = mp.VectorisedMulticall()
+    factor = mp.Factor(quadratic, x=x, y=y, multicall=multicall)
+    assert factor(values).log_value == pytest.approx(
+        - (values[x] - 0.5) ** 2)
+    assert not multicall.vectorised
+
+
+def test_reduced_axis_not_vectorised():
+    data = np.linspace(0, 1, 3)
+
+    def reduced(x, y):
+        return np.sum(x * data, axis=0) + y
+
+    multicall = mp.VectorisedMulticall()
+    x = np.random.random((3, 3))
+
+    assert multicall(reduced, {"x": x, "y": np.array([0.5])}, 3) == pytest.approx(
+        x @ data + 0.5)
+    assert not multicall.vectorised
+
+
+def test_vectorised_error_raised(x, y, values):
+    def failing(x, y):
+        raise RuntimeError()
+
+    factor = mp.Factor(failing, x=x, y=y, multicall=mp.VectorisedMulticall())
+    with pytest.raises(RuntimeError):
+        factor(values)
+
+
+def test_pool_multicall_abstract():
+    with pytest.raises(TypeError):
+        PoolMulticall(2)
+
+
+def test_deterministic(x, y, values):
+    z = mp.Variable("z")
+    with mp.ThreadMulticall(2) as multicall:
+        factor = mp.Factor(quadratic, x=x, y=y, multicall=multicall) == z
+
+        assert factor.multicall is multicall
+        assert factor(values)[z] == pytest.approx(- (values[x] - 0.5) ** 2)
+
+
+def test_pickle(x, y, values):
+    multicall = mp.ProcessMulticall(2)
+    factor = mp.Factor(quadratic, x=x, y=y, multicall=multicall)
+    factor(values)
+
+    loaded = pickle.loads(pickle.dumps(factor))
+
+    assert loaded.multicall._executor is None
+    assert loaded.multicall.dict()["items"] == 10
+    assert loaded(values).log_value == pytest.approx(
+        - (values[x] - 0.5) ** 2)
+
+    multicall.close()
+    loaded.multicall.close()
+
+
+def test_close():
+    multicall = mp.ThreadMulticall(2)
+    executor = multicall.executor
+    multicall.close()
+
+    assert multicall._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+    with ThreadPoolExecutor(2) as executor:
+        multicall = mp.ThreadMulticall(executor=executor)
+        multicall.close()
+
+        assert multicall.executor is executor
+        assert executor.submit(sum, [1, 2]).result() == 3
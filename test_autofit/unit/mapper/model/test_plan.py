@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit import exc
+from autofit.mock import mock
+
+
+@pytest.fixture(name="model")
+def make_model():
+    model = af.ModelMapper()
+    model.simple = mock.MockClassx2
+    model.tuple = mock.MockClassx3TupleFloat
+    model.complex = af.PriorModel(
+        mock.ComplexClass,
+        simple=mock.MockClassx2
+    )
+    model.collection = af.CollectionPriorModel([
+        mock.MockClassx2,
+        mock.MockClassx2
+    ])
+    return model
+
+
+def arguments_for(model, vector):
+    return dict(zip(
+        [prior for _, prior in model.prior_tuples_ordered_by_id],
+        vector
+    ))
+
+
+class TestInstantiationPlan:
+    def test_matches_arguments(self, model):
+        vector = [0.1 * (i + 1) for i in range(model.prior_count)]
+
+        instance = model.instance_from_vector(vector)
+        expected = model.instance_for_arguments(
+            arguments_for(model, vector)
+        )
+
+        assert instance.simple.one == expected.simple.one
+        assert instance.simple.two == expected.simple.two
+        assert instance.tuple.one_tuple == expected.tuple.one_tuple
+        assert instance.complex.simple.two == expected.complex.simple.two
+        assert instance.collection[1].one == expected.collection[1].one
+        assert isinstance(instance.complex.simple, mock.MockClassx2)
+
+    def test_cached(self, model):
+        plan = model.instantiation_plan
+        model.instance_from_vector([0.5] * model.prior_count)
+
+        assert model.instantiation_plan is plan
+
+    def test_invalidated_by_new_prior(self, model):
+        plan = model.instantiation_plan
+        model.simple.one = af.UniformPrior(10.0, 20.0)
+
+        assert model.instantiation_plan is not plan
+        assert model.instantiation_plan.prior_count == model.prior_count
+
+        vector = [0.5] * model.prior_count
+        vector[-1] = 15.0
+        assert model.instance_from_vector(vector).simple.one == 15.0
+
+    def test_not_invalidated_by_unrelated_priors(self, model):
+        plan = model.instantiation_plan
+
+        other = af.PriorModel(mock.MockClassx2)
+        other.one = af.UniformPrior(10.0, 20.0)
+        other.one.upper_limit = 30.0
+
+        assert model.instantiation_plan is plan
+
+    def test_invalidated_by_assertion(self, model):
+        plan = model.instantiation_plan
+        model.add_assertion(model.simple.one < model.simple.two)
+
+        assert model.instantiation_plan is not plan
+        with pytest.raises(exc.FitException):
+            model.instance_from_vector([0.5] * model.prior_count)
+
+    def test_invalidated_by_fixed_value(self, model):
+        model.instantiation_plan
+        model.simple.one = 3.0
+
+        instance = model.instance_from_vector([0.5] * model.prior_count)
+        assert instance.simple.one == 3.0
+
+    def test_invalidated_by_limits(self, model):
+        model.instance_from_vector([0.5] * model.prior_count)
+        model.simple.one.upper_limit = 0.4
+
+        with pytest.raises(exc.PriorLimitException):
+            model.instance_from_vector([0.5] * model.prior_count)
+
+    def test_ignore_prior_limits_read_when_compiled(self, model):
+        plan = model.instantiation_plan
+        plan.ignore_prior_limits = True
+
+        vector = [0.5] * model.prior_count
+        vector[0] = 2.0
+        assert model.instance_from_vector(vector).simple.one == 2.0
+
+    def test_limits(self, model):
+        vector = [0.5] * model.prior_count
+        vector[0] = 2.0
+
+        with pytest.raises(exc.PriorLimitException):
+            model.instance_from_vector(vector)
+
+    def test_assertion(self):
+        model = af.PriorModel(mock.MockClassx2)
+        model.add_assertion(model.one < model.two)
+
+        assert model.instance_from_vector([0.1, 0.2]).one == 0.1
+        with pytest.raises(exc.FitException):
+            model.instance_from_vector([0.2, 0.1])
+
+    def test_not_compiled_with_promises(self, model):
+        model.simple.one = af.last.model.simple.one
+
+        assert model.instantiation_plan is None
+
+
+class TestBatch:
+    def test_instance_from_parameter_array(self, model):
+        plan = model.instantiation_plan
+        parameter_array = np.random.uniform(size=(3, model.prior_count))
+
+        instance = plan.instance_from_parameter_array(parameter_array)
+
+        assert list(instance.simple.one) == list(parameter_array[:, 0])
+        assert instance.complex.simple.two.shape == (3,)
+
+    def test_valid_mask(self):
+        model = af.PriorModel(mock.MockClassx2)
+        model.add_assertion((model.one < model.two) < 0.9)
+        plan = model.instantiation_plan
+
+        mask = plan.valid_mask(np.array([
+            [0.1, 0.2],
+            [0.2, 0.1],
+            [0.1, 0.95],
+            [0.1, 2.0],
+        ]))
+
+        assert list(mask) == [True, False, False, False]
+
+    def test_delegates_not_batchable(self, model):
+        assert model.instantiation_plan.is_batchable
+
+        model.simple.two = af.DeferredArgument()
+        assert not model.instantiation_plan.is_batchable
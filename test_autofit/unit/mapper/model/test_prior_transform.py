@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit.mock import mock
+
+
+class ScalarPrior(af.UniformPrior):
+    def value_for(self, unit):
+        return 2.0 * super().value_for(unit)
+
+
+@pytest.fixture(name="model")
+def make_model():
+    model = af.PriorModel(mock.MockClassx4)
+    model.one = af.UniformPrior(1.0, 2.0)
+    model.two = af.GaussianPrior(mean=1.0, sigma=2.0)
+    model.three = af.LogUniformPrior(1e-3, 10.0)
+    model.four = ScalarPrior(0.0, 1.0)
+    return model
+
+
+@pytest.fixture(name="unit_array")
+def make_unit_array():
+    return np.random.uniform(size=(10, 4))
+
+
+def scalar_values(model, unit_vector):
+    return [
+        prior.value_for(unit)
+        for (_, prior), unit
+        in zip(model.prior_tuples_ordered_by_id, unit_vector)
+    ]
+
+
+class TestPriorTransform:
+    def test_values(self, model, unit_array):
+        values = model.vector_from_unit_array(unit_array)
+
+        assert values.shape == (10, 4)
+        for unit_vector, vector in zip(unit_array, values):
+            assert vector == pytest.approx(scalar_values(model, unit_vector))
+
+    def test_vector(self, model, unit_array):
+        assert model.vector_from_unit_vector(unit_array[0]) == pytest.approx(
+            scalar_values(model, unit_array[0])
+        )
+
+    def test_log_priors(self, model, unit_array):
+        values = model.vector_from_unit_array(unit_array)
+        log_priors = model.log_priors_from_array(values)
+
+        assert log_priors.shape == (10, 4)
+        for vector, log_prior in zip(values, log_priors):
+            assert log_prior == pytest.approx([
+                prior.log_prior_from_value(value)
+                for (_, prior), value
+                in zip(model.prior_tuples_ordered_by_id, vector)
+            ])
+
+    def test_empty(self, model):
+        assert model.log_priors_from_array([]).shape == (0, 4)
+
+    def test_wrong_shape(self, model):
+        with pytest.raises(ValueError):
+            model.vector_from_unit_array(np.zeros((2, 3)))
+
+    def test_recompiled(self, model):
+        transform = model.prior_transform
+        assert model.prior_transform is transform
+
+        model.one = af.UniformPrior(10.0, 20.0)
+        assert model.prior_transform is not transform
+        assert model.vector_from_unit_vector([0.5] * 4)[-1] == 15.0
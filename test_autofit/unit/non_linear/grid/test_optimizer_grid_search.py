@@ -206,6 +206,53 @@ class TestGridNLOBehaviour:
         assert result.no_dimensions == 2
         assert result.max_log_likelihood_values.shape == (10, 10)
 
+    def test_resumed_from_checkpoint(self, grid_search_05, mapper, monkeypatch):
+        grid_priors = [
+            mapper.component.one_tuple.one_tuple_0,
+            mapper.component.one_tuple.one_tuple_1,
+        ]
+        result = grid_search_05.fit(
+            model=mapper,
+            analysis=MockAnalysis(),
+            grid_priors=grid_priors,
+        )
+
+        def fit(*args, **kwargs):
+            raise AssertionError("Completed grid cells should not be fit again")
+
+        monkeypatch.setattr(MockOptimizer, "fit", fit)
+        resumed = grid_search_05.fit(
+            model=mapper,
+            analysis=MockAnalysis(),
+            grid_priors=grid_priors,
+        )
+
+        assert resumed.max_log_likelihood_values.tolist() == result.max_log_likelihood_values.tolist()
+
+    def test_checkpoint_discarded_for_changed_model(self, grid_search_05, mapper):
+        grid_priors = [
+            mapper.component.one_tuple.one_tuple_0,
+            mapper.component.one_tuple.one_tuple_1,
+        ]
+        lists = grid_search_05.make_lists(grid_priors)
+        grid_search_05.checkpoint_for(mapper, grid_priors, lists).save(0, "result")
+
+        assert len(grid_search_05.checkpoint_for(mapper, grid_priors, lists).completed()) == 1
+
+        mapper.component.one_tuple.one_tuple_0.upper_limit = 3.0
+        assert len(grid_search_05.checkpoint_for(mapper, grid_priors, lists).completed()) == 0
+
+    def test_checkpoint_discarded_for_changed_search(self, grid_search_05, mapper):
+        grid_priors = [
+            mapper.component.one_tuple.one_tuple_0,
+            mapper.component.one_tuple.one_tuple_1,
+        ]
+        lists = grid_search_05.make_lists(grid_priors)
+        grid_search_05.checkpoint_for(mapper, grid_priors, lists).save(0, "result")
+
+        grid_search_05.search.prior_passer.sigma = 5.0
+        assert len(grid_search_05.checkpoint_for(mapper, grid_priors, lists).completed()) == 0
+
     # def test_results_parallel(self, mapper, container):
     #     grid_search = af.SearchGridSearch(
     #         search=container.MockOptimizer,
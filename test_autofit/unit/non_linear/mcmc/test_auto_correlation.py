@@ -0,0 +1,48 @@
+import emcee
+import numpy as np
+import pytest
+
+from autofit.non_linear.mcmc.auto_correlation import AutoCorrelationEstimator
+
+
+@pytest.fixture(name="chain")
+def make_chain():
+    random = np.random.RandomState(1)
+    chain = np.zeros((1000, 4, 2))
+    for step in range(1, len(chain)):
+        chain[step] = 0.9 * chain[step - 1] + random.normal(size=(4, 2))
+    return chain + 10.0
+
+
+def test__matches_emcee(chain):
+    estimator = AutoCorrelationEstimator()
+
+    for steps in (10, 200, 1000):
+        assert estimator.auto_correlation_times(chain[:steps]) == pytest.approx(
+            emcee.autocorr.integrated_time(chain[:steps], tol=0), 1.0e-8
+        )
+
+
+def test__earlier_steps(chain):
+    estimator = AutoCorrelationEstimator()
+    estimator.auto_correlation_times(chain)
+
+    assert estimator.auto_correlation_times(chain, total_steps=900) == pytest.approx(
+        emcee.autocorr.integrated_time(chain[:900], tol=0), 1.0e-8
+    )
+
+
+def test__grows_lags(chain):
+    estimator = AutoCorrelationEstimator(max_lag=4)
+
+    assert estimator.auto_correlation_times(chain) == pytest.approx(
+        emcee.autocorr.integrated_time(chain, tol=0), 1.0e-8
+    )
+    assert estimator.max_lag > 4
+
+
+def test__empty_chain(chain):
+    times = AutoCorrelationEstimator().auto_correlation_times(chain[:0])
+
+    assert times.shape == (2,)
+    assert np.all(np.isinf(times))
@@ -1,11 +1,16 @@
+import gc
 from os import path
 import shutil
 
+import emcee as emcee_module
+import numpy as np
 import pytest
 
 import autofit as af
 from autoconf import conf
 from autofit.mock import mock
+from autofit.non_linear.mcmc.emcee import EmceeChain, EmceeSamples, PoolBatch
+from autofit.non_linear.samples import SampleTable
 
 directory = path.dirname(path.realpath(__file__))
 pytestmark = pytest.mark.filterwarnings("ignore::FutureWarning")
@@ -193,3 +198,135 @@ class TestCopyWithNameExtension:
             is search.auto_correlation_change_threshold
         )
         assert copy.number_of_cores is search.number_of_cores
+
+
+def log_prob(parameters):
+    return -0.5 * np.sum(parameters ** 2)
+
+
+@pytest.fixture(name="sampler")
+def make_sampler(tmp_path):
+    np.random.seed(1)
+    return emcee_module.EnsembleSampler(
+        nwalkers=6,
+        ndim=2,
+        log_prob_fn=log_prob,
+        backend=emcee_module.backends.HDFBackend(
+            filename=str(tmp_path / "emcee.hdf")
+        ),
+    )
+
+
+class TestEmceeChain:
+    def test__reads_new_steps(self, sampler):
+        state = sampler.run_mcmc(np.random.randn(6, 2), 50)
+
+        chain = EmceeChain(sampler.backend.filename)
+
+        assert chain.update() == 50
+        assert (chain.chain == sampler.backend.get_chain()).all()
+        assert (chain.log_prob == sampler.backend.get_log_prob()).all()
+
+        sampler.run_mcmc(state, 30)
+
+        assert chain.update() == 80
+        assert (chain.chain == sampler.backend.get_chain()).all()
+        assert (chain.log_prob == sampler.backend.get_log_prob()).all()
+
+    def test__reset(self, sampler):
+        sampler.run_mcmc(np.random.randn(6, 2), 50)
+
+        chain = EmceeChain(sampler.backend.filename)
+        chain.update()
+
+        sampler.reset()
+        sampler.run_mcmc(np.random.randn(6, 2), 60)
+
+        assert chain.update() == 60
+        assert (chain.chain == sampler.backend.get_chain()).all()
+
+    def test__for_file(self, sampler):
+        sampler.run_mcmc(np.random.randn(6, 2), 10)
+
+        chain = EmceeChain.for_file(sampler.backend.filename)
+
+        assert EmceeChain.for_file(sampler.backend.filename) is chain
+
+        del chain
+        gc.collect()
+
+        assert sampler.backend.filename not in EmceeChain._chains
+
+    def test__auto_correlation_times(self, sampler):
+        sampler.run_mcmc(np.random.randn(6, 2), 100)
+
+        chain = EmceeChain(sampler.backend.filename)
+        chain.update()
+
+        assert chain.auto_correlation_times(100) == pytest.approx(
+            sampler.backend.get_autocorr_time(tol=0)
+        )
+        assert chain.auto_correlation_times(60) == pytest.approx(
+            emcee_module.autocorr.integrated_time(
+                sampler.backend.get_chain()[:60], tol=0
+            )
+        )
+
+    def test__samples_after_burn_in(self, sampler):
+        sampler.run_mcmc(np.random.randn(6, 2), 100)
+        total_steps = 80
+
+        model = af.ModelMapper(one=af.UniformPrior(), two=af.UniformPrior())
+        auto_correlation_times = np.array([4.5, 5.0])
+
+        samples = EmceeSamples(
+            model=model,
+            samples=SampleTable(
+                paths=model.model_component_and_parameter_names,
+                parameters=np.zeros((6 * total_steps, 2)),
+                log_likelihoods=np.zeros(6 * total_steps),
+                log_priors=np.zeros(6 * total_steps),
+                weights=np.ones(6 * total_steps),
+            ),
+            auto_correlation_times=auto_correlation_times,
+            auto_correlation_check_size=20,
+            auto_correlation_required_length=50,
+            auto_correlation_change_threshold=0.01,
+            total_walkers=6,
+            total_steps=total_steps,
+            backend=sampler.backend,
+        )
+
+        assert (
+            samples.samples_after_burn_in
+            == sampler.backend.get_chain()[:total_steps][16::2].reshape(-1, 2)
+        ).all()
+        assert samples.previous_auto_correlation_times == pytest.approx(
+            emcee_module.autocorr.integrated_time(
+                sampler.backend.get_chain()[:60], tol=0
+            )
+        )
+
+
+class MockPool:
+    processes = 3
+
+    def __init__(self):
+        self.batches = []
+
+    def map(self, function, iterable):
+        self.batches = list(iterable)
+        return list(map(function, self.batches))
+
+
+def test__pool_batch():
+    pool = MockPool()
+    pool_batch = PoolBatch(pool=pool, function=lambda parameters: parameters.sum(axis=1))
+
+    parameters = np.arange(14.0).reshape(7, 2)
+
+    assert (pool_batch(parameters) == parameters.sum(axis=1)).all()
+    assert [len(batch) for batch in pool.batches] == [3, 2, 2]
+
+    assert len(pool_batch(parameters[:2])) == 2
+    assert len(pool.batches) == 2
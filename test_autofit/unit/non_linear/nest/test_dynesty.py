@@ -4,10 +4,12 @@ import sys
 
 import numpy as np
 import pytest
+from dynesty import NestedSampler
 
 import autofit as af
 from autoconf import conf
 from autofit.mock import mock
+from autofit.non_linear.nest.dynesty import DynestyCheckpoint
 
 directory = path.dirname(path.realpath(__file__))
 pytestmark = pytest.mark.filterwarnings("ignore::FutureWarning")
@@ -393,3 +395,76 @@ class TestCopyWithNameExtension:
         assert copy.fmove == search.fmove
         assert copy.max_move == search.max_move
         assert copy.number_of_cores == search.number_of_cores
+
+
+def log_likelihood(cube):
+    return -0.5 * np.sum((cube - 0.5) ** 2 / 0.01)
+
+
+def prior_transform(cube):
+    return cube
+
+
+def make_sampler():
+    np.random.seed(1)
+    return NestedSampler(
+        log_likelihood,
+        prior_transform,
+        ndim=2,
+        nlive=20,
+        bound="multi",
+        rstate=np.random,
+    )
+
+
+class TestDynestyCheckpoint:
+    def test__restores_sampler(self, tmp_path):
+        sampler = make_sampler()
+        sampler.run_nested(maxiter=100, print_progress=False)
+
+        checkpoint = DynestyCheckpoint(str(tmp_path))
+        checkpoint.save(sampler)
+
+        restored = checkpoint.load()
+
+        assert restored.it == sampler.it
+        assert (restored.live_u == sampler.live_u).all()
+        assert restored.saved_id == sampler.saved_id
+        assert len(restored.bound) == len(sampler.bound)
+        assert [type(bound) for bound in restored.bound] == [type(bound) for bound in sampler.bound]
+        assert (restored.bound[-1].ctrs == sampler.bound[-1].ctrs).all()
+        assert (restored.results.samples == sampler.results.samples).all()
+        assert (restored.results.logz == sampler.results.logz).all()
+
+    def test__resumed_run_matches(self, tmp_path):
+        sampler = make_sampler()
+        sampler.run_nested(maxiter=100, print_progress=False)
+
+        checkpoint = DynestyCheckpoint(str(tmp_path))
+        checkpoint.save(sampler)
+
+        sampler.run_nested(maxiter=200, print_progress=False)
+        checkpoint.save(sampler)
+
+        restored = DynestyCheckpoint(str(tmp_path)).load()
+        assert len(restored.bound) == len(sampler.bound)
+        restored.loglikelihood = sampler.loglikelihood
+
+        random_state = np.random.get_state()
+        sampler.run_nested(maxiter=300, print_progress=False)
+        np.random.set_state(random_state)
+        restored.run_nested(maxiter=300, print_progress=False)
+
+        assert (restored.results.samples == sampler.results.samples).all()
+        assert (restored.results.logz == sampler.results.logz).all()
+
+    def test__clear(self, tmp_path):
+        sampler = make_sampler()
+        sampler.run_nested(maxiter=10, print_progress=False)
+
+        checkpoint = DynestyCheckpoint(str(tmp_path / "dynesty"))
+        checkpoint.save(sampler)
+        assert checkpoint.exists
+
+        checkpoint.clear()
+        assert not checkpoint.exists
@@ -326,6 +326,30 @@ class TestMulitNest:
 
         assert weights == [0.02, 0.02, 0.01, 0.05, 0.1, 0.1, 0.1, 0.1, 0.2, 0.3]
 
+    def test__weighted_samples_reader_parses_rewritten_file(self, multi_nest_samples_path):
+        file_weighted_samples = path.join(multi_nest_samples_path, "multinest.txt")
+        row = (
+            "    0.100000000000000000E+00    0.200000000000000000E+01    0.300000000000000000E+01"
+        )
+
+        with open(file_weighted_samples, "w") as f:
+            f.write(f"{row}\n{row[:40]}")
+
+        reader = mn.WeightedSamplesReader(file_weighted_samples)
+
+        assert reader.read(prior_count=1).tolist() == [[0.1, 2.0, 3.0]]
+
+        with open(file_weighted_samples, "w") as f:
+            f.write(f"{row}\n{row}\n")
+
+        assert reader.read(prior_count=1).tolist() == 2 * [[0.1, 2.0, 3.0]]
+        assert reader.read(prior_count=1) is reader.read(prior_count=1)
+
+        with open(file_weighted_samples, "w") as f:
+            f.write(row.replace("0.1", "0.5"))
+
+        assert reader.read(prior_count=1).tolist() == [[0.5, 2.0, 3.0]]
+
     def test__read_total_samples_from_file_resume(self, multi_nest_resume_path):
         conf.instance.output_path = path.join(multi_nest_resume_path, "1_class")
 
@@ -194,3 +194,27 @@ class TestMovePickleFiles:
 
         if path.exists(test_path):
             shutil.rmtree(test_path)
+
+
+
+
+def fail_update(samples):
+    raise ValueError("update failed")
+
+
+def fail_fit(search, model, analysis, log_likelihood_cap=None):
+    search.update_pipeline.submit(fail_update, None)
+    raise RuntimeError("search failed")
+
+
+def test_update_error_does_not_hide_search_error(monkeypatch):
+    monkeypatch.setattr(af.MockSearch, "_fit", fail_fit)
+    search = af.MockSearch(paths=af.Paths(name="failing_search"))
+
+    with pytest.raises(RuntimeError, match="search failed"):
+        search.fit(
+            model=af.PriorModel(mock.MockClassx2),
+            analysis=mock.MockAnalysis(),
+        )
+
+    shutil.rmtree(search.paths.output_path, ignore_errors=True)
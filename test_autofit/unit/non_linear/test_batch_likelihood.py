@@ -0,0 +1,160 @@
+import numpy as np
+import pytest
+
+import autofit as af
+import autofit.graphical as ep
+from autofit.mock.mock import MockClassx2
+from autofit.non_linear.abstract_search import NonLinearSearch
+
+
+class MockAnalysis(af.Analysis):
+    def log_likelihood_function(self, instance):
+        return -(instance.one - 0.5) ** 2 - (instance.two - 0.5) ** 2
+
+
+class MockBatchAnalysis(MockAnalysis):
+    def __init__(self):
+        self.calls = 0
+
+    def log_likelihood_function_batch(self, instance):
+        self.calls += 1
+        return self.log_likelihood_function(instance)
+
+
+@pytest.fixture(name="model")
+def make_model():
+    return af.PriorModel(
+        MockClassx2,
+        one=af.UniformPrior(0.0, 1.0),
+        two=af.UniformPrior(0.0, 1.0),
+    )
+
+
+@pytest.fixture(name="parameter_array")
+def make_parameter_array():
+    return np.array([
+        [0.1, 0.2],
+        [0.5, 0.5],
+        [2.0, 0.5],
+        [0.7, 0.9],
+    ])
+
+
+def make_fitness(model, analysis):
+    return NonLinearSearch.Fitness(
+        paths=None,
+        model=model,
+        analysis=analysis,
+        samples_from_model=None,
+    )
+
+
+class TestFitness:
+    def test_is_batched(self, model):
+        assert make_fitness(model, MockBatchAnalysis()).is_batched
+        assert not make_fitness(model, MockAnalysis()).is_batched
+
+    def test_batch_matches_single(self, model, parameter_array):
+        analysis = MockBatchAnalysis()
+        batched = make_fitness(model, analysis).log_likelihoods_from_parameter_array(
+            parameter_array
+        )
+        single = make_fitness(model, MockAnalysis()).log_likelihoods_from_parameter_array(
+            parameter_array
+        )
+
+        assert analysis.calls == 1
+        assert np.isnan(batched[2])
+        assert np.isnan(single[2])
+        assert batched[[0, 1, 3]] == pytest.approx(single[[0, 1, 3]])
+
+    def test_max_log_likelihood(self, model, parameter_array):
+        fitness = make_fitness(model, MockBatchAnalysis())
+        fitness.log_likelihoods_from_parameter_array(parameter_array)
+
+        assert fitness.max_log_likelihood == 0.0
+
+    def test_assertion(self, model, parameter_array):
+        model.add_assertion(model.one < model.two)
+
+        log_likelihoods = make_fitness(
+            model, MockBatchAnalysis()
+        ).log_likelihoods_from_parameter_array(parameter_array)
+
+        assert list(np.isnan(log_likelihoods)) == [False, True, True, False]
+
+    def test_log_posteriors(self, model, parameter_array):
+        log_posteriors = make_fitness(
+            model, MockBatchAnalysis()
+        ).log_posteriors_from_parameter_array(parameter_array)
+
+        assert log_posteriors[1] == 0.0
+
+
+class TestModelFactor:
+    def test_vectorised(self, model):
+        analysis = MockBatchAnalysis()
+        factor = ep.ModelFactor(model, analysis=analysis)
+
+        assert factor.vectorised
+
+        result = factor({
+            variable: np.array([0.5, 0.1])
+            for variable in factor.variables
+        })
+
+        assert analysis.calls == 1
+        assert np.asarray(result) == pytest.approx([0.0, -0.32])
+
+    def test_not_vectorised(self, model):
+        assert not ep.ModelFactor(model, analysis=MockAnalysis()).vectorised
+
+    def test_vectorised_recompiled(self, model):
+        collection = af.CollectionPriorModel(simple=model)
+        factor = ep.ModelFactor(collection, analysis=MockBatchAnalysis())
+        assert factor.vectorised
+
+        model.two = af.DeferredArgument()
+        assert not factor.vectorised
+
+    def test_single(self, model):
+        factor = ep.ModelFactor(model, analysis=MockAnalysis())
+        one, two = sorted(factor.variables, key=lambda prior: prior.id)
+
+        assert factor({one: 0.1, two: 0.7}).log_value == pytest.approx(-0.2)
+
+        plan = model.instantiation_plan
+        names = factor._factor._names_for_plan(plan)
+        assert names == (one.name, two.name)
+        assert factor._factor._names_for_plan(plan) is names
+
+    def test_single_recompiled(self, model):
+        factor = ep.ModelFactor(model, analysis=MockAnalysis())
+        one, two = sorted(factor.variables, key=lambda prior: prior.id)
+        factor({one: 0.1, two: 0.7})
+
+        model.one = one
+        assert factor({one: 0.3, two: 0.5}).log_value == pytest.approx(-0.04)
+        assert factor._factor._plan_names[0] is model.instantiation_plan
+
+    def test_process_multicall(self, model):
+        with ep.ProcessMulticall(2) as multicall:
+            factor = ep.ModelFactor(
+                model, analysis=MockAnalysis(), multicall=multicall
+            )
+            one, two = sorted(factor.variables, key=lambda prior: prior.id)
+
+            result = factor({
+                one: np.array([0.5, 0.1]),
+                two: np.array([0.5, 0.5]),
+            })
+
+            assert np.asarray(result) == pytest.approx([0.0, -0.16])
+            assert multicall.dict()["items"] == 2
+
+    def test_single_out_of_limits(self, model):
+        factor = ep.ModelFactor(model, analysis=MockAnalysis())
+        one, two = sorted(factor.variables, key=lambda prior: prior.id)
+
+        with pytest.raises(af.exc.PriorLimitException):
+            factor({one: 2.0, two: 0.7})
@@ -0,0 +1,93 @@
+import os
+import signal
+
+import pytest
+
+from autofit import exc
+from autofit.non_linear.parallel import (
+    AbstractJob,
+    AbstractJobResult,
+    Checkpoint,
+    JobScheduler,
+)
+
+
+class JobResult(AbstractJobResult):
+    def __init__(self, number, pid, number_of_cores):
+        super().__init__(number)
+        self.pid = pid
+        self.number_of_cores = number_of_cores
+
+
+class Job(AbstractJob):
+    def perform(self):
+        return JobResult(self.number, os.getpid(), self.number_of_cores)
+
+
+class FailingJob(AbstractJob):
+    def perform(self):
+        raise ValueError("failed")
+
+
+class KilledJob(AbstractJob):
+    def perform(self):
+        os.kill(os.getpid(), signal.SIGKILL)
+
+
+class TestJobScheduler:
+    def test_results(self):
+        jobs = [Job() for _ in range(6)]
+        results = list(JobScheduler(3).run(jobs))
+
+        assert sorted(results) == sorted(
+            JobResult(job.number, None, None) for job in jobs
+        )
+        assert os.getpid() not in {result.pid for result in results}
+        assert len({result.pid for result in results}) <= 2
+
+    def test_cores_shared(self):
+        results = list(JobScheduler(5).run([Job(), Job()]))
+
+        assert [result.number_of_cores for result in results] == [2, 2]
+
+    @pytest.mark.parametrize(
+        "number_of_cores, cores_per_job, total_jobs, allocation",
+        [
+            (5, 1, 10, (4, 1)),
+            (5, 2, 10, (2, 2)),
+            (6, 2, 10, (2, 2)),
+            (5, 1, 1, (1, 4)),
+            (5, 8, 10, (1, 4)),
+        ]
+    )
+    def test_allocate(self, number_of_cores, cores_per_job, total_jobs, allocation):
+        assert JobScheduler(
+            number_of_cores, cores_per_job=cores_per_job
+        ).allocate(total_jobs) == allocation
+
+    def test_failure(self):
+        with pytest.raises(exc.JobException, match="failed"):
+            list(JobScheduler(2).run([FailingJob()]))
+
+    def test_worker_killed(self):
+        job = KilledJob()
+        with pytest.raises(exc.JobException, match=f"Job {job.number} was lost"):
+            list(JobScheduler(2, timeout=0.1).run([job]))
+
+    def test_too_few_cores(self):
+        with pytest.raises(AssertionError):
+            JobScheduler(1)
+
+
+class TestCheckpoint:
+    def test_resume(self, tmpdir):
+        directory = str(tmpdir.join("checkpoint"))
+        Checkpoint(directory, [1, 2]).save(0, "result")
+
+        assert Checkpoint(directory, [1, 2]).completed() == {"0": "result"}
+
+    def test_different_signature(self, tmpdir):
+        directory = str(tmpdir.join("checkpoint"))
+        Checkpoint(directory, [1, 2]).save(0, "result")
+
+        assert Checkpoint(directory, [1, 3]).completed() == dict()
@@ -0,0 +1,207 @@
+import multiprocessing as mp
+import os
+import pickle
+import signal
+import time
+
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit.mock.mock import MockClassx2
+from autofit.non_linear.abstract_search import NonLinearSearch
+from autofit.non_linear import pool as pool_module
+from autofit.non_linear.pool import WorkerPool, dumps
+
+
+class MockAnalysis(af.Analysis):
+    def __init__(self):
+        self.data = np.ones(100000)
+
+    def log_likelihood_function(self, instance):
+        return float(np.sum(self.data)) * instance.one
+
+
+def make_fitness(model, analysis):
+    return NonLinearSearch.Fitness(
+        paths=None,
+        model=model,
+        analysis=analysis,
+        samples_from_model=None,
+    )
+
+
+class SharedMemoryAnalysis(MockAnalysis):
+    use_shared_memory = True
+
+
+def evaluate(arguments):
+    fitness, vector = arguments
+    return os.getpid(), fitness.log_likelihood_from_parameters(vector)
+
+
+def is_read_only(fitness):
+    return not fitness.analysis.data.flags.writeable
+
+
+def use_pool_in_child(parent_ids, exit_codes):
+    pool = WorkerPool.for_cores(2)
+    exit_codes.put(
+        set(pool.ids).isdisjoint(parent_ids)
+        and sorted(pool.broadcast(os.getpid)) == sorted(pool.ids)
+    )
+    WorkerPool.close_all()
+
+
+@pytest.fixture(name="pool")
+def make_pool():
+    yield WorkerPool.for_cores(2)
+    WorkerPool.close_all()
+
+
+@pytest.fixture(name="model")
+def make_model():
+    return af.PriorModel(MockClassx2)
+
+
+class TestWorkerPool:
+    def test_single_core(self):
+        assert WorkerPool.for_cores(1) is None
+
+    def test_reused(self, pool):
+        assert WorkerPool.for_cores(2) is pool
+        assert len(set(pool.ids)) == 2
+
+    def test_shared(self, pool, model):
+        analysis = MockAnalysis()
+        fitness = make_fitness(model, analysis)
+
+        unshared_size = len(dumps(fitness))
+        pool.share(model=model, analysis=analysis)
+        assert len(dumps(fitness)) < unshared_size / 100
+
+        # References are only used for tasks sent to the pool
+        assert len(pickle.dumps(fitness)) > unshared_size / 2
+
+        results = pool.map(
+            evaluate,
+            [(fitness, [0.5, 0.5]), (fitness, [0.25, 0.5])]
+        )
+        assert [result for _, result in results] == [50000.0, 25000.0]
+        assert {pid for pid, _ in results} <= set(pool.ids)
+
+    def test_replaced(self, pool, model):
+        pool.share(model=model, analysis=MockAnalysis())
+
+        analysis = MockAnalysis()
+        analysis.data = 2 * analysis.data
+        pool.share(analysis=analysis)
+
+        results = pool.map(
+            evaluate,
+            [(make_fitness(model, analysis), [1.0, 0.5])]
+        )
+        assert results[0][1] == 200000.0
+
+    def test_broadcast(self, pool):
+        assert sorted(pool.broadcast(os.getpid)) == sorted(pool.ids)
+        assert WorkerPool.existing(2) is pool
+        assert WorkerPool.existing(3) is None
+
+    def test_forked_child_creates_own_pool(self, pool):
+        results = mp.Queue()
+        process = mp.get_context("fork").Process(
+            target=use_pool_in_child,
+            args=(pool.ids, results)
+        )
+        process.start()
+        assert results.get(timeout=30) is True
+        process.join(timeout=30)
+
+        assert WorkerPool.for_cores(2) is pool
+        assert sorted(pool.broadcast(os.getpid)) == sorted(pool.ids)
+
+    def test_recreated_when_worker_dies(self, pool):
+        os.kill(pool.ids[0], signal.SIGKILL)
+        while pool.is_alive:
+            time.sleep(0.01)
+
+        new_pool = WorkerPool.for_cores(2)
+        assert new_pool is not pool
+        assert sorted(new_pool.broadcast(os.getpid)) == sorted(new_pool.ids)
+
+    def test_changed_model_sent_in_full(self, pool, model):
+        pool.share(model=model)
+        assert pool_module.shared_key(model) is not None
+
+        model.one = af.UniformPrior(0.0, 2.0)
+        assert pool_module.shared_key(model) is None
+
+    def test_analysis_changed_in_place_sent_again(self, pool, model):
+        analysis = MockAnalysis()
+        pool.share(model=model, analysis=analysis)
+
+        analysis.data = 2 * analysis.data
+        pool.share(model=model, analysis=analysis)
+
+        results = pool.map(
+            evaluate,
+            [(make_fitness(model, analysis), [1.0, 0.5])]
+        )
+        assert results[0][1] == 200000.0
+
+
+class TestSharedMemory:
+    @pytest.fixture(autouse=True)
+    def requires_shared_memory(self):
+        pytest.importorskip("multiprocessing.shared_memory")
+
+    def test_arrays_in_shared_memory(self, pool, model):
+        analysis = SharedMemoryAnalysis()
+        pool.share(model=model, analysis=analysis)
+        fitness = make_fitness(model, analysis)
+
+        results = pool.map(
+            evaluate,
+            [(fitness, [0.5, 0.5]), (fitness, [0.25, 0.5])]
+        )
+        assert [result for _, result in results] == [50000.0, 25000.0]
+        assert pool.map(is_read_only, [fitness, fitness]) == [True, True]
+        assert analysis.data.flags.writeable
+
+    def test_unlinked_when_replaced(self, pool):
+        pool.share(analysis=SharedMemoryAnalysis())
+        payload, = pool_module._payloads.values()
+        name = payload.blocks[0].name
+
+        pool.share(analysis=SharedMemoryAnalysis())
+
+        from multiprocessing import shared_memory
+
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+    def test_unlinked_when_referenced(self):
+        from multiprocessing import shared_memory
+
+        payload = pool_module.SharedMemoryPayload(SharedMemoryAnalysis())
+        name = payload.blocks[0].name
+        analysis = payload.load()
+
+        pool_module._close(payload.blocks, unlink=True)
+
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+        assert analysis.data.sum() == 100000.0
+
+        del analysis
+        pool_module._close([])
+        assert pool_module._unclosed == []
+
+    def test_subclasses_pickled(self):
+        payload = pool_module.SharedMemoryPayload(
+            np.ma.masked_array(np.ones(10), mask=np.arange(10) < 5)
+        )
+        assert payload.blocks == []
+        assert payload.load().sum() == 5.0
@@ -0,0 +1,127 @@
+import pickle
+import threading
+
+import pytest
+
+import autofit as af
+from autofit.mock.mock import MockClassx2
+from autofit.non_linear import profile
+from autofit.non_linear.abstract_search import NonLinearSearch
+from autofit.non_linear.profile import Profiler, StageStatistics, profiler
+
+
+class MockAnalysis(af.Analysis):
+    def log_likelihood_function(self, instance):
+        return -(instance.one - 0.5) ** 2
+
+
+@pytest.fixture(name="enabled")
+def enable_profiler():
+    profiler.reset(True)
+    yield profiler
+    profiler.reset(False)
+
+
+class TestProfiler:
+    def test_disabled(self):
+        disabled = Profiler()
+        with disabled("stage"):
+            pass
+
+        assert disabled.dict() == dict()
+
+    def test_enabled(self):
+        enabled = Profiler(enabled=True)
+        for _ in range(3):
+            with enabled("stage", items=2):
+                pass
+
+        stage = enabled.dict()["stage"]
+        assert stage["calls"] == 3
+        assert stage["items"] == 6
+        assert 0.0 <= stage["p50"] <= stage["max"]
+
+    def test_reservoir_bounded(self):
+        stage = StageStatistics(reservoir_size=10)
+        for duration in range(100):
+            stage.add(float(duration))
+
+        assert len(stage.durations) == 10
+        assert stage.dict()["total"] == 4950.0
+        assert stage.dict()["max"] == 99.0
+
+    def test_threads(self):
+        enabled = Profiler(enabled=True)
+
+        def time_stages():
+            for _ in range(1000):
+                with enabled("stage"):
+                    pass
+
+        threads = [threading.Thread(target=time_stages) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert enabled.dict()["stage"]["calls"] == 4000
+
+    def test_pickle(self):
+        stage = StageStatistics()
+        stage.add(1.0)
+        loaded = pickle.loads(pickle.dumps(stage))
+
+        loaded.add(2.0)
+        assert loaded.dict()["total"] == 3.0
+
+
+class TestFitness:
+    def test_stages(self, enabled):
+        fitness = NonLinearSearch.Fitness(
+            paths=None,
+            model=af.PriorModel(MockClassx2),
+            analysis=MockAnalysis(),
+            samples_from_model=None,
+        )
+        fitness.log_posterior_from_parameters([0.5, 0.5])
+
+        stages = enabled.dict()
+        assert stages["log_likelihood_function"]["calls"] == 1
+        assert stages["instance_from_vector"]["calls"] == 1
+        assert stages["log_priors"]["calls"] == 1
+
+
+def stages(**totals):
+    return {
+        name: {"calls": items, "items": items, "total": total}
+        for name, (items, total) in totals.items()
+    }
+
+
+class TestSummary:
+    def test_workers(self):
+        summary = profile.summary(
+            wall_time=10.0,
+            stages=stages(fit=(1, 8.0), pool_map=(2, 5.0), update=(1, 1.0)),
+            workers=[
+                {"pid": 1, "stages": stages(log_likelihood_function=(100, 4.0))},
+                {"pid": 2, "stages": stages(log_likelihood_function=(50, 4.0))},
+            ],
+        )
+
+        assert summary["likelihood_evaluations"] == 150
+        assert summary["evaluations_per_second"] == 15.0
+        assert summary["workers"]["1"]["evaluations_per_second"] == 25.0
+        assert summary["parallel_efficiency"] == 0.8
+        assert summary["sampler_time"] == 2.0
+
+    def test_serial(self):
+        summary = profile.summary(
+            wall_time=4.0,
+            stages=stages(fit=(1, 4.0), log_likelihood_function=(10, 1.0), instance_from_vector=(10, 1.0)),
+            workers=list(),
+        )
+
+        assert summary["likelihood_evaluations"] == 10
+        assert "parallel_efficiency" not in summary
+        assert summary["sampler_time"] == 2.0
@@ -0,0 +1,167 @@
+import os
+
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit.non_linear.sample_log import ColumnStack, SampleLog, SegmentLog, WeightLog
+from autofit.non_linear.samples import SampleTable
+
+
+@pytest.fixture(name="directory")
+def make_directory(tmpdir):
+    return str(tmpdir)
+
+
+def segments(directory):
+    return sorted(os.listdir(directory))
+
+
+def make_samples(total_samples, weights=None):
+    parameters = np.arange(2 * total_samples, dtype="float64").reshape(-1, 2)
+    return af.OptimizerSamples(
+        model=None,
+        samples=SampleTable(
+            paths=["one", "two"],
+            parameters=parameters,
+            log_likelihoods=parameters[:, 0],
+            log_priors=parameters[:, 1],
+            weights=np.ones(total_samples) if weights is None else weights,
+        )
+    )
+
+
+class TestSegmentLog:
+    def test_append(self, directory):
+        log = SegmentLog(directory)
+        array = np.random.random((10, 3))
+
+        assert log.update(array[:4]) == 4
+        assert log.update(array) == 6
+        assert log.update(array) == 0
+
+        assert segments(directory) == ["segment_00000.npy", "segment_00001.npy"]
+        assert (log.load() == array).all()
+
+    def test_changed_tail(self, directory):
+        log = SegmentLog(directory)
+        array = np.random.random((10, 3))
+        log.update(array[:4])
+        log.update(array[:8])
+
+        array[6] = 0.0
+        assert log.update(array) == 6
+
+        assert segments(directory) == ["segment_00000.npy", "segment_00001.npy"]
+        assert (log.load() == array).all()
+
+    def test_only_tail_checked(self, directory):
+        log = SegmentLog(directory)
+        array = np.random.random((10, 3))
+        log.update(array[:4])
+        log.update(array[:8])
+
+        array[0] = 0.0
+        assert log.update(array) == 2
+        assert segments(directory) == [
+            "segment_00000.npy", "segment_00001.npy", "segment_00002.npy"
+        ]
+
+    def test_column_stack(self, directory):
+        log = SegmentLog(directory)
+        parameters = np.random.random((10, 2))
+        log_likelihoods = np.random.random(10)
+
+        log.update(ColumnStack(parameters[:4], log_likelihoods[:4]))
+        assert log.update(ColumnStack(parameters, log_likelihoods)) == 6
+        assert (log.load() == np.column_stack((parameters, log_likelihoods))).all()
+
+    def test_column_stack_lists(self, directory):
+        class Column(list):
+            def __getitem__(self, item):
+                read.append(item)
+                return super().__getitem__(item)
+
+        log = SegmentLog(directory)
+        vectors = [np.random.random(2) for _ in range(10)]
+        ids = Column(range(10))
+
+        log.update(ColumnStack(list(range(4)), vectors[:4]))
+        read = list()
+        assert log.update(ColumnStack(ids, vectors)) == 6
+        assert read == [slice(0, 4), slice(4, 10)]
+        assert (log.load() == np.column_stack((np.arange(10), vectors))).all()
+
+    def test_resume(self, directory):
+        array = np.random.random((10, 3))
+        SegmentLog(directory).update(array[:4])
+
+        log = SegmentLog(directory)
+        assert log.count == 4
+        assert log.update(array) == 6
+        assert (log.load() == array).all()
+
+
+class TestWeightLog:
+    def test_rescaled(self, directory):
+        log = WeightLog(directory)
+        weights = np.random.random(10)
+        log.update(weights[:4])
+        log.update(weights[:8])
+
+        assert log.update(0.5 * weights) == 2
+        assert segments(directory) == [
+            "scales.json", "segment_00000.npy", "segment_00001.npy", "segment_00002.npy"
+        ]
+        assert np.allclose(log.load(), 0.5 * weights)
+
+    def test_changed_tail(self, directory):
+        log = WeightLog(directory)
+        weights = np.random.random(10)
+        log.update(weights[:4])
+        log.update(weights[:8])
+
+        weights[6] = 0.0
+        assert log.update(0.5 * weights) == 6
+        assert np.allclose(log.load(), 0.5 * weights)
+
+    def test_resume(self, directory):
+        weights = np.random.random(10)
+        log = WeightLog(directory)
+        log.update(weights[:4])
+        log.update(2.0 * weights[:6])
+
+        log = WeightLog(directory)
+        assert log.count == 6
+        assert log.update(weights) == 4
+        assert np.allclose(log.load(), weights)
+
+
+class TestSampleLog:
+    def test_update_and_load(self, directory):
+        log = SampleLog(directory)
+        log.update(make_samples(3))
+        log.update(make_samples(5))
+
+        table = log.load()
+        expected = make_samples(5).samples
+
+        assert table.paths == ["one", "two"]
+        assert (table.parameters == expected.parameters).all()
+        assert (table.log_likelihoods == expected.log_likelihoods).all()
+        assert (table.log_priors == expected.log_priors).all()
+
+    def test_weights_change(self, directory):
+        log = SampleLog(directory)
+        log.update(make_samples(3))
+        log.update(make_samples(5, weights=np.full(5, 0.2)))
+
+        assert len(os.listdir(os.path.join(directory, "values"))) == 2
+        assert list(log.load().weights) == 5 * [0.2]
+
+    def test_clear(self, directory):
+        log = SampleLog(directory)
+        log.update(make_samples(3))
+        log.clear()
+
+        assert log.load() is None
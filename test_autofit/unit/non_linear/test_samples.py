@@ -4,7 +4,7 @@ import pytest
 
 import autofit as af
 from autofit.mock.mock import MockClassx2, MockClassx4
-from autofit.non_linear.samples import OptimizerSamples, PDFSamples, Sample
+from autofit.non_linear.samples import OptimizerSamples, PDFSamples, Sample, SampleTable, load_from_table
 
 pytestmark = pytest.mark.filterwarnings("ignore::FutureWarning")
 
@@ -63,6 +63,28 @@ class TestSamplesTable:
         assert os.path.exists(filename)
         os.remove(filename)
 
+    def test__load_from_table(self, samples):
+        filename = "samples.csv"
+        samples.write_table(filename=filename)
+
+        table = load_from_table(filename=filename)
+        os.remove(filename)
+
+        assert isinstance(table, SampleTable)
+        assert len(table) == 5
+        assert table.parameters.shape == (5, 4)
+        assert list(table.log_likelihoods) == [1.0, 2.0, 3.0, 10.0, 5.0]
+        assert table[3].kwargs["mock_class_1_one"] == 21.0
+
+    def test_columnar(self, samples):
+        table = samples._sample_table
+
+        assert table.parameters.shape == (5, 4)
+        assert samples.parameters[3] == [21.0, 22.0, 23.0, 24.0]
+        assert table[3].log_likelihood == 10.0
+        assert table[1:3].log_likelihoods.tolist() == [2.0, 3.0]
+        assert [sample.log_posterior for sample in samples.samples] == [1.0, 2.0, 3.0, 10.0, 5.0]
+
 
 class TestOptimizerSamples:
     def test__max_log_likelihood_vector_and_instance(self, samples):
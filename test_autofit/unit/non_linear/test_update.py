@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from autofit.non_linear.update import UpdatePipeline
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = list()
+        self.release = threading.Event()
+
+    def __call__(self, samples, **tasks):
+        self.release.wait()
+        self.calls.append((samples, tasks))
+
+
+@pytest.fixture(name="pipeline")
+def make_pipeline():
+    return UpdatePipeline()
+
+
+class TestUpdatePipeline:
+    def test_performed(self, pipeline):
+        recorder = Recorder()
+        recorder.release.set()
+
+        pipeline.submit(recorder, 1, visualize=True)
+        pipeline.join()
+
+        assert recorder.calls == [(1, {"visualize": True})]
+
+    def test_coalesced(self, pipeline):
+        recorder = Recorder()
+
+        pipeline.submit(recorder, 1, visualize=False, output=False)
+        pipeline.submit(recorder, 2, visualize=True, output=False)
+        pipeline.submit(recorder, 3, visualize=False, output=False)
+        recorder.release.set()
+        pipeline.join()
+
+        assert recorder.calls[-1] == (3, {"visualize": True, "output": False})
+        assert len(recorder.calls) <= 2
+
+    def test_error_raised_on_join(self, pipeline):
+        def fail(samples):
+            raise ValueError()
+
+        pipeline.submit(fail, 1)
+
+        with pytest.raises(ValueError):
+            pipeline.join()
+
+        pipeline.join()
+
+    def test_error_logged_when_not_raised(self, pipeline):
+        def fail(samples):
+            raise ValueError()
+
+        pipeline.submit(fail, 1)
+        pipeline.join(raise_errors=False)
+        pipeline.join()
+
+    def test_for_directory(self):
+        assert UpdatePipeline.for_directory("a") is UpdatePipeline.for_directory("a")
+        assert UpdatePipeline.for_directory("a") is not UpdatePipeline.for_directory("b")